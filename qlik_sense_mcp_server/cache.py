@@ -0,0 +1,334 @@
+"""
+Caches of Engine results: in memory and, optionally, on disk.
+
+Analysts and agents re-issue identical hypercube calls all the time, and
+every one of them recomputes on the Engine. ``ResultCache`` keeps recent
+results in memory under a byte budget, least recently used first out.
+
+Keys bind a result to the data it was computed from: the app id, the app's
+``qLastReloadTime`` and a hash of the canonical request. A reload changes
+the reload time, so stale results can never be served; ``note_version``
+additionally drops every entry of an app as soon as a newer reload time is
+seen, so the memory is freed instead of waiting for LRU eviction.
+
+``PersistentCache`` is an optional SQLite tier behind a ``ResultCache``.
+Entries written to memory are also written to disk; a memory miss falls
+back to disk and promotes the entry, so after a restart popular results
+are served without touching Qlik. The file is size-bounded (least
+recently read rows go first) and partitioned by a ``scope`` — a hash of
+the server URL and the Qlik identity — so results computed for one user
+are never served to another who shares the file.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (app_id, version, request hash)
+CacheKey = Tuple[str, str, str]
+
+
+def request_hash(request: Any) -> str:
+    """Stable hash of a JSON-serialisable request (key order ignored)."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"),
+                           ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class PersistentCache:
+    """
+    SQLite store of JSON results, shared by several ``ResultCache`` namespaces.
+
+    One row per ``(scope, namespace, app_id, request)``; ``version`` is the
+    app version the row was computed for and a lookup with another
+    version misses. The total payload is kept under ``max_bytes`` by
+    deleting the least recently read rows. Every error is logged and
+    treated as a miss: a broken cache file must never fail a tool call.
+    """
+
+    def __init__(self, path: str, max_bytes: int, scope: str = "") -> None:
+        self.path = path
+        self.max_bytes = max(0, max_bytes)
+        self.scope = scope
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " scope TEXT NOT NULL, namespace TEXT NOT NULL, app_id TEXT NOT NULL,"
+                " request TEXT NOT NULL, version TEXT NOT NULL, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (scope, namespace, app_id, request))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)"
+            )
+            self._conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning("Persistent cache %s unavailable: %s", path, e)
+            self._conn = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None and self.max_bytes > 0
+
+    def get(self, namespace: str, key: CacheKey) -> Optional[Dict[str, Any]]:
+        app_id, version, request = key
+        row = self._run(
+            "SELECT value FROM entries WHERE scope=? AND namespace=? AND app_id=?"
+            " AND request=? AND version=?",
+            (self.scope, namespace, app_id, request, version), fetch=True,
+        )
+        if not row:
+            self.misses += 1
+            return None
+        self._run(
+            "UPDATE entries SET last_access=? WHERE scope=? AND namespace=? AND app_id=? AND request=?",
+            (time.time(), self.scope, namespace, app_id, request),
+        )
+        self.hits += 1
+        try:
+            return json.loads(row[0][0])
+        except ValueError:
+            return None
+
+    def put(self, namespace: str, key: CacheKey, value: Dict[str, Any],
+            encoded: Optional[str] = None) -> None:
+        app_id, version, request = key
+        encoded = encoded if encoded is not None else _encode(value)
+        if len(encoded) > self.max_bytes:
+            return
+        self._run(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.scope, namespace, app_id, request, version, encoded, len(encoded), time.time()),
+        )
+        self._trim()
+
+    def drop_stale(self, namespace: str, app_id: str, version: str) -> int:
+        """Delete rows of ``app_id`` computed for any other version."""
+        return self._run(
+            "DELETE FROM entries WHERE scope=? AND namespace=? AND app_id=? AND version<>?",
+            (self.scope, namespace, app_id, version),
+        )
+
+    def recent(self, namespace: str, limit: int) -> List[Tuple[CacheKey, Dict[str, Any]]]:
+        """The ``limit`` most recently read entries, for warming a memory tier."""
+        rows = self._run(
+            "SELECT app_id, version, request, value FROM entries WHERE scope=? AND namespace=?"
+            " ORDER BY last_access DESC LIMIT ?",
+            (self.scope, namespace, limit), fetch=True,
+        ) or []
+        entries = []
+        for app_id, version, request, value in rows:
+            try:
+                entries.append(((app_id, version, request), json.loads(value)))
+            except ValueError:
+                continue
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+        row = self._run("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE scope=?",
+                        (self.scope,), fetch=True)
+        entries, size = row[0] if row else (0, 0)
+        return {
+            "path": self.path,
+            "enabled": self.enabled,
+            "max_bytes": self.max_bytes,
+            "bytes": size,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _trim(self) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                if total <= self.max_bytes:
+                    return
+                dropped = 0
+                for rowid, size in self._conn.execute(
+                    "SELECT rowid, size FROM entries ORDER BY last_access"
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM entries WHERE rowid=?", (rowid,))
+                    total -= size
+                    dropped += 1
+                self._conn.commit()
+                self.evictions += dropped
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.warning("Persistent cache trim failed: %s", e)
+
+    def _run(self, sql: str, params: Tuple[Any, ...], fetch: bool = False) -> Any:
+        with self._lock:
+            if self._conn is None:
+                return None if fetch else 0
+            try:
+                cur = self._conn.execute(sql, params)
+                if fetch:
+                    return cur.fetchall()
+                self._conn.commit()
+                return cur.rowcount
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.warning("Persistent cache query failed: %s", e)
+                return None if fetch else 0
+
+
+class ResultCache:
+    """
+    Thread-safe LRU of result dicts bounded by ``max_bytes``.
+
+    Entry size is the length of the result's JSON encoding. Results larger
+    than the whole budget are not cached. ``get`` returns a shallow copy,
+    so callers may add or pop top-level keys but must not mutate nested
+    values. ``max_bytes <= 0`` disables the cache. With a ``backing``
+    ``PersistentCache`` every entry is also stored on disk under
+    ``namespace``, and memory misses are looked up there.
+    """
+
+    def __init__(self, max_bytes: int, backing: Optional[PersistentCache] = None,
+                 namespace: str = "results") -> None:
+        self.max_bytes = max(0, max_bytes)
+        self.backing = backing if backing is not None and backing.enabled else None
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._versions: Dict[str, str] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.disk_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def note_version(self, app_id: str, version: str) -> int:
+        """Record the app's current version; drops its older entries. Returns how many."""
+        with self._lock:
+            if self._versions.get(app_id) == version:
+                return 0
+            self._versions[app_id] = version
+            stale = [k for k in self._entries if k[0] == app_id and k[1] != version]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+        if self.backing is not None:
+            self.backing.drop_stale(self.namespace, app_id, version)
+        return len(stale)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+        value = self.backing.get(self.namespace, key) if self.backing is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._store(key, value, len(_encode(value)))
+        return dict(value)
+
+    def put(self, key: CacheKey, value: Dict[str, Any]) -> bool:
+        """Store ``value``; False if the cache is disabled or it does not fit."""
+        if not self.enabled:
+            return False
+        encoded = _encode(value)
+        if self.backing is not None:
+            self.backing.put(self.namespace, key, value, encoded)
+        return self._store(key, value, len(encoded))
+
+    def warm_start(self, limit: int) -> int:
+        """Load the ``limit`` most recently used disk entries into memory."""
+        if self.backing is None or not self.enabled or limit <= 0:
+            return 0
+        loaded = 0
+        for key, value in reversed(self.backing.recent(self.namespace, limit)):
+            if self._store(key, value, len(_encode(value))):
+                loaded += 1
+        return loaded
+
+    def _store(self, key: CacheKey, value: Dict[str, Any], size: int) -> bool:
+        if not self.enabled or size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (dict(value), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, app_id: Optional[str] = None) -> int:
+        """Drop every entry, or every entry of ``app_id``. Returns how many."""
+        with self._lock:
+            keys = [k for k in self._entries if app_id is None or k[0] == app_id]
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            stats = {
+                "max_bytes": self.max_bytes,
+                "bytes": self._bytes,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+        return stats
+
+    def _drop(self, key: CacheKey) -> None:
+        _, size = self._entries.pop(key)
+        self._bytes -= size
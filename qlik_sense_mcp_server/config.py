@@ -22,6 +22,63 @@ DEFAULT_TICKET_TIMEOUT = 30.0
 # Default retry settings
 DEFAULT_WS_RETRIES = 2
 
+# Engine document pool: how many apps stay open at once (one WebSocket each)
+# and after how many idle seconds an open app is closed.
+DEFAULT_MAX_OPEN_DOCS = 3
+DEFAULT_DOC_IDLE_TTL = 20 * 60.0
+# Extra Engine sessions per app leased out to heavy calls (hypercubes) so
+# they compute in parallel. 0 disables leasing.
+DEFAULT_SESSIONS_PER_APP = 3
+# Background sweeper: how often it runs (seconds, 0 disables) and how many
+# live object handles an idle pooled connection may hold before it is
+# recycled.
+DEFAULT_SWEEP_INTERVAL = 60.0
+DEFAULT_MAX_LIVE_HANDLES = 2000
+# Idle HyperCube objects kept per socket and re-targeted with ApplyPatches
+# instead of creating a new object per query. 0 disables reuse.
+DEFAULT_WARM_CUBES = 4
+# Memory budget (MB) of the in-process hypercube result cache. 0 disables it.
+DEFAULT_RESULT_CACHE_MB = 64
+# On-disk SQLite tier behind the in-memory caches: file location, size
+# budget (MB; 0, the default, disables it — it stores query results, i.e.
+# business data, unencrypted) and how many recent entries are loaded into
+# memory at startup.
+DEFAULT_CACHE_DB = "~/.cache/qlik-sense-mcp/cache.sqlite"
+DEFAULT_CACHE_DB_MB = 0
+DEFAULT_CACHE_WARM_ENTRIES = 200
+# GetHyperCubeData page requests kept in flight while a cube is streamed
+# page by page (1 = strictly one page after another).
+DEFAULT_PAGE_WINDOW = 4
+# Directory (relative to the working directory unless absolute) that
+# streamed hypercube exports are written to.
+DEFAULT_EXPORT_DIR = "exports"
+# Slice-and-merge hypercubes (engine_create_hypercube with slice_by): how
+# many slices run at once, the most slice values a call may enumerate and
+# the most merged rows it returns.
+DEFAULT_SLICE_CONCURRENCY = 4
+MAX_SLICES = 200
+MAX_SLICED_ROWS = 50000
+# Batch hypercubes (engine_create_hypercubes): cubes computed at once and
+# the most cubes one call may carry.
+DEFAULT_BATCH_CONCURRENCY = 4
+MAX_BATCH_CUBES = 50
+# Scalar expressions one engine_evaluate_expressions call may carry.
+MAX_EVALUATE_EXPRESSIONS = 200
+# Background app profiling (start_app_profiling): steps run at once, the
+# default wall-clock budget (seconds), the largest table that still gets
+# heavy statistics, and the longest get_app_profile may wait for a job.
+DEFAULT_PROFILE_CONCURRENCY = 2
+DEFAULT_PROFILE_BUDGET = 600
+DEFAULT_PROFILE_HEAVY_MAX_ROWS = 1_000_000
+MAX_PROFILE_WAIT = 120
+# Representative table samples (get_app_table_sample): default and most
+# rows per sample, and the most table fields a sample shows.
+DEFAULT_SAMPLE_ROWS = 20
+MAX_SAMPLE_ROWS = 500
+MAX_SAMPLE_FIELDS = 20
+# Most fields one table export (engine_export_table) may combine.
+MAX_EXPORT_FIELDS = 50
+
 # Pagination defaults
 DEFAULT_APPS_LIMIT = 25
 MAX_APPS_LIMIT = 50
@@ -1,26 +1,361 @@
 """Qlik Sense Engine API client."""
 
+import base64
+import hashlib
+import itertools
 import json
+import math
+import threading
+import uuid
 import websocket
 import ssl
-from typing import Dict, List, Any, Optional, Union
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple, Union
 from datetime import datetime
 from .config import (
     QlikSenseConfig,
     DEFAULT_WS_TIMEOUT,
     DEFAULT_WS_RETRIES,
     DEFAULT_HYPERCUBE_MAX_ROWS,
+    DEFAULT_MAX_OPEN_DOCS,
+    DEFAULT_DOC_IDLE_TTL,
+    DEFAULT_SESSIONS_PER_APP,
+    DEFAULT_SWEEP_INTERVAL,
+    DEFAULT_MAX_LIVE_HANDLES,
+    DEFAULT_WARM_CUBES,
+    DEFAULT_EXPORT_DIR,
+    DEFAULT_PAGE_WINDOW,
+    DEFAULT_RESULT_CACHE_MB,
+    DEFAULT_CACHE_DB,
+    DEFAULT_CACHE_DB_MB,
+    DEFAULT_CACHE_WARM_ENTRIES,
+    DEFAULT_SLICE_CONCURRENCY,
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_PROFILE_CONCURRENCY,
+    MAX_BATCH_CUBES,
+    MAX_EVALUATE_EXPRESSIONS,
+    MAX_SAMPLE_FIELDS,
+    MAX_EXPORT_FIELDS,
+    MAX_SAMPLE_ROWS,
+    MAX_SLICES,
+    MAX_SLICED_ROWS,
     MAX_TABLES_AND_KEYS_DIM,
     MAX_TABLES,
     AUTH_MODE_JWT,
 )
+from .cache import CacheKey, PersistentCache, ResultCache, request_hash
 from .exceptions import QlikConnectionError, QlikEngineError
+from .engine_objects import (
+    OrphanedObjects,
+    SessionObjectScope,
+    WarmCube,
+    WarmCubePool,
+    new_object_id,
+)
+from .engine_paging import MAX_PAGE_CELLS, HypercubePager
+from .engine_pool import AppSessionLeases, EngineSession, EngineSessionPool
+from .engine_transport import EngineTransport
 from .jwt_session import JwtSession, JwtBootstrapError
+from .planner import FieldIndex, plan_hypercube
+from .sinks import RowSink
+from .utils import (
+    flatten_pivot_page,
+    flatten_stack_page,
+    hypercube_cell_value,
+    inject_set_modifier,
+    set_modifier,
+)
 import logging
 import os
+import time
 
 logger = logging.getLogger(__name__)
 
+# CloseDoc on pool eviction is best-effort — never block a tool call on it.
+DOC_CLOSE_TIMEOUT = 5.0
+
+# qErrorCode of an object whose calculation condition evaluates to false.
+CALC_CONDITION_UNFULFILLED = 7005
+
+
+# qMode of the cube layouts the pivot tooling accepts.
+PIVOT_MODES = {"pivot": "P", "stacked": "K"}
+
+# Light per-field statistics of the table profiler: (name, measure template).
+PROFILE_STATS = (
+    ("unique_values", "Count(DISTINCT {field})"),
+    ("non_null_count", "Count({field})"),
+    ("null_count", "NullCount({field})"),
+    ("min_value", "Min({field})"),
+    ("max_value", "Max({field})"),
+)
+
+# Heavy per-field statistics, worth computing only on small tables.
+HEAVY_PROFILE_STATS = (
+    ("avg_value", "Avg({field})"),
+    ("sum_value", "Sum({field})"),
+    ("median_value", "Median({field})"),
+    ("mode_value", "Mode({field})"),
+    ("std_deviation", "Stdev({field})"),
+)
+
+# Profile statistics reported as plain counts rather than ``{text, numeric}``.
+_PROFILE_COUNTS = ("unique_values", "non_null_count", "null_count")
+
+# GetHyperCubeReducedData modes by the names the tools accept.
+REDUCTION_MODES = {"line": "D1", "scatter": "S", "clustered": "C"}
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    try:
+        return int(raw) if raw else default
+    except ValueError:
+        logger.warning("%s=%r is not an integer, falling back to %d", name, raw, default)
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        logger.warning("%s=%r is not a number, falling back to %s", name, raw, default)
+        return default
+
+
+def _jwt_claims(token: str) -> Dict[str, Any]:
+    """Payload of a JWT, NOT verified — only used to tell identities apart; ``{}`` if unreadable."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError, TypeError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def _normalize_cube_spec(
+    dimensions: Optional[List[Any]], measures: Optional[List[Any]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Accept plain strings or dicts for dimensions/measures and fill in default sorting."""
+    # Convert old format (list of strings) to new format (list of dicts) for backward compatibility
+    converted_dimensions = []
+    for dim in dimensions or []:
+        if isinstance(dim, str):
+            # Old format - just field name
+            dim = {"field": dim}
+        if "sort_by" not in dim:
+            dim["sort_by"] = {
+                "qSortByNumeric": 0,
+                "qSortByAscii": 1,  # Default: ASCII ascending
+                "qSortByExpression": 0,
+                "qExpression": ""
+            }
+        converted_dimensions.append(dim)
+
+    converted_measures = []
+    for measure in measures or []:
+        if isinstance(measure, str):
+            # Old format - just expression
+            measure = {"expression": measure}
+        if "sort_by" not in measure:
+            measure["sort_by"] = {
+                "qSortByNumeric": -1  # Default: numeric descending
+            }
+        converted_measures.append(measure)
+    return converted_dimensions, converted_measures
+
+
+def _restrict_cube_spec(
+    dimensions: List[Dict[str, Any]], measures: List[Dict[str, Any]], modifier: str,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Copies of normalized dimensions/measures with ``modifier`` injected into every aggregation."""
+    restricted_dims = []
+    for dim in dimensions:
+        sort_expr = dim["sort_by"].get("qExpression")
+        if sort_expr:
+            dim = dict(dim, sort_by=dict(dim["sort_by"],
+                                         qExpression=inject_set_modifier(sort_expr, modifier)))
+        restricted_dims.append(dim)
+    restricted_measures = [
+        dict(m, expression=inject_set_modifier(m["expression"], modifier)) for m in measures
+    ]
+    return restricted_dims, restricted_measures
+
+
+def _dimension_def(dim: Dict[str, Any]) -> Dict[str, Any]:
+    """``NxDimension`` for one normalized dimension, with Engine-side top-N when ``top_n`` is set."""
+    nx_dim = {
+        "qDef": {
+            "qFieldDefs": [dim["field"]],
+            "qSortCriterias": [
+                {
+                    "qSortByState": 0,
+                    "qSortByFrequency": 0,
+                    "qSortByNumeric": dim["sort_by"].get("qSortByNumeric", 0),
+                    "qSortByAscii": dim["sort_by"].get("qSortByAscii", 1),
+                    "qSortByLoadOrder": 0,
+                    "qSortByExpression": dim["sort_by"].get("qSortByExpression", 0),
+                    "qExpression": {"qv": dim["sort_by"].get("qExpression", "")},
+                }
+            ],
+        },
+        "qNullSuppression": False,
+        "qIncludeElemValue": True,
+    }
+    if dim.get("top_n"):
+        # The Engine keeps the N values with the largest first measure and
+        # folds the rest into one "Others" row — no full sort, no second cube.
+        nx_dim["qOtherTotalSpec"] = {
+            "qOtherMode": "OTHER_COUNTED",
+            "qOtherCounted": {"qv": str(int(dim["top_n"]))},
+            "qOtherSortMode": "OTHER_SORT_DESCENDING",
+            "qSuppressOther": not dim.get("show_others", True),
+            "qForceBadValueKeeping": True,
+            "qApplyEvenWhenPossibleToSort": True,
+            "qTotalMode": "TOTAL_OFF",
+        }
+        nx_dim["qOtherLabel"] = {"qv": dim.get("others_label", "Others")}
+    return nx_dim
+
+
+def _build_hypercube_def(
+    dimensions: List[Dict[str, Any]], measures: List[Dict[str, Any]], fetch_height: int,
+    suppress_zero: bool = False, calc_condition: Optional[str] = None,
+    mode: str = "S", left_dims: Optional[int] = None, fully_expanded: bool = True,
+) -> Dict[str, Any]:
+    """
+    ``qHyperCubeDef`` for normalized dimensions/measures; no initial page if ``fetch_height`` is 0.
+
+    ``suppress_zero`` drops rows whose measures are all zero or missing.
+    ``calc_condition`` is evaluated first; while it is false the Engine
+    computes nothing and the layout carries ``qError`` instead of data.
+    ``mode`` is the ``qMode``: ``S`` (straight), ``P`` (pivot, the first
+    ``left_dims`` dimensions on the rows) or ``K`` (stacked); pivot and
+    stacked cubes start collapsed unless ``fully_expanded``.
+    """
+    n_cols = len(dimensions) + len(measures)
+    hypercube_def = {
+        "qDimensions": [_dimension_def(dim) for dim in dimensions],
+        "qMeasures": [
+            {
+                "qDef": {"qDef": measure["expression"], "qLabel": measure.get("label", f"Measure_{i}")},
+                "qSortBy": measure["sort_by"],
+            }
+            for i, measure in enumerate(measures)
+        ],
+        "qInitialDataFetch": [
+            {
+                "qTop": 0,
+                "qLeft": 0,
+                "qHeight": fetch_height,
+                "qWidth": n_cols,
+            }
+        ] if fetch_height > 0 else [],
+        "qSuppressZero": suppress_zero,
+        "qSuppressMissing": suppress_zero,
+        "qMode": mode,
+    }
+    if mode == "S":
+        hypercube_def["qInterColumnSortOrder"] = list(range(n_cols))
+    else:
+        hypercube_def["qNoOfLeftDims"] = len(dimensions) if left_dims is None else left_dims
+        hypercube_def["qAlwaysFullyExpanded"] = fully_expanded
+    if calc_condition:
+        hypercube_def["qCalcCondition"] = {"qCond": {"qv": calc_condition}, "qMsg": {"qv": ""}}
+    return hypercube_def
+
+
+def _expansion_calls(
+    depth: int, left_dims: int, top_dims: int, nodes: List[Dict[str, Any]],
+) -> List[Tuple[str, List[Any]]]:
+    """``Expand*`` / ``Collapse*`` calls opening ``depth`` levels per side, then single ``nodes``."""
+    calls = [("ExpandLeft", ["/qHyperCubeDef", 0, level, True])
+             for level in range(min(depth, left_dims - 1))]
+    calls += [("ExpandTop", ["/qHyperCubeDef", level, 0, True])
+              for level in range(min(depth, top_dims - 1))]
+    for node in nodes:
+        method = ("Collapse" if node.get("collapse") else "Expand") + (
+            "Top" if node.get("side") == "top" else "Left")
+        calls.append((method, ["/qHyperCubeDef", int(node.get("row", 0)),
+                               int(node.get("col", 0)), False]))
+    return calls
+
+
+def _field_value(cell: Dict[str, Any]) -> Dict[str, Any]:
+    """``{elem, text, number, frequency}`` of one ListObject cell."""
+    number = cell.get("qNum")
+    try:
+        frequency: Optional[int] = int(cell["qFrequency"])
+    except (KeyError, TypeError, ValueError):
+        frequency = None
+    return {
+        "elem": cell.get("qElemNumber"),
+        "text": None if cell.get("qIsNull") else cell.get("qText"),
+        "number": number if isinstance(number, (int, float)) and number == number else None,
+        "frequency": frequency,
+    }
+
+
+def _field_profile(
+    field_name: str, cells: List[Dict[str, Any]], stats: Tuple[Tuple[str, str], ...] = PROFILE_STATS,
+) -> Dict[str, Any]:
+    """One field's profile from its ``stats`` cells (``PROFILE_STATS`` by default)."""
+    if len(cells) < len(stats):
+        return {"field_name": field_name, "error": "No statistics returned"}
+    profile: Dict[str, Any] = {"field_name": field_name}
+    for (name, _), cell in zip(stats, cells):
+        if name in _PROFILE_COUNTS:
+            profile[name] = hypercube_cell_value(cell, True)
+            continue
+        number = cell.get("qNum")
+        profile[name] = {
+            "text": cell.get("qText", ""),
+            "numeric": number if isinstance(number, (int, float)) and number == number else None,
+        }
+    non_null, nulls = profile.get("non_null_count"), profile.get("null_count")
+    if isinstance(non_null, (int, float)) and isinstance(nulls, (int, float)) and non_null + nulls:
+        profile["completeness_percentage"] = round(non_null / (non_null + nulls) * 100, 2)
+    return profile
+
+
+def _typed_evaluation(value: Dict[str, Any]) -> Dict[str, Any]:
+    """``{type, value, text}`` of an ``EvaluateEx`` ``qValue``, or ``{error}``."""
+    text = value.get("qText")
+    if value.get("qIsNumeric"):
+        number = value.get("qNumber")
+        if isinstance(number, (int, float)) and number == number:
+            return {"type": "number", "value": number, "text": text}
+    if text is None or text in ("", "-"):
+        return {"type": "null", "value": None, "text": text}
+    if text.startswith("Error:"):
+        # Evaluate reports bad expressions as text rather than an Engine error.
+        return {"error": text}
+    return {"type": "text", "value": text, "text": text}
+
+
+def _binned_data_args(hypercube: Dict[str, Any], max_cells: int) -> List[Any]:
+    """
+    GetHyperCubeBinnedData arguments after ``qPages`` for an x/y cube.
+
+    The data range spans both measures' ``qMin``..``qMax`` from the
+    layout; the query level gives a square grid of about ``max_cells``
+    bins (``2**level`` per side). Binning method 0 is max-binning.
+    """
+    x_info, y_info = (hypercube.get("qMeasureInfo") or [{}, {}])[:2]
+    x_min, y_min = x_info.get("qMin", 0) or 0, y_info.get("qMin", 0) or 0
+    data_range = {
+        "qLeft": x_min,
+        "qTop": y_min,
+        "qWidth": ((x_info.get("qMax", 0) or 0) - x_min) or 1,
+        "qHeight": ((y_info.get("qMax", 0) or 0) - y_min) or 1,
+    }
+    side = max(1, math.isqrt(max_cells))
+    level = max(0, side.bit_length() - 1)
+    viewport = {"qWidth": side, "qHeight": side, "qZoomLevel": 0}
+    return [viewport, [data_range], max_cells, level, 0]
+
 
 class QlikEngineAPI:
     """Client for Qlik Sense Engine API using WebSocket."""
@@ -28,12 +363,55 @@ class QlikEngineAPI:
     def __init__(self, config: QlikSenseConfig, jwt_session: Optional[JwtSession] = None):
         self.config = config
         self.jwt_session = jwt_session  # required when config.auth_mode == jwt
-        self.ws = None
-        self.request_id = 0
-        # Connection cache
-        self._cached_app_id: Optional[str] = None
-        self._cached_app_handle: int = -1
-        self._cached_has_data: bool = False
+        # Open documents, one socket each, keyed by app_id.
+        self._pool = EngineSessionPool(
+            max_docs=_env_int("QLIK_MAX_OPEN_DOCS", DEFAULT_MAX_OPEN_DOCS),
+            idle_ttl=_env_float("QLIK_DOC_IDLE_TTL", DEFAULT_DOC_IDLE_TTL),
+            close_session=self._close_pooled_session,
+        )
+        # Extra per-app sessions leased to heavy calls (see lease()).
+        self.sessions_per_app = max(0, _env_int("QLIK_SESSIONS_PER_APP", DEFAULT_SESSIONS_PER_APP))
+        self._leases: Dict[str, AppSessionLeases] = {}
+        self._leases_lock = threading.Lock()
+        # One lock per app_id so opening one app never blocks another.
+        self._app_locks: Dict[str, threading.Lock] = {}
+        # Each tool call runs on its own thread; the socket it talks to
+        # (set by ensure_app / lease / connect) is bound per thread, so
+        # concurrent calls never switch each other's connection.
+        self._local = threading.local()
+        self._identity_prefix = f"mcp-{uuid.uuid4().hex[:8]}"
+        self._identity_seq = itertools.count(1)
+        # Session objects whose DestroySessionObject failed, and the
+        # background sweeper that retries them and evicts idle documents.
+        self._orphans = OrphanedObjects()
+        # Idle HyperCube objects reused via ApplyPatches (see _checkout_cube).
+        self._warm_cubes = WarmCubePool(_env_int("QLIK_WARM_CUBES", DEFAULT_WARM_CUBES))
+        # GetHyperCubeData pages kept in flight while streaming a cube.
+        self.page_window = max(1, _env_int("QLIK_PAGE_WINDOW", DEFAULT_PAGE_WINDOW))
+        # Slices of a slice-and-merge hypercube computed at once (see sliced_hypercube).
+        self.slice_concurrency = max(1, _env_int("QLIK_SLICE_CONCURRENCY", DEFAULT_SLICE_CONCURRENCY))
+        # Cubes of one engine_create_hypercubes batch computed at once.
+        self.batch_concurrency = max(1, _env_int("QLIK_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY))
+        # Steps of a background app profiling job run at once (see profiling).
+        self.profile_concurrency = max(1, _env_int("QLIK_PROFILE_CONCURRENCY",
+                                                   DEFAULT_PROFILE_CONCURRENCY))
+        # Hypercube results keyed by app, reload time and request (see
+        # cached_hypercube) and app metadata keyed by the QRS reload /
+        # modified dates, both backed by an optional SQLite file so a
+        # restart does not start cold.
+        self.persistent_cache = self._open_persistent_cache()
+        cache_bytes = int(_env_float("QLIK_RESULT_CACHE_MB", DEFAULT_RESULT_CACHE_MB) * 1024 * 1024)
+        self.result_cache = ResultCache(cache_bytes, self.persistent_cache, namespace="hypercube")
+        self.metadata_cache = ResultCache(cache_bytes, self.persistent_cache, namespace="metadata")
+        warm = _env_int("QLIK_CACHE_WARM_ENTRIES", DEFAULT_CACHE_WARM_ENTRIES)
+        self.result_cache.warm_start(warm)
+        self.metadata_cache.warm_start(warm)
+        # Streamed exports (export_hypercube) are written below this directory.
+        self.export_dir = os.getenv("QLIK_EXPORT_DIR") or DEFAULT_EXPORT_DIR
+        self.sweep_interval = _env_float("QLIK_SWEEP_INTERVAL", DEFAULT_SWEEP_INTERVAL)
+        self.max_live_handles = _env_int("QLIK_MAX_LIVE_HANDLES", DEFAULT_MAX_LIVE_HANDLES)
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
         # Timeouts / retries from env
         ws_timeout_env = os.getenv("QLIK_WS_TIMEOUT")
         try:
@@ -48,14 +426,49 @@ class QlikEngineAPI:
         except ValueError:
             self.ws_retries = DEFAULT_WS_RETRIES
 
-    def _get_next_request_id(self) -> int:
-        """Get next request ID."""
-        self.request_id += 1
-        return self.request_id
+    def _open_persistent_cache(self) -> Optional[PersistentCache]:
+        """SQLite cache tier from ``QLIK_CACHE_DB`` / ``QLIK_CACHE_DB_MB``; None when disabled."""
+        max_mb = _env_float("QLIK_CACHE_DB_MB", DEFAULT_CACHE_DB_MB)
+        if max_mb <= 0:
+            return None
+        path = os.path.expanduser(os.getenv("QLIK_CACHE_DB") or DEFAULT_CACHE_DB)
+        scope = hashlib.sha256(self._cache_identity().encode("utf-8")).hexdigest()[:16]
+        return PersistentCache(path, int(max_mb * 1024 * 1024), scope=scope)
+
+    def _cache_identity(self) -> str:
+        """
+        ``server|user directory|user id`` the on-disk cache is partitioned by.
+
+        Results depend on who asked (section access, app visibility), so
+        every server + identity gets its own partition. In JWT mode the
+        identity comes from the token's user claims, so a rotated token of
+        the same user keeps its cache; only a token without them is keyed
+        by the token itself.
+        """
+        config = self.config
+        user_directory, user_id = config.user_directory, config.user_id
+        if config.auth_mode == AUTH_MODE_JWT:
+            claims = _jwt_claims(config.jwt_token or "")
+            user_directory = claims.get(config.jwt_user_dir_claim)
+            user_id = claims.get(config.jwt_user_id_claim)
+            if user_id is None:
+                user_id = config.jwt_token
+        return "|".join(str(v or "") for v in (config.server_url, user_directory, user_id))
 
     def connect(self, app_id: Optional[str] = None) -> None:
         """
-        Connect to Engine API via WebSocket.
+        Connect to Engine API via WebSocket and bind it to the calling thread.
+
+        See ``_open_transport`` for endpoint selection and authentication.
+        """
+        self._close_socket("reconnect")
+        self._bind(self._open_transport(app_id))
+
+    def _open_transport(
+        self, app_id: Optional[str] = None, identity: Optional[str] = None,
+    ) -> EngineTransport:
+        """
+        Open an Engine WebSocket and wrap it in an ``EngineTransport``.
 
         In certificate mode, connects directly to the Engine port (4747) with
         an X-Qlik-User impersonation header and a loaded client cert chain.
@@ -74,6 +487,14 @@ class QlikEngineAPI:
         specific document immediately and avoids an extra OpenDoc round-trip.
         The global `/app/engineData` endpoint is still tried as a fallback so
         that global calls (GetDocList, etc.) keep working.
+
+        `identity` appends `/identity/<identity>` to the app endpoints so
+        the socket gets its own Engine session instead of joining the
+        user's default session for that app. Leased sessions use this to
+        run several sessions against one app side by side.
+
+        Does not bind the socket to any thread — the caller decides what
+        the new transport is used for.
         """
         from urllib.parse import quote, urlparse
         is_jwt = self.config.auth_mode == AUTH_MODE_JWT
@@ -103,6 +524,8 @@ class QlikEngineAPI:
             if self.jwt_session.csrf_token:
                 jwt_csrf_qs = f"?qlik-csrf-token={quote(self.jwt_session.csrf_token, safe='')}"
 
+        identity_path = f"/identity/{quote(identity, safe='')}" if identity else ""
+
         # Build endpoint list — per-app first if app_id is given.
         endpoints_all: List[str] = []
         if is_jwt:
@@ -113,22 +536,22 @@ class QlikEngineAPI:
             if app_id:
                 enc = quote(app_id, safe="")
                 endpoints_all.append(
-                    f"wss://{server_netloc}/{prefix}/app/{enc}{jwt_csrf_qs}"
+                    f"wss://{server_netloc}/{prefix}/app/{enc}{identity_path}{jwt_csrf_qs}"
                 )
             endpoints_all.extend([
-                f"wss://{server_netloc}/{prefix}/app/engineData{jwt_csrf_qs}",
+                f"wss://{server_netloc}/{prefix}/app/engineData{identity_path}{jwt_csrf_qs}",
                 f"wss://{server_netloc}/{prefix}/app{jwt_csrf_qs}",
             ])
         else:
             if app_id:
                 enc = quote(app_id, safe="")
                 endpoints_all.append(
-                    f"wss://{server_host}:{self.config.engine_port}/app/{enc}"
+                    f"wss://{server_host}:{self.config.engine_port}/app/{enc}{identity_path}"
                 )
             endpoints_all.extend([
-                f"wss://{server_host}:{self.config.engine_port}/app/engineData",
+                f"wss://{server_host}:{self.config.engine_port}/app/engineData{identity_path}",
                 f"wss://{server_host}:{self.config.engine_port}/app",
-                f"ws://{server_host}:{self.config.engine_port}/app/engineData",
+                f"ws://{server_host}:{self.config.engine_port}/app/engineData{identity_path}",
                 f"ws://{server_host}:{self.config.engine_port}/app",
             ])
         # ws_retries controls how many fallback endpoints to try; always at
@@ -182,30 +605,32 @@ class QlikEngineAPI:
 
         last_error = None
         jwt_retried = False  # one re-bootstrap per connect() call
+        ws = None
         i = 0
         while i < len(endpoints_to_try):
             url = endpoints_to_try[i]
             try:
                 if url.startswith("wss://"):
-                    self.ws = websocket.create_connection(
+                    ws = websocket.create_connection(
                         url, sslopt={"context": ssl_context}, header=headers, timeout=self.ws_timeout_seconds
                     )
                 else:
-                    self.ws = websocket.create_connection(
+                    ws = websocket.create_connection(
                         url, header=headers, timeout=self.ws_timeout_seconds
                     )
 
                 # initial recv to establish session
-                self.ws.recv()
-                return  # Success
+                ws.recv()
+                # From here on the transport's reader thread owns recv().
+                return EngineTransport(ws, name=f"engine-{identity}" if identity else "engine")
             except websocket.WebSocketBadStatusException as e:
                 last_error = e
-                if self.ws:
+                if ws:
                     try:
-                        self.ws.close()
+                        ws.close()
                     except Exception:
                         pass
-                    self.ws = None
+                    ws = None
                 # On a stale JWT session we see 401 (cookie expired) or 403
                 # (CSRF stale under CSWSH). Re-bootstrap once and retry the
                 # same URL — symmetric to the QRS 401-retry path. If we are
@@ -239,12 +664,12 @@ class QlikEngineAPI:
                 i += 1
             except Exception as e:
                 last_error = e
-                if self.ws:
+                if ws:
                     try:
-                        self.ws.close()
+                        ws.close()
                     except Exception:
                         pass
-                    self.ws = None
+                    ws = None
                 i += 1
 
         raise QlikConnectionError(
@@ -252,88 +677,455 @@ class QlikEngineAPI:
         )
 
     def disconnect(self) -> None:
-        """Disconnect from Engine API."""
-        self._invalidate_cache()
-        if self.ws:
+        """Disconnect from Engine API, closing every pooled document."""
+        self._stop_sweeper()
+        with self._leases_lock:
+            leases = list(self._leases.values())
+            self._leases.clear()
+        for group in leases:
+            group.close()
+        self._pool.close_all()
+        self._warm_cubes.clear()
+        self._close_socket("disconnect")
+
+    @property
+    def ws(self) -> Any:
+        """WebSocket bound to the calling thread, if any."""
+        transport = self._active_transport()
+        return transport.ws if transport is not None else None
+
+    def _binding(self) -> Tuple[Optional[EngineTransport], Optional[EngineSession], bool]:
+        """``(transport, session, leased)`` bound to the calling thread."""
+        return getattr(self._local, "binding", (None, None, False))
+
+    def _bind(
+        self, transport: Optional[EngineTransport],
+        session: Optional[EngineSession] = None, leased: bool = False,
+    ) -> Tuple[Optional[EngineTransport], Optional[EngineSession], bool]:
+        """
+        Point this thread's Engine calls at ``transport``; returns the previous binding.
+
+        A pooled ``session`` must already be acquired from the pool; the
+        previous pooled session is released.
+        """
+        previous = self._binding()
+        self._local.binding = (transport, session, leased)
+        _, old_session, old_leased = previous
+        if old_session is not None and not old_leased:
+            self._pool.release(old_session)
+        return previous
+
+    def release_thread(self) -> None:
+        """
+        Unbind the calling thread from its pooled session at the end of a
+        tool call, so the pool may evict the session again.
+        """
+        _, session, leased = self._binding()
+        if session is not None and not leased:
+            self._bind(None)
+
+    def _close_socket(self, reason: str) -> None:
+        """Close this thread's socket unless a pool owns it, then unbind."""
+        transport, session, _ = self._bind(None)
+        if transport is not None and session is None:
+            transport.close(reason)
+
+    def _close_engine_session(self, session: EngineSession) -> None:
+        """Pool eviction callback: CloseDoc, then close the socket."""
+        if not session.transport.closed:
             try:
-                self.ws.close()
-            except Exception:
-                pass
-            self.ws = None
-
-    def _invalidate_cache(self) -> None:
-        """Reset cached app state."""
-        self._cached_app_id = None
-        self._cached_app_handle = -1
-        self._cached_has_data = False
-
-    def _is_connected(self) -> bool:
-        """Check if WebSocket connection is alive."""
-        if not self.ws or not self.ws.connected:
-            return False
+                _, future = session.transport.submit("CloseDoc", [], session.app_handle)
+                future.result(timeout=min(self.ws_timeout_seconds, DOC_CLOSE_TIMEOUT))
+            except Exception as e:
+                logger.debug("CloseDoc for app %s failed: %s", session.app_id, e)
+        session.transport.close("document evicted from pool")
+
+    def _close_pooled_session(self, session: EngineSession) -> None:
+        """Pool eviction callback; an app leaving the pool takes its leases along."""
+        self._close_engine_session(session)
+        if session.app_id not in self._pool:
+            with self._leases_lock:
+                group = self._leases.pop(session.app_id, None)
+            if group is not None:
+                group.close()
+
+    def _evict_idle(self) -> None:
+        self._pool.evict_idle()
+        with self._leases_lock:
+            groups = list(self._leases.values())
+        for group in groups:
+            group.evict_idle(self._pool.idle_ttl)
+
+    # ─── session objects and the sweeper ──────────────────────────────
+
+    def _new_object_scope(self) -> SessionObjectScope:
+        """A scope the caller must ``close()``; see ``_object_scope``."""
+        return SessionObjectScope(
+            self._orphans, min(self.ws_timeout_seconds, DOC_CLOSE_TIMEOUT)
+        )
+
+    @contextmanager
+    def _object_scope(self) -> Iterator[SessionObjectScope]:
+        """Destroy every session object created through the scope on exit."""
+        scope = self._new_object_scope()
         try:
-            self.ws.ping()
-            return True
-        except Exception:
-            return False
+            yield scope
+        finally:
+            scope.close()
+
+    def _create_session_object(
+        self, scope: SessionObjectScope, obj_def: Dict[str, Any], app_handle: int,
+        prefix: str, timeout: float = None,
+    ) -> Dict[str, Any]:
+        """
+        ``CreateSessionObject`` under a unique ``qId`` registered in ``scope``.
+
+        Returns the raw result, like ``send_request``.
+        """
+        qid = new_object_id(prefix)
+        obj_def.setdefault("qInfo", {})["qId"] = qid
+        transport = self._require_transport()
+        result = self.send_request("CreateSessionObject", [obj_def], handle=app_handle,
+                                   timeout=timeout)
+        if result.get("qReturn", {}).get("qHandle") is not None:
+            scope.add(transport, app_handle, qid)
+        return result
+
+    def _checkout_cube(
+        self, scope: SessionObjectScope, hypercube_def: Dict[str, Any], app_handle: int,
+        prefix: str, timeout: float = None,
+    ) -> Tuple[Optional[WarmCube], Dict[str, Any]]:
+        """
+        Get a HyperCube session object carrying ``hypercube_def``.
+
+        Reuses an idle cube on this socket by replacing its
+        ``/qHyperCubeDef`` with ``ApplyPatches``; otherwise creates one.
+        The cube is registered in ``scope`` so it is destroyed if the call
+        fails; hand it back with ``_checkin_cube`` once its data is read.
+        Returns ``(cube, raw_result)`` — ``cube`` is None when
+        ``CreateSessionObject`` returned no handle.
+        """
+        transport = self._require_transport()
+        cube = self._warm_cubes.checkout(transport, app_handle)
+        if cube is not None:
+            scope.add(transport, app_handle, cube.qid)
+            patch = {"qOp": "replace", "qPath": "/qHyperCubeDef",
+                     "qValue": json.dumps(hypercube_def)}
+            result = self.send_request("ApplyPatches", [[patch], False],
+                                       handle=cube.handle, timeout=timeout)
+            return cube, result
+
+        obj_def = {"qInfo": {"qType": "HyperCube"}, "qHyperCubeDef": hypercube_def}
+        result = self._create_session_object(scope, obj_def, app_handle, prefix,
+                                             timeout=timeout)
+        handle = result.get("qReturn", {}).get("qHandle")
+        if handle is None:
+            return None, result
+        return WarmCube(transport, app_handle, obj_def["qInfo"]["qId"], handle), result
+
+    def _checkin_cube(self, scope: SessionObjectScope, cube: WarmCube) -> None:
+        """Keep ``cube`` warm for the next query (destroyed with ``scope`` if the pool is full)."""
+        if self._warm_cubes.checkin(cube):
+            scope.release(cube.qid)
+
+    def _start_sweeper(self) -> None:
+        if self.sweep_interval <= 0:
+            return
+        with self._leases_lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._sweeper_stop.clear()
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, name="qlik-engine-sweeper", daemon=True
+            )
+            self._sweeper.start()
+
+    def _stop_sweeper(self) -> None:
+        self._sweeper_stop.set()
+        sweeper = self._sweeper
+        if sweeper is not None and sweeper is not threading.current_thread():
+            sweeper.join(timeout=DOC_CLOSE_TIMEOUT)
+
+    def _sweep_loop(self) -> None:
+        while not self._sweeper_stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning("Engine sweeper failed: %s", e)
+
+    def sweep(self) -> Dict[str, Any]:
+        """
+        One maintenance pass; the background sweeper runs it periodically.
+
+        Closes documents idle past ``QLIK_DOC_IDLE_TTL``, retries session
+        objects whose destroy failed, and recycles idle pooled connections
+        holding more than ``QLIK_MAX_LIVE_HANDLES`` object handles —
+        handles from ``GetObject`` are only freed when the Engine session
+        ends. The next call against a recycled app reopens it.
+        """
+        self._evict_idle()
+        pending_orphans = self._orphans.retry(min(self.ws_timeout_seconds, DOC_CLOSE_TIMEOUT))
+        recycled = []
+        if self.max_live_handles > 0:
+            for session in self._pool.sessions():
+                if (not session.in_use
+                        and session.transport.live_handles > self.max_live_handles
+                        and session.idle_seconds() >= max(self.sweep_interval, 1.0)):
+                    logger.info("Recycling Engine connection for app %s (%d live handles)",
+                                session.app_id, session.transport.live_handles)
+                    if self._pool.discard(session.app_id, session) is not None:
+                        recycled.append(session.app_id)
+        return {"orphaned_objects": pending_orphans, "recycled": recycled}
 
     def ensure_app(self, app_id: str, no_data: bool = False) -> int:
         """
-        Get app handle, reusing cached connection when possible.
+        Get app handle, reusing a pooled connection when possible.
 
-        Returns app_handle. Reconnects automatically on stale connections.
-        If cached connection was opened without data but data is now needed,
-        reconnects with data.
+        Every opened document keeps its own WebSocket in the session pool,
+        so switching between apps does not re-run OpenDoc. Returns
+        app_handle. Reconnects automatically on stale connections. If the
+        pooled connection was opened without data but data is now needed,
+        reopens it with data.
         """
+        self._start_sweeper()
+        with self._app_lock(app_id):
+            return self._ensure_app(app_id, no_data)
+
+    def _app_lock(self, app_id: str) -> threading.Lock:
+        with self._leases_lock:
+            lock = self._app_locks.get(app_id)
+            if lock is None:
+                lock = self._app_locks[app_id] = threading.Lock()
+            return lock
+
+    def _ensure_app(self, app_id: str, no_data: bool) -> int:
         needs_data = not no_data
+        self._evict_idle()
+
+        session = self._pool.acquire(app_id)
+        if session is not None:
+            if (not needs_data or session.has_data) and session.is_alive():
+                session.touch()
+                self._bind(session.transport, session)
+                logger.debug("Reusing pooled connection for app %s (handle=%d)",
+                             app_id, session.app_handle)
+                return session.app_handle
+            self._pool.discard(app_id, session)
+            self._pool.release(session)
 
-        # Check if we can reuse the cached connection
-        if (self._cached_app_id == app_id
-                and self._cached_app_handle != -1
-                and (not needs_data or self._cached_has_data)
-                and self._is_connected()):
-            logger.debug("Reusing cached connection for app %s (handle=%d)",
-                         app_id, self._cached_app_handle)
-            return self._cached_app_handle
-
-        # Need to (re)connect — close old connection first
         logger.info("Opening new Engine connection for app %s (no_data=%s)", app_id, no_data)
-        self.disconnect()
-        # Pass app_id so connect() uses the per-app WebSocket endpoint first
-        self.connect(app_id=app_id)
+        self._pool.make_room()
+        # Pass app_id so the per-app WebSocket endpoint is tried first.
+        transport = self._open_transport(app_id)
+        self._bind(transport)
 
-        app_result = self.open_doc(app_id, no_data=no_data)
+        t_open = time.monotonic()
+        try:
+            app_result = self.open_doc(app_id, no_data=no_data)
+        except Exception:
+            self._close_socket("OpenDoc failed")
+            raise
         handle = app_result.get("qReturn", {}).get("qHandle", -1)
         if handle == -1:
-            self.disconnect()
+            self._close_socket("OpenDoc returned no handle")
             raise Exception(f"Failed to open app {app_id}: {app_result}")
 
-        self._cached_app_id = app_id
-        self._cached_app_handle = handle
-        self._cached_has_data = not no_data
+        session = EngineSession(
+            app_id, transport, handle, has_data=needs_data,
+            open_seconds=time.monotonic() - t_open,
+        )
+        self._pool.add(session, acquire=True)
+        self._bind(transport, session)
         return handle
 
-    def _set_socket_timeout(self, timeout: float) -> None:
-        """Set timeout on the underlying WebSocket socket."""
-        if self.ws and self.ws.sock:
-            self.ws.sock.settimeout(timeout)
+    @contextmanager
+    def lease(self, app_id: str, timeout: float = None) -> Iterator[int]:
+        """
+        Run a block on an Engine session leased exclusively for ``app_id``.
+
+        Yields the app handle valid on the leased session; every Engine
+        call made from this thread inside the block goes to that session.
+        Up to ``QLIK_SESSIONS_PER_APP`` sessions per app are opened on
+        demand, each with its own ``/identity/...`` so the Engine treats
+        them as separate sessions and computes their requests in parallel.
+        When all are leased, callers wait in arrival order for at most
+        ``timeout`` seconds (default ``QLIK_WS_TIMEOUT``). With
+        ``QLIK_SESSIONS_PER_APP=0`` the block simply runs on the pooled
+        session returned by ``ensure_app``.
+        """
+        # Set the caller's binding aside (its pooled session stays in use)
+        # and restore it when the block ends, releasing whatever the block
+        # bound, so lease() on a worker thread leaves nothing acquired.
+        previous = self._binding()
+        self._local.binding = (None, None, False)
+        try:
+            # The pooled session tracks the app for LRU / idle eviction and
+            # proves the app opens at all before extra sessions are spent on it.
+            handle = self.ensure_app(app_id, no_data=False)
+            if self.sessions_per_app <= 0:
+                yield handle
+                return
+
+            with self._leases_lock:
+                group = self._leases.get(app_id)
+                if group is None:
+                    group = AppSessionLeases(
+                        app_id, self.sessions_per_app,
+                        open_session=lambda: self._open_leased_session(app_id),
+                        close_session=self._close_engine_session,
+                    )
+                    self._leases[app_id] = group
+            session = group.acquire(timeout if timeout is not None else self.ws_timeout_seconds)
+            self._bind(session.transport, session, leased=True)
+            try:
+                yield session.app_handle
+            finally:
+                group.release(session)
+        finally:
+            self._bind(*previous)
+
+    def _open_leased_session(self, app_id: str) -> EngineSession:
+        """Open a separate Engine session on ``app_id`` for ``lease()``."""
+        identity = f"{self._identity_prefix}-{next(self._identity_seq)}"
+        logger.info("Opening leased Engine session %s for app %s", identity, app_id)
+        transport = self._open_transport(app_id, identity=identity)
+        t_open = time.monotonic()
+        try:
+            req_id, future = transport.submit("OpenDoc", [app_id])
+            result = self._await_response(
+                transport, req_id, future, "OpenDoc", -1, self.ws_operation_timeout
+            )
+            handle = result.get("qReturn", {}).get("qHandle", -1)
+            if handle == -1:
+                raise Exception(f"Failed to open app {app_id}: {result}")
+        except Exception:
+            transport.close("OpenDoc failed")
+            raise
+        return EngineSession(
+            app_id, transport, handle, has_data=True,
+            open_seconds=time.monotonic() - t_open, identity=identity,
+        )
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Open documents in the pool with per-entry open time, hits and idle time."""
+        stats = self._pool.stats()
+        with self._leases_lock:
+            groups = list(self._leases.values())
+        stats["sessions_per_app"] = self.sessions_per_app
+        stats["leases"] = [group.stats() for group in groups]
+        live: Dict[str, int] = {}
+        for session in self._pool.sessions() + [s for g in groups for s in g.sessions()]:
+            live[session.app_id] = live.get(session.app_id, 0) + session.transport.live_handles
+        stats["live_handles"] = live
+        stats["orphaned_objects"] = len(self._orphans)
+        stats["warm_cubes"] = self._warm_cubes.stats()
+        stats["result_cache"] = self.result_cache.stats()
+        stats["metadata_cache"] = self.metadata_cache.stats()
+        stats["persistent_cache"] = (self.persistent_cache.stats()
+                                     if self.persistent_cache is not None else None)
+        return stats
 
     def _kill_socket(self) -> None:
-        """Force-close the WebSocket and invalidate the cached app handle.
+        """Force-close the WebSocket and drop its document from the pool.
 
         Called whenever the socket is in an unrecoverable state — after a
         timeout, after a stray-frame parse error, etc. The next ensure_app()
-        will open a fresh connection. Without this, a single timed-out
-        request leaves stale data sitting in the recv buffer that the next
-        send_request would mistake for its own response.
+        will open a fresh connection.
+        """
+        transport, session, leased = self._bind(None)
+        if transport is None:
+            return
+        if session is not None and not leased:
+            self._pool.discard(session.app_id, session, close=False)
+        # A leased session is dropped by lease() on release once its
+        # transport is closed.
+        transport.close("killed after unrecoverable error")
+
+    def _active_transport(self) -> Optional[EngineTransport]:
+        """The transport bound to the calling thread (leased or pooled)."""
+        return self._binding()[0]
+
+    def _require_transport(self) -> EngineTransport:
+        transport = self._active_transport()
+        if transport is None or transport.closed:
+            raise ConnectionError("Not connected to Engine API")
+        return transport
+
+    def _await_response(
+        self, transport: EngineTransport, req_id: int, future: Future,
+        method: str, handle: int, timeout: float,
+    ) -> Dict[str, Any]:
+        """Wait for one submitted request and unwrap its JSON-RPC result."""
+        try:
+            response = future.result(timeout=max(timeout, 0.0))
+        except FutureTimeoutError as e:
+            # Abort the request on the Engine and keep the socket: closing
+            # it would throw away the open document and make the next call
+            # pay a full reconnect plus OpenDoc.
+            cancelled = transport.cancel(req_id)
+            raise TimeoutError(
+                f"WebSocket recv() timed out after {timeout:.1f}s "
+                f"waiting for response to Engine method '{method}' "
+                f"(handle={handle}, req_id={req_id}). "
+                + ("The request was cancelled on the Engine; the connection "
+                   "and open app are kept. " if cancelled else "")
+                + "Increase QLIK_WS_TIMEOUT if the operation is legitimately heavy."
+            ) from e
+        except ConnectionError:
+            # Transport already closed itself; drop the pooled app handle.
+            if self._active_transport() is transport:
+                self._kill_socket()
+            raise
+
+        if "error" in response:
+            raise Exception(
+                f"Engine API error for method '{method}' (handle={handle}): {response['error']}"
+            )
+        return response.get("result", {})
+
+    def submit(self, method: str, params: Any = None, handle: int = -1) -> Future:
+        """
+        Send one request without waiting and return a ``Future``.
+
+        Thread-safe: goes to the socket bound to the calling thread (see
+        ``ensure_app`` / ``lease``), so the future may then be handed to
+        and awaited on any thread. It resolves to the call's ``result``
+        dict, or raises ``Exception`` for an Engine error and
+        ``ConnectionError`` if the socket drops first. There is no
+        built-in timeout — pass one to ``future.result()``.
         """
-        self._invalidate_cache()
-        if self.ws:
+        return self._submit_on(self._require_transport(), method, params, handle)[1]
+
+    def _submit_on(
+        self, transport: EngineTransport, method: str, params: Any = None, handle: int = -1,
+        transform: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ) -> Tuple[int, Future]:
+        """``submit`` on an explicit transport; returns ``(req_id, future)``.
+
+        ``transform`` maps the ``result`` dict before it resolves the future.
+        """
+        req_id, raw = transport.submit(method, params, handle)
+        result: Future = Future()
+
+        def _unwrap(done: Future) -> None:
             try:
-                self.ws.close()
-            except Exception:
-                pass
-            self.ws = None
+                response = done.result()
+            except Exception as e:
+                result.set_exception(e)
+                return
+            if "error" in response:
+                result.set_exception(Exception(
+                    f"Engine API error for method '{method}' (handle={handle}): {response['error']}"
+                ))
+                return
+            try:
+                value = response.get("result", {})
+                result.set_result(transform(value) if transform else value)
+            except Exception as e:
+                result.set_exception(e)
+
+        raw.add_done_callback(_unwrap)
+        return req_id, result
 
     def send_request(
         self, method: str, params: List[Any] = None, handle: int = -1,
@@ -342,138 +1134,76 @@ class QlikEngineAPI:
         """
         Send JSON-RPC 2.0 request to Qlik Engine API and return response.
 
-        Strict id-matching: every received frame is parsed and only the
-        frame whose `id` matches our `req_id` is treated as the answer.
-        Stray frames (notifications, late replies to a previous timed-out
-        call, OnConnected events) are logged and skipped.
+        The request goes through the pipelined ``EngineTransport``: its
+        reader thread matches every reply to the request ``id``, so
+        notifications and late replies to earlier timed-out calls can never
+        be mistaken for this call's answer.
 
-        On any timeout or socket error the WebSocket is force-closed via
-        `_kill_socket()` so the next call gets a fresh connection — this
-        prevents the "WebSocket recv() failed" cascade after a single slow
-        hypercube.
+        On timeout the request is cancelled on the Engine
+        (``CancelRequest``) and the connection is kept. On a socket error
+        the WebSocket is force-closed via `_kill_socket()` so the next call
+        gets a fresh connection.
 
         Args:
             method: Engine API method name
             params: Method parameters list
             handle: Object handle for scoped operations (-1 for global)
-            timeout: Override socket timeout for this request (seconds)
+            timeout: Override timeout for this request (seconds)
         """
-        import socket as _socket
-        if not self.ws:
-            raise ConnectionError("Not connected to Engine API")
+        transport = self._require_transport()
+        effective_timeout = timeout if timeout is not None else self.ws_timeout_seconds
+        try:
+            req_id, future = transport.submit(method, params, handle)
+        except ConnectionError:
+            self._kill_socket()
+            raise
+        return self._await_response(
+            transport, req_id, future, method, handle, effective_timeout
+        )
+
+    def send_requests(
+        self, calls: List[Tuple[str, Any, int]], timeout: float = None,
+    ) -> List[Any]:
+        """
+        Send several independent requests pipelined and collect the replies.
+
+        All frames are written before the first reply is awaited, so the
+        batch costs one round trip instead of ``len(calls)``. ``timeout``
+        is a deadline for the whole batch.
+
+        Args:
+            calls: ``(method, params, handle)`` tuples.
+            timeout: Seconds to wait for the whole batch (default
+                ``QLIK_WS_TIMEOUT``).
 
+        Returns:
+            One entry per call, in order: the call's ``result`` dict, or the
+            ``Exception`` it failed with (Engine errors do not abort the
+            rest of the batch).
+        """
+        transport = self._require_transport()
         effective_timeout = timeout if timeout is not None else self.ws_timeout_seconds
-        if timeout is not None:
-            self._set_socket_timeout(timeout)
-
-        req_id = self._get_next_request_id()
-        request = {
-            "jsonrpc": "2.0",
-            "id": req_id,
-            "handle": handle,
-            "method": method,
-            "params": params or [],
-        }
+        deadline = time.monotonic() + effective_timeout
 
-        response: Optional[Dict[str, Any]] = None
-        try:
+        submitted = []
+        for method, params, handle in calls:
             try:
-                self.ws.send(json.dumps(request))
-            except (_socket.timeout, TimeoutError) as e:
-                self._kill_socket()
-                raise TimeoutError(
-                    f"WebSocket send() timed out after {effective_timeout:.1f}s "
-                    f"for Engine method '{method}' (handle={handle}, req_id={req_id})"
-                ) from e
-            except Exception as e:
-                self._kill_socket()
-                raise ConnectionError(
-                    f"WebSocket send() failed for Engine method '{method}' "
-                    f"(handle={handle}, req_id={req_id}): {type(e).__name__}: {e}"
-                ) from e
-
-            # Strict id-matching loop. Skip notifications and stale replies
-            # from previous timed-out requests until we see our own id.
-            stray_frames = 0
-            try:
-                while True:
-                    data = self.ws.recv()
-                    try:
-                        frame = json.loads(data)
-                    except Exception as parse_err:
-                        # Unparseable frame — socket state is suspect.
-                        self._kill_socket()
-                        raise ConnectionError(
-                            f"Failed to parse WebSocket frame for method "
-                            f"'{method}' (req_id={req_id}): {parse_err}"
-                        ) from parse_err
-
-                    frame_id = frame.get("id")
-                    if frame_id == req_id:
-                        response = frame
-                        break
-
-                    # Stray frame: notification (no id), or a late reply to
-                    # an earlier request whose recv() timed out. Log and
-                    # keep reading.
-                    if frame_id is None:
-                        # Engine notifications: OnConnected, OnAuthenticated,
-                        # OnSessionTimedOut, change events. Harmless.
-                        logger.debug(
-                            "send_request[%s req_id=%d]: skipping notification: %s",
-                            method, req_id, frame.get("method", "<no-method>"),
-                        )
-                    else:
-                        logger.warning(
-                            "send_request[%s req_id=%d]: discarding stale frame "
-                            "with id=%s (likely a late reply to a previously "
-                            "timed-out request)",
-                            method, req_id, frame_id,
-                        )
-                    stray_frames += 1
-                    if stray_frames > 100:
-                        # Sanity cap. Something is very wrong; bail out.
-                        self._kill_socket()
-                        raise ConnectionError(
-                            f"send_request[{method} req_id={req_id}]: "
-                            f"received {stray_frames} stray frames without a "
-                            f"matching id, killing connection"
-                        )
-            except (_socket.timeout, TimeoutError) as e:
-                self._kill_socket()
-                raise TimeoutError(
-                    f"WebSocket recv() timed out after {effective_timeout:.1f}s "
-                    f"waiting for response to Engine method '{method}' "
-                    f"(handle={handle}, req_id={req_id}). "
-                    f"Increase QLIK_WS_TIMEOUT if the operation is legitimately heavy."
-                ) from e
+                req_id, future = transport.submit(method, params, handle)
             except ConnectionError:
-                raise
-            except Exception as e:
                 self._kill_socket()
-                raise ConnectionError(
-                    f"WebSocket recv() failed for Engine method '{method}' "
-                    f"(handle={handle}, req_id={req_id}): {type(e).__name__}: {e}"
-                ) from e
-        finally:
-            if timeout is not None and self.ws is not None:
-                try:
-                    self._set_socket_timeout(self.ws_timeout_seconds)
-                except Exception:
-                    pass
-
-        if response is None:
-            # Should be unreachable — the loop only exits via break or raise.
-            raise ConnectionError(
-                f"send_request[{method} req_id={req_id}]: no response received"
-            )
-
-        if "error" in response:
-            raise Exception(
-                f"Engine API error for method '{method}' (handle={handle}): {response['error']}"
-            )
+                raise
+            submitted.append((req_id, future, method, handle))
 
-        return response.get("result", {})
+        results: List[Any] = []
+        for req_id, future, method, handle in submitted:
+            try:
+                results.append(self._await_response(
+                    transport, req_id, future, method, handle,
+                    deadline - time.monotonic(),
+                ))
+            except Exception as e:
+                results.append(e)
+        return results
 
     def get_doc_list(self) -> List[Dict[str, Any]]:
         """Get list of available documents."""
@@ -672,14 +1402,17 @@ class QlikEngineAPI:
                 }
             }
 
-            create_result = self.send_request("CreateSessionObject", [sheet_list_def], handle=app_handle)
+            with self._object_scope() as scope:
+                create_result = self._create_session_object(
+                    scope, sheet_list_def, app_handle, "sheetlist"
+                )
 
-            if "qReturn" not in create_result or "qHandle" not in create_result["qReturn"]:
-                logger.warning(f"Failed to create SheetList object: {create_result}")
-                return []
+                if "qReturn" not in create_result or "qHandle" not in create_result["qReturn"]:
+                    logger.warning(f"Failed to create SheetList object: {create_result}")
+                    return []
 
-            sheet_list_handle = create_result["qReturn"]["qHandle"]
-            layout_result = self.send_request("GetLayout", [], handle=sheet_list_handle)
+                sheet_list_handle = create_result["qReturn"]["qHandle"]
+                layout_result = self.send_request("GetLayout", [], handle=sheet_list_handle)
             if "qLayout" not in layout_result or "qAppObjectList" not in layout_result["qLayout"]:
                 logger.warning(f"No sheet list in layout: {layout_result}")
                 return []
@@ -829,21 +1562,37 @@ class QlikEngineAPI:
                 return []
 
             child_objects = sheet_layout["qLayout"]["qChildList"]["qItems"]
-            detailed_objects = []
+            children = [
+                (c.get("qInfo", {}).get("qId", ""), c.get("qInfo", {}).get("qType", ""), c)
+                for c in child_objects
+            ]
+            children = [c for c in children if c[0]]
 
-            for child_obj in child_objects:
-                obj_id = child_obj.get("qInfo", {}).get("qId", "")
-                obj_type = child_obj.get("qInfo", {}).get("qType", "")
-                if not obj_id:
+            # Two pipelined batches instead of 2*N sequential round trips:
+            # every GetObject first, then every GetLayout on the handles.
+            obj_results = self.send_requests(
+                [("GetObject", {"qId": obj_id}, app_handle) for obj_id, _, _ in children]
+            )
+            with_handles = []
+            for (obj_id, obj_type, child_obj), obj_result in zip(children, obj_results):
+                if isinstance(obj_result, Exception):
+                    logger.warning(f"Error processing object {obj_id}: {obj_result}")
+                    continue
+                if "qReturn" not in obj_result or "qHandle" not in obj_result["qReturn"]:
+                    continue
+                with_handles.append((obj_id, obj_type, child_obj, obj_result["qReturn"]["qHandle"]))
+
+            layouts = self.send_requests(
+                [("GetLayout", [], obj_handle) for _, _, _, obj_handle in with_handles]
+            )
+            detailed_objects = []
+            for (obj_id, obj_type, child_obj, _), obj_layout in zip(with_handles, layouts):
+                if isinstance(obj_layout, Exception):
+                    logger.warning(f"Error processing object {obj_id}: {obj_layout}")
+                    continue
+                if "qLayout" not in obj_layout:
                     continue
                 try:
-                    obj_result = self.send_request("GetObject", {"qId": obj_id}, handle=app_handle)
-                    if "qReturn" not in obj_result or "qHandle" not in obj_result["qReturn"]:
-                        continue
-                    obj_handle = obj_result["qReturn"]["qHandle"]
-                    obj_layout = self.send_request("GetLayout", [], handle=obj_handle)
-                    if "qLayout" not in obj_layout:
-                        continue
                     fields_used = self._extract_fields_from_object(obj_layout["qLayout"])
                     detailed_obj = {
                         "object_id": obj_id,
@@ -1001,6 +1750,91 @@ class QlikEngineAPI:
         )
         return result.get("qReturn", {})
 
+    def evaluate_expressions(
+        self,
+        app_id: str,
+        app_handle: int,
+        expressions: List[Any],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Evaluate many scalar expressions with one pipelined batch of ``EvaluateEx``.
+
+        ``expressions`` holds strings or ``{"name", "expression"}`` dicts.
+        Each result is cached on its own, keyed by the app's reload time and
+        the expression text, so a KPI asked for again (in any batch) is not
+        re-evaluated; only the misses are sent. Every entry of ``results``
+        is ``{name, expression, type: "number" | "text" | "null", value,
+        text, cache}`` or ``{name, expression, error}``.
+        """
+        t0 = time.monotonic()
+        if not expressions:
+            return {"error": "No expressions given", "error_category": "invalid_request"}
+        if len(expressions) > MAX_EVALUATE_EXPRESSIONS:
+            return {
+                "error": f"{len(expressions)} expressions exceed the limit of "
+                         f"{MAX_EVALUATE_EXPRESSIONS} per call",
+                "error_category": "limit_exceeded",
+            }
+        specs: List[Tuple[str, Any]] = []
+        for i, item in enumerate(expressions):
+            if not isinstance(item, dict):
+                item = {"expression": item}
+            specs.append((item.get("name") or f"expr_{i}", item.get("expression")))
+
+        op_timeout = timeout or self.ws_operation_timeout
+        use_cache = self.result_cache.enabled
+        reload_time = ""
+        if use_cache:
+            reload_time = self.get_app_reload_time(app_handle, timeout=op_timeout)
+            self.result_cache.note_version(app_id, reload_time)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(specs)
+        pending: List[Tuple[int, Optional[CacheKey]]] = []
+        hits = 0
+        for i, (name, expression) in enumerate(specs):
+            if not isinstance(expression, str) or not expression.strip():
+                results[i] = {"name": name, "expression": expression,
+                              "error": "Expression must be a non-empty string"}
+                continue
+            key = None
+            if use_cache:
+                key = (app_id, reload_time,
+                       request_hash({"kind": "evaluate", "expression": expression}))
+                cached = self.result_cache.get(key)
+                if cached is not None:
+                    results[i] = {"name": name, **cached, "cache": "hit"}
+                    hits += 1
+                    continue
+            pending.append((i, key))
+
+        replies = self.send_requests(
+            [("EvaluateEx", {"qExpression": specs[i][1]}, app_handle) for i, _ in pending],
+            timeout=op_timeout,
+        ) if pending else []
+        for (i, key), reply in zip(pending, replies):
+            name, expression = specs[i]
+            if isinstance(reply, Exception):
+                results[i] = {"name": name, "expression": expression,
+                              "error": str(reply) or repr(reply)}
+                continue
+            value = _typed_evaluation(reply.get("qValue", {}))
+            if "error" in value:
+                results[i] = {"name": name, "expression": expression, **value}
+                continue
+            entry = {"expression": expression, **value}
+            if key is not None:
+                self.result_cache.put(key, entry)
+            results[i] = {"name": name, **entry, "cache": "miss"}
+
+        return {
+            "results": results,
+            "evaluated": len(pending),
+            "cached": hits,
+            "failed": sum(1 for r in results if "error" in r),
+            "elapsed_seconds": round(time.monotonic() - t0, 3),
+        }
+
     def select_in_field(
         self, app_handle: int, field_name: str, values: List[str], toggle: bool = False
     ) -> bool:
@@ -1079,63 +1913,30 @@ class QlikEngineAPI:
         dimensions: List[Dict[str, Any]] = None,
         measures: List[Dict[str, Any]] = None,
         max_rows: int = 1000,
+        suppress_zero: bool = False,
+        timeout: Optional[float] = None,
+        calc_condition: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Create hypercube for data extraction with proper structure."""
+        """
+        Create hypercube for data extraction with proper structure.
+
+        ``timeout`` bounds each Engine request of the call (default
+        ``QLIK_WS_TIMEOUT``). Dimensions may carry ``top_n`` (see
+        ``_dimension_def``); ``calc_condition`` is passed as the cube's
+        ``qCalcCondition``. The result carries ``totals`` — the grand
+        total of every measure, computed in the same pass.
+        """
         import time
         import traceback as _tb
         step = "init"
         t0 = time.monotonic()
+        op_timeout = timeout if timeout is not None else self.ws_operation_timeout
+        # The cube is destroyed once its data is read, on error paths too.
+        scope = self._new_object_scope()
         try:
-            # Handle empty dimensions/measures
-            if dimensions is None:
-                dimensions = []
-            if measures is None:
-                measures = []
-
-            # Convert old format (list of strings) to new format (list of dicts) for backward compatibility
-            converted_dimensions = []
-            for dim in dimensions:
-                if isinstance(dim, str):
-                    # Old format - just field name
-                    converted_dimensions.append({
-                        "field": dim,
-                        "sort_by": {
-                            "qSortByNumeric": 0,
-                            "qSortByAscii": 1,  # Default: ASCII ascending
-                            "qSortByExpression": 0,
-                            "qExpression": ""
-                        }
-                    })
-                else:
-                    # New format - dict with field and sort options
-                    # Set defaults if not specified
-                    if "sort_by" not in dim:
-                        dim["sort_by"] = {
-                            "qSortByNumeric": 0,
-                            "qSortByAscii": 1,  # Default: ASCII ascending
-                            "qSortByExpression": 0,
-                            "qExpression": ""
-                        }
-                    converted_dimensions.append(dim)
-
-            converted_measures = []
-            for measure in measures:
-                if isinstance(measure, str):
-                    # Old format - just expression
-                    converted_measures.append({
-                        "expression": measure,
-                        "sort_by": {
-                            "qSortByNumeric": -1  # Default: numeric descending
-                        }
-                    })
-                else:
-                    # New format - dict with expression and sort options
-                    # Set defaults if not specified
-                    if "sort_by" not in measure:
-                        measure["sort_by"] = {
-                            "qSortByNumeric": -1  # Default: numeric descending
-                        }
-                    converted_measures.append(measure)
+            converted_dimensions, converted_measures = _normalize_cube_spec(
+                dimensions, measures
+            )
 
             # Hard limits enforced in our layer — NOT in Qlik Engine.
             # The intent is to force the LLM to design narrow, focused
@@ -1144,7 +1945,7 @@ class QlikEngineAPI:
             # client-side. If the LLM needs more data, it should issue
             # multiple well-scoped queries, not one giant one.
             HARD_MAX_ROWS = 5000
-            HARD_MAX_CELLS = 9900  # Qlik's own cell cap per NxPage is 10k
+            HARD_MAX_CELLS = MAX_PAGE_CELLS  # Qlik's own cell cap per NxPage is 10k
             n_cols = len(converted_dimensions) + len(converted_measures)
 
             # Reject max_rows over the hard cap.
@@ -1212,89 +2013,44 @@ class QlikEngineAPI:
                 n_cols * first_page_height, HARD_MAX_CELLS,
             )
 
-            # Create correct hypercube structure
-            hypercube_def = {
-                "qDimensions": [
-                    {
-                        "qDef": {
-                            "qFieldDefs": [dim["field"]],
-                            "qSortCriterias": [
-                                {
-                                    "qSortByState": 0,
-                                    "qSortByFrequency": 0,
-                                    "qSortByNumeric": dim["sort_by"].get("qSortByNumeric", 0),
-                                    "qSortByAscii": dim["sort_by"].get("qSortByAscii", 1),
-                                    "qSortByLoadOrder": 0,
-                                    "qSortByExpression": dim["sort_by"].get("qSortByExpression", 0),
-                                    "qExpression": {"qv": dim["sort_by"].get("qExpression", "")},
-                                }
-                            ],
-                        },
-                        "qNullSuppression": False,
-                        "qIncludeElemValue": True,
-                    }
-                    for dim in converted_dimensions
-                ],
-                "qMeasures": [
-                    {
-                        "qDef": {"qDef": measure["expression"], "qLabel": measure.get("label", f"Measure_{i}")},
-                        "qSortBy": measure["sort_by"],
-                    }
-                    for i, measure in enumerate(converted_measures)
-                ],
-                "qInitialDataFetch": [
-                    {
-                        "qTop": 0,
-                        "qLeft": 0,
-                        "qHeight": first_page_height,
-                        "qWidth": n_cols,
-                    }
-                ],
-                "qSuppressZero": False,
-                "qSuppressMissing": False,
-                "qMode": "S",
-                "qInterColumnSortOrder": list(range(n_cols)),
-            }
-
-            obj_def = {
-                "qInfo": {
-                    "qId": f"hypercube-{len(converted_dimensions)}d-{len(converted_measures)}m",
-                    "qType": "HyperCube",
-                },
-                "qHyperCubeDef": hypercube_def,
-            }
+            hypercube_def = _build_hypercube_def(
+                converted_dimensions, converted_measures, first_page_height,
+                suppress_zero=suppress_zero, calc_condition=calc_condition,
+            )
 
-            step = "CreateSessionObject"
+            step = "CreateSessionObject/ApplyPatches"
             logger.info(
                 "create_hypercube: %s (dims=%d, measures=%d, max_rows=%d, op_timeout=%.1fs)",
                 step, len(converted_dimensions), len(converted_measures),
-                max_rows, self.ws_operation_timeout,
+                max_rows, op_timeout,
             )
             t_step = time.monotonic()
-            result = self.send_request(
-                "CreateSessionObject", [obj_def], handle=app_handle,
-                timeout=self.ws_operation_timeout,
+            cube, result = self._checkout_cube(
+                scope, hypercube_def, app_handle,
+                f"hypercube-{len(converted_dimensions)}d-{len(converted_measures)}m",
+                timeout=op_timeout,
             )
-            logger.info("create_hypercube: %s done in %.2fs",
-                        step, time.monotonic() - t_step)
+            logger.info("create_hypercube: %s done in %.2fs (warm=%s)",
+                        step, time.monotonic() - t_step, bool(cube and cube.uses))
 
-            if "qReturn" not in result or "qHandle" not in result["qReturn"]:
+            if cube is None:
                 return {
                     "error": "Failed to create hypercube session object",
                     "step": step,
                     "response": result,
                 }
 
-            cube_handle = result["qReturn"]["qHandle"]
+            cube_handle = cube.handle
 
             # Get layout with data
             step = "GetLayout"
             logger.info("create_hypercube: %s (cube_handle=%d)", step, cube_handle)
             t_step = time.monotonic()
             layout = self.send_request("GetLayout", [], handle=cube_handle,
-                                       timeout=self.ws_operation_timeout)
+                                       timeout=op_timeout)
             logger.info("create_hypercube: %s done in %.2fs",
                         step, time.monotonic() - t_step)
+            self._checkin_cube(scope, cube)
 
             if "qLayout" not in layout or "qHyperCube" not in layout["qLayout"]:
                 return {
@@ -1304,6 +2060,20 @@ class QlikEngineAPI:
                 }
 
             hypercube = layout["qLayout"]["qHyperCube"]
+            cube_error = hypercube.get("qError")
+            if cube_error:
+                unmet = cube_error.get("qErrorCode") == CALC_CONDITION_UNFULFILLED
+                return {
+                    "error": (
+                        f"Calculation condition not met: {calc_condition}" if unmet
+                        else f"Engine could not compute the hypercube (qErrorCode="
+                             f"{cube_error.get('qErrorCode')})"
+                    ),
+                    "error_category": "calc_condition_unmet" if unmet else "engine_object_error",
+                    "failed_step": step,
+                    "engine_error": cube_error,
+                    "calc_condition_message": hypercube.get("qCalcCondMsg") or None,
+                }
             total_rows_on_server = hypercube.get("qSize", {}).get("qcy", 0)
             total_cols = hypercube.get("qSize", {}).get("qcx", n_cols)
 
@@ -1333,13 +2103,22 @@ class QlikEngineAPI:
                 )
 
             return {
-                "hypercube_handle": cube_handle,
                 "hypercube_data": hypercube,
                 "dimensions": converted_dimensions,
                 "measures": converted_measures,
                 "total_rows": total_rows_on_server,
                 "returned_rows": rows_fetched,
                 "total_columns": total_cols,
+                "totals": [
+                    {
+                        "label": info.get("qFallbackTitle", f"Measure_{i}"),
+                        "value": hypercube_cell_value(cell, True),
+                        "text": cell.get("qText"),
+                    }
+                    for i, (info, cell) in enumerate(zip(
+                        hypercube.get("qMeasureInfo", []), hypercube.get("qGrandTotalRow", []),
+                    ))
+                ],
                 "hard_max_rows": HARD_MAX_ROWS,
                 "truncation_warning": truncation_warning,
             }
@@ -1353,19 +2132,12 @@ class QlikEngineAPI:
             if isinstance(e, (_socket.timeout, TimeoutError)):
                 category = "socket_timeout"
                 hint = (
-                    f"WebSocket recv() timed out after ~{self.ws_operation_timeout:.0f}s on step '{step}'. "
+                    f"WebSocket recv() timed out after ~{op_timeout:.0f}s on step '{step}'. "
                     f"Increase QLIK_WS_OPERATION_TIMEOUT or simplify the hypercube "
                     f"(fewer dimensions/measures, smaller max_rows, lighter expressions)."
                 )
-                # Timeout on recv leaves the socket in an inconsistent state —
-                # invalidate cache so the next call opens a fresh connection.
-                self._invalidate_cache()
-                try:
-                    if self.ws:
-                        self.ws.close()
-                except Exception:
-                    pass
-                self.ws = None
+                # send_request already cancelled the request on the Engine;
+                # the socket and the open app stay usable for the next call.
             elif err_msg.startswith("Engine API error:"):
                 category = "engine_api_error"
                 hint = "Qlik Engine rejected the request (bad expression, missing field, etc)."
@@ -1387,11 +2159,874 @@ class QlikEngineAPI:
                 "error_category": category,
                 "failed_step": step,
                 "elapsed_seconds": round(elapsed, 2),
-                "ws_operation_timeout": self.ws_operation_timeout,
+                "ws_operation_timeout": op_timeout,
                 "hint": hint,
                 "traceback": tb,
                 "details": "Error in create_hypercube method",
             }
+        finally:
+            scope.close()
+
+    def get_app_reload_time(self, app_handle: int, timeout: Optional[float] = None) -> str:
+        """``qLastReloadTime`` of the open app (empty string if never reloaded)."""
+        layout = self.send_request("GetAppLayout", [], handle=app_handle, timeout=timeout)
+        return layout.get("qLayout", {}).get("qLastReloadTime", "") or ""
+
+    def cached_hypercube(
+        self,
+        app_id: str,
+        app_handle: int,
+        dimensions: List[Any] = None,
+        measures: List[Any] = None,
+        max_rows: int = 1000,
+        suppress_zero: bool = False,
+        timeout: Optional[float] = None,
+        calc_condition: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        ``create_hypercube`` through the in-process result cache.
+
+        The key is the app id, the app's ``qLastReloadTime`` and a hash of
+        the normalized dimensions, measures (with their sorting) and
+        ``max_rows``, so a reload invalidates every cached result of the
+        app. Error results are not cached. The result carries
+        ``cache: "hit" | "miss"``.
+        """
+        if not self.result_cache.enabled:
+            return self.create_hypercube(app_handle, dimensions, measures, max_rows,
+                                         suppress_zero, timeout, calc_condition)
+        dims, meas = _normalize_cube_spec(dimensions, measures)
+        request = {"kind": "hypercube", "dimensions": dims, "measures": meas, "max_rows": max_rows,
+                   **({"suppress_zero": True} if suppress_zero else {}),
+                   **({"calc_condition": calc_condition} if calc_condition else {})}
+        return self._through_result_cache(
+            app_id, app_handle, request,
+            lambda: self.create_hypercube(app_handle, dims, meas, max_rows, suppress_zero,
+                                          timeout, calc_condition),
+            timeout,
+        )
+
+    def _through_result_cache(
+        self,
+        app_id: str,
+        app_handle: int,
+        request: Dict[str, Any],
+        compute: Callable[[], Dict[str, Any]],
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Serve ``request`` from the result cache or ``compute()`` and store it."""
+        reload_time = self.get_app_reload_time(app_handle, timeout=timeout)
+        self.result_cache.note_version(app_id, reload_time)
+        key = (app_id, reload_time, request_hash(request))
+        result = self.result_cache.get(key)
+        if result is not None:
+            result["cache"] = "hit"
+            return result
+        result = compute()
+        if "error" not in result:
+            self.result_cache.put(key, result)
+        result["cache"] = "miss"
+        return result
+
+    def create_reduced_hypercube(
+        self,
+        app_handle: int,
+        dimensions: List[Any] = None,
+        measures: List[Any] = None,
+        reduction: str = "line",
+        target_points: int = 1000,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        A bounded, representative version of a hypercube, reduced by the Engine.
+
+        ``reduction`` picks the Engine call: ``line``, ``scatter`` and
+        ``clustered`` use ``GetHyperCubeReducedData`` (modes ``D1``, ``S``
+        and ``C``) with an automatic zoom factor and a page of
+        ``target_points`` rows; ``binned`` uses ``GetHyperCubeBinnedData``
+        on one dimension and two measures (x, y) over their full value
+        range, with at most ``target_points`` cells. The result has the
+        shape of ``create_hypercube`` — ``total_rows`` is the size of the
+        unreduced cube — plus ``reduction`` and ``target_points``.
+        """
+        t0 = time.monotonic()
+        op_timeout = timeout or self.ws_operation_timeout
+        dims, meas = _normalize_cube_spec(dimensions, measures)
+        n_cols = len(dims) + len(meas)
+        if reduction not in REDUCTION_MODES and reduction != "binned":
+            return {
+                "error": f"Unknown reduction {reduction!r}",
+                "error_category": "invalid_request",
+                "details": f"Use one of: {', '.join([*REDUCTION_MODES, 'binned'])}",
+            }
+        if reduction == "binned" and (len(dims) != 1 or len(meas) != 2):
+            return {
+                "error": "Binned reduction needs exactly one dimension and two measures (x, y)",
+                "error_category": "invalid_request",
+            }
+        height = max(1, min(target_points, MAX_PAGE_CELLS // max(1, n_cols)))
+        page = {"qTop": 0, "qLeft": 0, "qHeight": height, "qWidth": n_cols}
+        step = "CreateSessionObject/ApplyPatches"
+        scope = self._new_object_scope()
+        try:
+            cube, result = self._checkout_cube(
+                scope, _build_hypercube_def(dims, meas, 0), app_handle,
+                f"reduced-{len(dims)}d-{len(meas)}m", timeout=op_timeout,
+            )
+            if cube is None:
+                return {"error": "Failed to create hypercube session object", "step": step,
+                        "response": result}
+            step = "GetLayout"
+            layout = self.send_request("GetLayout", [], handle=cube.handle, timeout=op_timeout)
+            hypercube = layout.get("qLayout", {}).get("qHyperCube")
+            if hypercube is None:
+                return {"error": "No hypercube in layout", "step": step, "layout": layout}
+            if hypercube.get("qError"):
+                return {
+                    "error": f"Engine could not compute the hypercube (qErrorCode="
+                             f"{hypercube['qError'].get('qErrorCode')})",
+                    "error_category": "engine_object_error",
+                    "failed_step": step,
+                    "engine_error": hypercube["qError"],
+                }
+            if reduction == "binned":
+                step = "GetHyperCubeBinnedData"
+                params = ["/qHyperCubeDef", [page], *_binned_data_args(hypercube, height)]
+            else:
+                step = "GetHyperCubeReducedData"
+                params = ["/qHyperCubeDef", [page], -1, REDUCTION_MODES[reduction]]
+            data = self.send_request(step, params, handle=cube.handle, timeout=op_timeout)
+            self._checkin_cube(scope, cube)
+            pages = data.get("qDataPages", []) or []
+            hypercube["qDataPages"] = pages
+            return {
+                "hypercube_data": hypercube,
+                "dimensions": dims,
+                "measures": meas,
+                "reduction": reduction,
+                "target_points": height,
+                "total_rows": hypercube.get("qSize", {}).get("qcy", 0),
+                "returned_rows": sum(len(p.get("qMatrix", [])) for p in pages),
+                "total_columns": n_cols,
+                "elapsed_seconds": round(time.monotonic() - t0, 3),
+            }
+        except Exception as e:
+            logger.error("create_reduced_hypercube failed on step '%s': %s", step, e)
+            return {
+                "error": str(e) or repr(e),
+                "error_type": type(e).__name__,
+                "failed_step": step,
+                "elapsed_seconds": round(time.monotonic() - t0, 2),
+                "details": "Error in create_reduced_hypercube method",
+            }
+        finally:
+            scope.close()
+
+    def cached_reduced_hypercube(
+        self,
+        app_id: str,
+        app_handle: int,
+        dimensions: List[Any] = None,
+        measures: List[Any] = None,
+        reduction: str = "line",
+        target_points: int = 1000,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """``create_reduced_hypercube`` through the result cache, keyed like ``cached_hypercube``."""
+        if not self.result_cache.enabled:
+            return self.create_reduced_hypercube(app_handle, dimensions, measures, reduction,
+                                                 target_points, timeout)
+        dims, meas = _normalize_cube_spec(dimensions, measures)
+        request = {"kind": "reduced_hypercube", "dimensions": dims, "measures": meas,
+                   "reduction": reduction, "target_points": target_points}
+        return self._through_result_cache(
+            app_id, app_handle, request,
+            lambda: self.create_reduced_hypercube(app_handle, dims, meas, reduction,
+                                                  target_points, timeout),
+            timeout,
+        )
+
+    def create_pivot_hypercube(
+        self,
+        app_handle: int,
+        rows: List[Any] = None,
+        columns: List[Any] = None,
+        measures: List[Any] = None,
+        mode: str = "pivot",
+        max_rows: int = 1000,
+        max_columns: int = 100,
+        expand_depth: Optional[int] = None,
+        expand: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        A pivot (``qMode: "P"``) or stacked (``"K"``) hypercube, read page by page.
+
+        ``rows`` become the left dimensions and ``columns`` the top ones.
+        Without ``expand_depth`` and ``expand`` the cube is always fully
+        expanded. Otherwise it starts collapsed: every node of the first
+        ``expand_depth`` levels is expanded with ``ExpandLeft`` /
+        ``ExpandTop``, then each ``expand`` entry ``{"side": "left" | "top",
+        "row", "col", "collapse"?}`` expands (or collapses) one node at the
+        position reported in ``nodes``. Only the expanded nodes are computed.
+
+        Pivot data comes from ``GetHyperCubePivotData`` in pages of at most
+        ``MAX_PAGE_CELLS`` cells, up to ``max_rows`` rows and
+        ``max_columns`` columns, flattened by ``flatten_pivot_page``.
+        Stacked data is paged the same way from ``GetHyperCubeStackData``
+        and flattened by ``flatten_stack_page``.
+        """
+        t0 = time.monotonic()
+        op_timeout = timeout or self.ws_operation_timeout
+        if mode not in PIVOT_MODES:
+            return {
+                "error": f"Unknown mode {mode!r}",
+                "error_category": "invalid_request",
+                "details": f"Use one of: {', '.join(PIVOT_MODES)}",
+            }
+        row_dims, meas = _normalize_cube_spec(rows, measures)
+        col_dims, _ = _normalize_cube_spec(columns, None)
+        dims = row_dims + col_dims
+        if not dims or not meas:
+            return {
+                "error": "A pivot needs at least one dimension and one measure",
+                "error_category": "invalid_request",
+            }
+        fully_expanded = expand_depth is None and not expand
+        hypercube_def = _build_hypercube_def(
+            dims, meas, 0, suppress_zero=True, mode=PIVOT_MODES[mode],
+            left_dims=len(row_dims), fully_expanded=fully_expanded,
+        )
+        step = "CreateSessionObject"
+        try:
+            with self._object_scope() as scope:
+                obj_def = {"qInfo": {"qType": "PivotTable" if mode == "pivot" else "StackedTable"},
+                           "qHyperCubeDef": hypercube_def}
+                result = self._create_session_object(scope, obj_def, app_handle, mode,
+                                                     timeout=op_timeout)
+                handle = result.get("qReturn", {}).get("qHandle")
+                if handle is None:
+                    return {"error": "Failed to create pivot session object", "step": step,
+                            "response": result}
+                if not fully_expanded:
+                    step = "expand"
+                    for method, params in _expansion_calls(
+                        expand_depth or 0, len(row_dims), len(col_dims), expand or [],
+                    ):
+                        self.send_request(method, params, handle=handle, timeout=op_timeout)
+                step = "GetLayout"
+                layout = self.send_request("GetLayout", [], handle=handle, timeout=op_timeout)
+                hypercube = layout.get("qLayout", {}).get("qHyperCube")
+                if hypercube is None:
+                    return {"error": "No hypercube in layout", "step": step, "layout": layout}
+                if hypercube.get("qError"):
+                    return {
+                        "error": f"Engine could not compute the hypercube (qErrorCode="
+                                 f"{hypercube['qError'].get('qErrorCode')})",
+                        "error_category": "engine_object_error",
+                        "failed_step": step,
+                        "engine_error": hypercube["qError"],
+                    }
+                size = hypercube.get("qSize", {})
+                total_rows, total_cols = size.get("qcy", 0), size.get("qcx", 0)
+                width = max(1, min(total_cols, max_columns))
+                wanted_rows = min(total_rows, max_rows)
+                if mode == "stacked":
+                    step = "GetHyperCubeStackData"
+                    body = self._read_stack_pages(handle, width, wanted_rows, op_timeout)
+                else:
+                    step = "GetHyperCubePivotData"
+                    body = self._read_pivot_pages(handle, width, wanted_rows, op_timeout)
+                returned_rows = body["returned_rows"]
+        except Exception as e:
+            logger.error("create_pivot_hypercube failed on step '%s': %s", step, e)
+            return {
+                "error": str(e) or repr(e),
+                "error_type": type(e).__name__,
+                "failed_step": step,
+                "elapsed_seconds": round(time.monotonic() - t0, 2),
+                "details": "Error in create_pivot_hypercube method",
+            }
+
+        truncation_warning = None
+        if total_rows > returned_rows or total_cols > width:
+            truncation_warning = (
+                f"TRUNCATED: the {mode} has {total_rows} rows x {total_cols} columns, "
+                f"returned {returned_rows} x {width}. Collapse levels (expand_depth), "
+                f"move a dimension between rows and columns, or narrow the measures "
+                f"with set analysis."
+            )
+        return {
+            "mode": mode,
+            "row_dimensions": row_dims,
+            "column_dimensions": col_dims,
+            "measures": meas,
+            "dimension_info": hypercube.get("qDimensionInfo", []),
+            "measure_info": hypercube.get("qMeasureInfo", []),
+            "total_rows": total_rows,
+            "total_columns": total_cols,
+            "returned_columns": width,
+            **body,
+            "truncation_warning": truncation_warning,
+            "elapsed_seconds": round(time.monotonic() - t0, 3),
+        }
+
+    def _read_pivot_pages(
+        self, handle: int, width: int, total_rows: int, timeout: float,
+    ) -> Dict[str, Any]:
+        """Flattened ``GetHyperCubePivotData`` pages covering the first ``total_rows`` rows."""
+        height = max(1, MAX_PAGE_CELLS // width)
+        merged: Dict[str, Any] = {"row_headers": [], "column_headers": [], "values": [],
+                                  "nodes": []}
+        seen = set()
+        top = pages = 0
+        while top < total_rows:
+            page = {"qTop": top, "qLeft": 0, "qWidth": width,
+                    "qHeight": min(height, total_rows - top)}
+            data = self.send_request("GetHyperCubePivotData", ["/qHyperCubeDef", [page]],
+                                     handle=handle, timeout=timeout)
+            data_pages = data.get("qDataPages", []) or []
+            part = flatten_pivot_page(data_pages[0]) if data_pages else None
+            if not part or not part["values"]:
+                break
+            pages += 1
+            if not merged["column_headers"]:
+                merged["column_headers"] = part["column_headers"]
+            merged["row_headers"].extend(part["row_headers"])
+            merged["values"].extend(part["values"])
+            for node in part["nodes"]:
+                key = (node["side"], tuple(node["path"]))
+                if key not in seen:
+                    seen.add(key)
+                    merged["nodes"].append(node)
+            top += len(part["values"])
+        merged["returned_rows"] = len(merged["values"])
+        merged["pages"] = pages
+        return merged
+
+    def _read_stack_pages(
+        self, handle: int, width: int, total_rows: int, timeout: float,
+    ) -> Dict[str, Any]:
+        """
+        Flattened ``GetHyperCubeStackData`` pages covering the first ``total_rows`` rows.
+
+        Each page advances by the height the Engine reports in ``qArea``,
+        which is less than asked for when it hits the cell limit.
+        """
+        height = max(1, MAX_PAGE_CELLS // width)
+        cells: List[Dict[str, Any]] = []
+        top = pages = 0
+        while top < total_rows:
+            asked = min(height, total_rows - top)
+            page = {"qTop": top, "qLeft": 0, "qWidth": width, "qHeight": asked}
+            data = self.send_request("GetHyperCubeStackData",
+                                     ["/qHyperCubeDef", [page], MAX_PAGE_CELLS],
+                                     handle=handle, timeout=timeout)
+            data_pages = data.get("qDataPages", []) or []
+            if not data_pages:
+                break
+            part = flatten_stack_page(data_pages[0])
+            got = min(asked, int((data_pages[0].get("qArea") or {}).get("qHeight", 0)))
+            if not part or got <= 0:
+                break
+            pages += 1
+            cells.extend(part)
+            top += got
+        return {"cells": cells, "returned_cells": len(cells), "returned_rows": top,
+                "pages": pages}
+
+    def cached_pivot_hypercube(
+        self,
+        app_id: str,
+        app_handle: int,
+        rows: List[Any] = None,
+        columns: List[Any] = None,
+        measures: List[Any] = None,
+        mode: str = "pivot",
+        max_rows: int = 1000,
+        max_columns: int = 100,
+        expand_depth: Optional[int] = None,
+        expand: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """``create_pivot_hypercube`` through the result cache, keyed like ``cached_hypercube``."""
+        def compute() -> Dict[str, Any]:
+            return self.create_pivot_hypercube(app_handle, rows, columns, measures, mode, max_rows,
+                                               max_columns, expand_depth, expand)
+
+        if not self.result_cache.enabled:
+            return compute()
+        row_dims, meas = _normalize_cube_spec(rows, measures)
+        col_dims, _ = _normalize_cube_spec(columns, None)
+        request = {"kind": "pivot", "mode": mode, "rows": row_dims, "columns": col_dims,
+                   "measures": meas, "max_rows": max_rows, "max_columns": max_columns,
+                   "expand_depth": expand_depth, "expand": expand or []}
+        return self._through_result_cache(app_id, app_handle, request, compute)
+
+    def create_hypercubes(
+        self,
+        app_id: str,
+        cubes: List[Dict[str, Any]],
+        deadline: Optional[float] = None,
+        cube_timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run several independent ``cached_hypercube`` calls on one app concurrently.
+
+        Each entry of ``cubes`` is ``{"name", "dimensions", "measures",
+        "max_rows", "timeout", "calc_condition"}`` (all optional but
+        dimensions/measures).
+        Up to ``QLIK_BATCH_CONCURRENCY`` cubes run at once, each inside
+        ``lease()``. ``deadline`` (default ``QLIK_WS_TIMEOUT``) bounds the
+        whole batch: a cube still queued when it passes is skipped and one
+        still running is reported as ``deadline_exceeded``. A cube's
+        ``timeout`` (or ``cube_timeout``) bounds each of its Engine
+        requests and never exceeds the time left to the deadline.
+
+        Returns ``cubes`` in input order — each the ``create_hypercube``
+        result (or error) plus ``name``, ``queued_seconds`` and
+        ``seconds`` — with ``succeeded``, ``failed`` and
+        ``elapsed_seconds``.
+        """
+        t0 = time.monotonic()
+        if not cubes:
+            return {"error": "cubes must be a non-empty list", "error_category": "invalid_request"}
+        if len(cubes) > MAX_BATCH_CUBES:
+            return {
+                "error": f"{len(cubes)} cubes exceed the batch limit of {MAX_BATCH_CUBES}",
+                "error_category": "limit_exceeded",
+                "max_batch_cubes": MAX_BATCH_CUBES,
+            }
+        budget = deadline if deadline and deadline > 0 else self.ws_operation_timeout
+        end = t0 + budget
+
+        def run_cube(spec: Dict[str, Any]) -> Tuple[Dict[str, Any], float, float]:
+            started = time.monotonic()
+            remaining = end - started
+            if remaining <= 0:
+                return ({"error": "Batch deadline passed before the cube started",
+                         "error_category": "deadline_exceeded"}, started - t0, 0.0)
+            timeout = min(spec.get("timeout") or cube_timeout or remaining, remaining)
+            with self.lease(app_id, timeout=remaining) as handle:
+                result = self.cached_hypercube(
+                    app_id, handle, spec.get("dimensions") or [], spec.get("measures") or [],
+                    spec.get("max_rows", DEFAULT_HYPERCUBE_MAX_ROWS), timeout=timeout,
+                    calc_condition=spec.get("calc_condition"),
+                )
+            return result, started - t0, time.monotonic() - started
+
+        results: List[Dict[str, Any]] = []
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(cubes), self.batch_concurrency)),
+                                      thread_name_prefix="qlik-batch")
+        try:
+            futures = [
+                executor.submit(run_cube, spec) if isinstance(spec, dict) else None
+                for spec in cubes
+            ]
+            for i, (spec, future) in enumerate(zip(cubes, futures)):
+                name = spec.get("name") if isinstance(spec, dict) else None
+                entry: Dict[str, Any] = {"name": name or f"cube_{i}"}
+                if future is None:
+                    entry.update(error="Each cube must be an object with dimensions and measures",
+                                 error_category="invalid_request")
+                    results.append(entry)
+                    continue
+                try:
+                    result, queued, seconds = future.result(
+                        timeout=max(0.0, end - time.monotonic()))
+                    entry.update(queued_seconds=round(queued, 3), seconds=round(seconds, 3))
+                    entry.update(result)
+                except FutureTimeoutError:
+                    entry.update(error=f"Batch deadline of {budget:.1f}s exceeded",
+                                 error_category="deadline_exceeded")
+                except Exception as e:
+                    entry.update(error=str(e) or repr(e), error_type=type(e).__name__)
+                results.append(entry)
+        finally:
+            # Cubes still running finish (or time out) on their own.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        failed = sum(1 for r in results if "error" in r)
+        return {
+            "cubes": results,
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "deadline_seconds": budget,
+            "elapsed_seconds": round(time.monotonic() - t0, 3),
+        }
+
+    def get_slice_values(
+        self, app_handle: int, field_name: str, max_values: int,
+    ) -> Dict[str, Any]:
+        """
+        Distinct values of ``field_name`` via a ListObject, for slicing.
+
+        Returns ``{"cells", "total", "dimension_info"}``: up to
+        ``max_values`` ``qMatrix`` cells that are not excluded by the
+        current selections, the field's distinct value count and the
+        ListObject's ``qDimensionInfo``. Engine errors are raised.
+        """
+        list_def = {
+            "qInfo": {"qType": "ListObject"},
+            "qListObjectDef": {
+                "qDef": {
+                    "qFieldDefs": [field_name],
+                    "qSortCriterias": [{"qSortByNumeric": 1, "qSortByAscii": 1}],
+                },
+                "qInitialDataFetch": [
+                    {"qTop": 0, "qLeft": 0, "qHeight": max(1, min(max_values, MAX_PAGE_CELLS)),
+                     "qWidth": 1}
+                ],
+            },
+        }
+        with self._object_scope() as scope:
+            result = self._create_session_object(scope, list_def, app_handle, "slice-values",
+                                                 timeout=self.ws_operation_timeout)
+            handle = result.get("qReturn", {}).get("qHandle")
+            if handle is None:
+                raise QlikEngineError(f"Failed to create list object for {field_name!r}: {result}")
+            layout = self.send_request("GetLayout", [], handle=handle,
+                                       timeout=self.ws_operation_timeout)
+        list_object = layout.get("qLayout", {}).get("qListObject", {})
+        cells = [
+            row[0]
+            for page in list_object.get("qDataPages", [])
+            for row in page.get("qMatrix", [])
+            if row and row[0].get("qState") != "X" and not row[0].get("qIsNull")
+        ]
+        return {
+            "cells": cells[:max_values],
+            "total": list_object.get("qSize", {}).get("qcy", 0),
+            "dimension_info": list_object.get("qDimensionInfo", {}),
+        }
+
+    def sliced_hypercube(
+        self,
+        app_id: str,
+        slice_by: str,
+        dimensions: List[Any] = None,
+        measures: List[Any] = None,
+        max_rows: int = 1000,
+        max_slices: int = 50,
+    ) -> Dict[str, Any]:
+        """
+        Compute a hypercube once per value of ``slice_by`` and merge the slices.
+
+        The slice values come from a ListObject on ``slice_by``; every
+        aggregation in the measures (and in sort expressions) gets the
+        set-analysis modifier ``[slice_by]={'<value>'}``. Slices run
+        ``QLIK_SLICE_CONCURRENCY`` at a time, each on its own leased
+        session (or pipelined on the pooled one when leasing is off), and
+        go through ``cached_hypercube``. Rows whose measures are all zero
+        or missing within a slice are suppressed. ``max_rows`` applies per
+        slice.
+
+        The result looks like ``create_hypercube``'s, with ``slice_by``
+        prepended as the first dimension of ``hypercube_data``, plus
+        ``slices`` (value, rows, total_rows, seconds, cache or error per
+        slice). The merged matrix stops at ``MAX_SLICED_ROWS`` rows.
+        """
+        t0 = time.monotonic()
+        dims, meas = _normalize_cube_spec(dimensions, measures)
+        if not meas:
+            return {
+                "error": "slice_by needs at least one measure: slices are applied as set analysis inside measures",
+                "error_category": "invalid_request",
+                "failed_step": "plan",
+            }
+        if max_slices > MAX_SLICES:
+            return {
+                "error": f"max_slices={max_slices} exceeds the hard limit of {MAX_SLICES}",
+                "error_category": "limit_exceeded",
+                "failed_step": "plan",
+                "max_slices_limit": MAX_SLICES,
+            }
+
+        try:
+            with self.lease(app_id) as app_handle:
+                listing = self.get_slice_values(app_handle, slice_by, max_slices)
+        except Exception as e:
+            logger.error("sliced_hypercube: listing values of %r failed: %s", slice_by, e)
+            return {
+                "error": str(e) or repr(e),
+                "error_type": type(e).__name__,
+                "failed_step": "list_slice_values",
+                "details": "Error in sliced_hypercube method",
+            }
+        if listing["total"] > max_slices:
+            return {
+                "error": (
+                    f"{slice_by!r} has {listing['total']} distinct values, more than "
+                    f"max_slices={max_slices}"
+                ),
+                "error_category": "too_many_slices",
+                "failed_step": "list_slice_values",
+                "distinct_values": listing["total"],
+                "hint": (
+                    f"Slice by a coarser field, or raise max_slices (up to {MAX_SLICES}) "
+                    "if every slice is genuinely needed."
+                ),
+            }
+        cells = listing["cells"]
+
+        def run_slice(cell: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+            slice_dims, slice_meas = _restrict_cube_spec(
+                dims, meas, set_modifier(slice_by, [cell.get("qText", "")])
+            )
+            t_slice = time.monotonic()
+            with self.lease(app_id) as handle:
+                result = self.cached_hypercube(app_id, handle, slice_dims, slice_meas,
+                                               max_rows, suppress_zero=True)
+            return result, time.monotonic() - t_slice
+
+        slices: List[Dict[str, Any]] = []
+        matrix: List[List[Dict[str, Any]]] = []
+        template: Optional[Dict[str, Any]] = None
+        total_rows = 0
+        truncated_slices = 0
+        capped = False
+        with ThreadPoolExecutor(max_workers=max(1, min(len(cells), self.slice_concurrency)),
+                                thread_name_prefix="qlik-slice") as executor:
+            futures = [executor.submit(run_slice, cell) for cell in cells]
+            for cell, future in zip(cells, futures):
+                entry: Dict[str, Any] = {"value": cell.get("qText", "")}
+                try:
+                    result, seconds = future.result()
+                except Exception as e:
+                    result, seconds = {"error": str(e) or repr(e)}, 0.0
+                entry["seconds"] = round(seconds, 3)
+                if "error" in result:
+                    entry["error"] = result["error"]
+                    slices.append(entry)
+                    continue
+                hypercube = result.get("hypercube_data", {})
+                rows = [row for page in hypercube.get("qDataPages", []) or []
+                        for row in page.get("qMatrix", [])]
+                if template is None:
+                    template = hypercube
+                entry.update(rows=len(rows), total_rows=result.get("total_rows", 0),
+                             cache=result.get("cache"))
+                total_rows += result.get("total_rows", 0)
+                if result.get("total_rows", 0) > len(rows):
+                    truncated_slices += 1
+                room = MAX_SLICED_ROWS - len(matrix)
+                if len(rows) > room:
+                    rows, capped = rows[:room], True
+                matrix.extend([cell] + row for row in rows)
+                slices.append(entry)
+
+        failed = [s for s in slices if "error" in s]
+        if cells and len(failed) == len(cells):
+            return {
+                "error": f"All {len(cells)} slices failed; first error: {failed[0]['error']}",
+                "failed_step": "slices",
+                "slices": slices,
+                "details": "Error in sliced_hypercube method",
+            }
+
+        n_cols = len(dims) + len(meas) + 1
+        slice_info = dict(listing["dimension_info"] or {})
+        slice_info.setdefault("qFallbackTitle", slice_by)
+        hypercube = {
+            "qDimensionInfo": [slice_info] + list((template or {}).get("qDimensionInfo", [])),
+            "qMeasureInfo": list((template or {}).get("qMeasureInfo", [])),
+            "qSize": {"qcx": n_cols, "qcy": len(matrix)},
+            "qDataPages": [{
+                "qArea": {"qLeft": 0, "qTop": 0, "qWidth": n_cols, "qHeight": len(matrix)},
+                "qMatrix": matrix,
+            }],
+        }
+        warnings = []
+        if truncated_slices:
+            warnings.append(
+                f"TRUNCATED: {truncated_slices} of {len(cells)} slices had more than "
+                f"max_rows={max_rows} rows. Narrow those slices with set analysis or "
+                f"switch to a top-N pattern."
+            )
+        if capped:
+            warnings.append(f"The merged result stops at {MAX_SLICED_ROWS} rows.")
+        return {
+            "hypercube_data": hypercube,
+            "slice_by": slice_by,
+            "slice_count": len(cells),
+            "failed_slices": len(failed),
+            "dimensions": dims,
+            "measures": meas,
+            "total_rows": total_rows,
+            "returned_rows": len(matrix),
+            "total_columns": n_cols,
+            "truncation_warning": "\n".join(warnings) or None,
+            "slices": slices,
+            "elapsed_seconds": round(time.monotonic() - t0, 3),
+        }
+
+    def field_index(self, app_id: str, app_handle: int) -> Optional[FieldIndex]:
+        """
+        The app's field-cardinality index for the planner; None if unavailable.
+
+        Built from ``GetTablesAndKeys`` and cached next to the hypercube
+        results under the app's ``qLastReloadTime``.
+        """
+        fields_data = self.cached_fields(app_id, app_handle)
+        if "error" in fields_data:
+            logger.warning("field_index: GetTablesAndKeys failed for %s: %s",
+                           app_id, fields_data["error"])
+            return None
+        return FieldIndex.from_fields_data(fields_data)
+
+    def cached_fields(self, app_id: str, app_handle: int,
+                      reload_time: Optional[str] = None) -> Dict[str, Any]:
+        """``get_fields`` cached under the app's ``qLastReloadTime`` (errors are not cached)."""
+        if reload_time is None:
+            reload_time = self.get_app_reload_time(app_handle)
+        self.result_cache.note_version(app_id, reload_time)
+        key = (app_id, reload_time, request_hash({"kind": "field_index"}))
+        fields_data = self.result_cache.get(key)
+        if fields_data is None:
+            fields_data = self.get_fields(app_handle)
+            if "error" not in fields_data:
+                self.result_cache.put(key, fields_data)
+        return fields_data
+
+    def profile_tables(
+        self, app_id: str, app_handle: int, tables: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Light statistics of every field of ``tables`` (default: all), one profile per table.
+
+        The stats of ``PROFILE_STATS`` for all fields are packed into as few
+        measures-only cubes as the page cell budget allows (one row, up to
+        ``MAX_PAGE_CELLS`` measures each) and their layouts are fetched as
+        one pipelined batch. Each table's profile is cached on its own
+        under the app's ``qLastReloadTime``; a key field shared by several
+        tables is computed once.
+        """
+        t0 = time.monotonic()
+        reload_time = self.get_app_reload_time(app_handle)
+        fields_data = self.cached_fields(app_id, app_handle, reload_time)
+        if "error" in fields_data:
+            return fields_data
+        table_fields: Dict[str, List[str]] = {}
+        table_rows: Dict[str, int] = {}
+        for field in fields_data.get("fields", []):
+            if field.get("is_system"):
+                continue
+            names = table_fields.setdefault(field["table_name"], [])
+            if field["field_name"] not in names:
+                names.append(field["field_name"])
+            table_rows[field["table_name"]] = field.get("rows_count", 0)
+        wanted = list(dict.fromkeys(tables)) if tables else sorted(table_fields)
+        unknown = [t for t in wanted if t not in table_fields]
+        if unknown:
+            return {
+                "error": f"Unknown table(s): {', '.join(unknown)}",
+                "error_category": "invalid_request",
+                "available_tables": sorted(table_fields),
+            }
+
+        profiles: Dict[str, Dict[str, Any]] = {}
+        keys: Dict[str, CacheKey] = {}
+        for table in wanted:
+            keys[table] = (app_id, reload_time,
+                           request_hash({"kind": "table_profile", "table": table}))
+            cached = self.result_cache.get(keys[table])
+            if cached is not None:
+                profiles[table] = dict(cached, cache="hit")
+
+        missing = [t for t in wanted if t not in profiles]
+        fields = list(dict.fromkeys(f for t in missing for f in table_fields[t]))
+        stats, cubes = self.profile_fields(app_handle, fields) if fields else ({}, 0)
+        for table in missing:
+            profile = {
+                "table": table,
+                "rows": table_rows.get(table, 0),
+                "fields": [stats[f] for f in table_fields[table]],
+            }
+            if not any("error" in f for f in profile["fields"]):
+                self.result_cache.put(keys[table], profile)
+            profiles[table] = dict(profile, cache="miss")
+
+        return {
+            "tables": [profiles[t] for t in wanted],
+            "fields_profiled": len(fields),
+            "cubes": cubes,
+            "elapsed_seconds": round(time.monotonic() - t0, 3),
+        }
+
+    def profile_fields(
+        self, app_handle: int, fields: List[str],
+        stats: Tuple[Tuple[str, str], ...] = PROFILE_STATS, timeout: Optional[float] = None,
+    ) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """
+        ``stats`` per field via packed measures-only cubes; returns ``(profiles, cubes)``.
+
+        ``stats`` is ``PROFILE_STATS`` (light, symbol-table bound) or
+        ``HEAVY_PROFILE_STATS`` (row scans). A chunk whose layout fails
+        yields ``{field_name, error}`` for each of its fields.
+        """
+        per_cube = max(1, MAX_PAGE_CELLS // len(stats))
+        chunks = [fields[i:i + per_cube] for i in range(0, len(fields), per_cube)]
+        timeout = timeout or self.ws_operation_timeout
+        with self._object_scope() as scope:
+            cubes = []
+            for chunk in chunks:
+                measures = [
+                    {"qDef": {"qDef": template.format(field="[" + f.replace("]", "]]") + "]")}}
+                    for f in chunk for _, template in stats
+                ]
+                hypercube_def = {
+                    "qDimensions": [],
+                    "qMeasures": measures,
+                    "qInitialDataFetch": [
+                        {"qTop": 0, "qLeft": 0, "qHeight": 1, "qWidth": len(measures)}
+                    ],
+                    "qSuppressZero": False,
+                    "qSuppressMissing": False,
+                }
+                cube, result = self._checkout_cube(scope, hypercube_def, app_handle,
+                                                   "profile", timeout=timeout)
+                if cube is None:
+                    raise QlikEngineError(f"Failed to create profile hypercube: {result}")
+                cubes.append(cube)
+            layouts = self.send_requests([("GetLayout", [], c.handle) for c in cubes],
+                                         timeout=timeout)
+            for cube in cubes:
+                self._checkin_cube(scope, cube)
+
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for chunk, layout in zip(chunks, layouts):
+            if isinstance(layout, Exception):
+                for f in chunk:
+                    profiles[f] = {"field_name": f, "error": str(layout) or repr(layout)}
+                continue
+            hypercube = layout.get("qLayout", {}).get("qHyperCube", {})
+            pages = hypercube.get("qDataPages", []) or []
+            row = pages[0]["qMatrix"][0] if pages and pages[0].get("qMatrix") else []
+            for i, f in enumerate(chunk):
+                cells = row[i * len(stats):(i + 1) * len(stats)]
+                profiles[f] = _field_profile(f, cells, stats)
+        return profiles, len(cubes)
+
+    def plan_hypercube(
+        self,
+        app_id: str,
+        app_handle: int,
+        dimensions: List[Any] = None,
+        measures: List[Any] = None,
+        max_rows: int = 1000,
+        rewrite: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Pre-flight estimate (and, for expensive requests, safe rewrites); see ``planner``.
+
+        ``cost_class`` is judged against ``QLIK_WS_TIMEOUT``. Returns None
+        when the app's field index cannot be read.
+        """
+        index = self.field_index(app_id, app_handle)
+        if index is None:
+            return None
+        dims, meas = _normalize_cube_spec(dimensions, measures)
+        return plan_hypercube(index, dims, meas, max_rows, self.ws_operation_timeout,
+                              rewrite=rewrite)
 
     def get_hypercube_data(
         self,
@@ -1416,15 +3051,178 @@ class QlikEngineAPI:
                         }
                     ],
                 }
-            ]
+            ]
+
+            result = self.send_request(
+                "GetHyperCubeData", params, handle=hypercube_handle
+            )
+            return result
+
+        except Exception as e:
+            return {"error": str(e), "details": "Error in get_hypercube_data method"}
+
+    def iter_hypercube_pages(
+        self,
+        app_handle: int,
+        dimensions: List[Any] = None,
+        measures: List[Any] = None,
+        max_rows: Optional[int] = None,
+        page_cells: int = MAX_PAGE_CELLS,
+        window: Optional[int] = None,
+        row_filter: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a whole hypercube as bounded pages, without the row cap.
+
+        Yields one dict per ``GetHyperCubeData`` page: ``top`` (first row
+        index), ``rows`` (plain values — ``qText`` for dimensions, ``qNum``
+        for numeric measures, None for nulls), plus ``columns``,
+        ``numeric`` and ``total_rows`` describing the whole cube and the
+        ``pager`` driving the read (for its stats). Page
+        geometry adapts to stay under ``page_cells`` and shrinks on
+        timeouts; up to ``window`` (default ``QLIK_PAGE_WINDOW``) page
+        requests are pipelined ahead of the page being consumed (see
+        ``HypercubePager``). The cube is checked back into
+        the warm pool or destroyed when the generator finishes or is
+        closed. Engine errors are raised, not returned.
+
+        ``row_filter`` (dimension-only cubes) is a measure the Engine
+        computes but the pages leave out: with zero suppression every row
+        where it is zero or null is dropped, so a set-analysis ``Count``
+        filters rows without a per-row ``If``.
+        """
+        dims, meas = _normalize_cube_spec(dimensions, measures)
+        n_out = len(dims) + len(meas)
+        if n_out == 0:
+            raise ValueError("At least one dimension or measure is required")
+        if row_filter and meas:
+            raise ValueError("row_filter only applies to cubes without measures")
+        hidden = [{"expression": row_filter, "label": "row_filter", "sort_by": {}}] if row_filter else []
+        n_cols = n_out + len(hidden)
+        scope = self._new_object_scope()
+        try:
+            cube, result = self._checkout_cube(
+                scope, _build_hypercube_def(dims, meas + hidden, 0, suppress_zero=bool(hidden)),
+                app_handle, f"stream-{len(dims)}d-{len(meas + hidden)}m",
+                timeout=self.ws_operation_timeout,
+            )
+            if cube is None:
+                raise QlikEngineError(f"Failed to create hypercube session object: {result}")
+            layout = self.send_request("GetLayout", [], handle=cube.handle,
+                                       timeout=self.ws_operation_timeout)
+            hypercube = layout.get("qLayout", {}).get("qHyperCube", {})
+            total_rows = hypercube.get("qSize", {}).get("qcy", 0)
+            if max_rows is not None:
+                total_rows = min(total_rows, max(0, max_rows))
+            columns = (
+                [d.get("qFallbackTitle") or dims[i]["field"]
+                 for i, d in enumerate(hypercube.get("qDimensionInfo", [])[:len(dims)])]
+                + [m.get("qFallbackTitle") or f"Measure_{i}"
+                   for i, m in enumerate(hypercube.get("qMeasureInfo", [])[:len(meas)])]
+            )
+            if len(columns) != n_out:
+                columns = ([d["field"] for d in dims]
+                           + [m.get("label", f"Measure_{i}") for i, m in enumerate(meas)])
+            numeric = [False] * len(dims) + [True] * len(meas)
+
+            transport = self._require_transport()
+            req_ids: Dict[int, int] = {}
+
+            def page_rows(result: Dict[str, Any]) -> List[Any]:
+                pages = result.get("qDataPages") or [{}]
+                return pages[0].get("qMatrix", [])
+
+            def submit(top: int, height: int) -> Future:
+                req_id, future = self._submit_on(
+                    transport, "GetHyperCubeData",
+                    [{"qPath": "/qHyperCubeDef",
+                      "qPages": [{"qTop": top, "qLeft": 0, "qHeight": height, "qWidth": n_cols}]}],
+                    cube.handle, transform=page_rows,
+                )
+                req_ids[id(future)] = req_id
+                future.add_done_callback(lambda f: req_ids.pop(id(f), None))
+                return future
+
+            def cancel(future: Future) -> None:
+                req_id = req_ids.pop(id(future), None)
+                if req_id is not None:
+                    transport.cancel(req_id)
+
+            pager = HypercubePager(
+                submit, n_cols, total_rows, page_cells,
+                window=window if window is not None else self.page_window,
+                timeout=self.ws_operation_timeout, cancel=cancel,
+            )
+            for top, matrix in pager:
+                yield {
+                    "top": top,
+                    "rows": [[hypercube_cell_value(cell, numeric[i])
+                              for i, cell in enumerate(row[:n_out])]
+                             for row in matrix],
+                    "columns": columns,
+                    "numeric": numeric,
+                    "total_rows": total_rows,
+                    "pager": pager,
+                }
+            self._checkin_cube(scope, cube)
+        finally:
+            scope.close()
 
-            result = self.send_request(
-                "GetHyperCubeData", params, handle=hypercube_handle
-            )
-            return result
+    def export_hypercube(
+        self,
+        app_handle: int,
+        sink: RowSink,
+        dimensions: List[Any] = None,
+        measures: List[Any] = None,
+        max_rows: Optional[int] = None,
+        page_cells: int = MAX_PAGE_CELLS,
+        window: Optional[int] = None,
+        row_filter: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Stream a hypercube page by page into ``sink`` (see ``sinks``).
 
+        Memory stays bounded by one page. Returns the sink summary (path,
+        rows, bytes, sha256) plus paging stats, or an error dict; on error
+        the partial file is removed. ``row_filter`` is passed to
+        ``iter_hypercube_pages``.
+        """
+        t0 = time.monotonic()
+        pages = self.iter_hypercube_pages(app_handle, dimensions, measures,
+                                          max_rows=max_rows, page_cells=page_cells,
+                                          window=window, row_filter=row_filter)
+        pager = None
+        total_rows = 0
+        try:
+            opened = False
+            for page in pages:
+                if not opened:
+                    sink.open(page["columns"], page["numeric"])
+                    opened = True
+                pager = page["pager"]
+                total_rows = page["total_rows"]
+                sink.write_rows(page["rows"])
+            if not opened:
+                # Empty cube: still produce a file with the header.
+                dims, meas = _normalize_cube_spec(dimensions, measures)
+                sink.open([d["field"] for d in dims]
+                          + [m.get("label", f"Measure_{i}") for i, m in enumerate(meas)],
+                          [False] * len(dims) + [True] * len(meas))
+            summary = sink.close()
         except Exception as e:
-            return {"error": str(e), "details": "Error in get_hypercube_data method"}
+            pages.close()
+            sink.abort()
+            logger.error("export_hypercube failed after %d rows: %s", sink.rows, e)
+            return {
+                "error": str(e) or repr(e),
+                "error_type": type(e).__name__,
+                "rows_written": sink.rows,
+                "details": "Error in export_hypercube method",
+            }
+        summary["total_rows"] = total_rows
+        summary.update(pager.stats() if pager is not None else {"pages": 0})
+        summary["elapsed_seconds"] = round(time.monotonic() - t0, 3)
+        return summary
 
     def get_table_data(
         self, app_handle: int, table_name: str = None, max_rows: int = 1000
@@ -1509,33 +3307,23 @@ class QlikEngineAPI:
             }
 
             obj_def = {
-                "qInfo": {"qId": f"table-data-{table_name}", "qType": "HyperCube"},
+                "qInfo": {"qType": "HyperCube"},
                 "qHyperCubeDef": hypercube_def,
             }
 
-            result = self.send_request(
-                "CreateSessionObject", [obj_def], handle=app_handle
-            )
-
-            if "qReturn" not in result or "qHandle" not in result["qReturn"]:
-                return {
-                    "error": "Failed to create hypercube for table data",
-                    "response": result,
-                }
+            with self._object_scope() as scope:
+                result = self._create_session_object(scope, obj_def, app_handle, "table-data")
 
-            cube_handle = result["qReturn"]["qHandle"]
+                if "qReturn" not in result or "qHandle" not in result["qReturn"]:
+                    return {
+                        "error": "Failed to create hypercube for table data",
+                        "response": result,
+                    }
 
-            layout = self.send_request("GetLayout", [], handle=cube_handle)
+                cube_handle = result["qReturn"]["qHandle"]
+                layout = self.send_request("GetLayout", [], handle=cube_handle)
 
             if "qLayout" not in layout or "qHyperCube" not in layout["qLayout"]:
-                try:
-                    self.send_request(
-                        "DestroySessionObject",
-                        [f"table-data-{table_name}"],
-                        handle=app_handle,
-                    )
-                except Exception:
-                    pass
                 return {"error": "No hypercube in layout", "layout": layout}
 
             hypercube = layout["qLayout"]["qHyperCube"]
@@ -1571,22 +3359,276 @@ class QlikEngineAPI:
                 "truncated_fields": truncated,
                 "dimension_info": hypercube.get("qDimensionInfo", []),
             }
-
-            # Cleanup created session object
-            try:
-                self.send_request(
-                    "DestroySessionObject",
-                    [f"table-data-{table_name}"],
-                    handle=app_handle,
-                )
-            except Exception as cleanup_error:
-                result_data["cleanup_warning"] = str(cleanup_error)
-
             return result_data
 
         except Exception as e:
             return {"error": str(e), "details": "Error in get_table_data method"}
 
+    def sample_table(
+        self,
+        app_id: str,
+        app_handle: int,
+        table_name: str,
+        rows: int = 20,
+        sample_field: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        About ``rows`` representative rows of ``table_name``, without sorting the whole table.
+
+        ``get_table_data`` takes the first rows of an all-dimensions cube in
+        sort order: the Engine combines and sorts every row of the table,
+        and the rows it returns all share the lowest values. Here the
+        distinct values of ``sample_field`` (default: the table's field
+        with the most distinct values, preferring fields not shared with
+        other tables) are read at an even stride through a load-ordered
+        ListObject — all positions in one ``GetListObjectData`` call — and
+        the cube of the table's first ``MAX_SAMPLE_FIELDS`` fields is
+        restricted to those values by a set-analysis ``Count`` with zero
+        suppression, so only the sampled rows are combined. Each sampled
+        value contributes one row before any value contributes a second.
+        """
+        t0 = time.monotonic()
+        fields_data = self.cached_fields(app_id, app_handle)
+        if "error" in fields_data:
+            return fields_data
+        user_fields = [f for f in fields_data.get("fields", []) if not f.get("is_system")]
+        table_fields = [f for f in user_fields if f.get("table_name") == table_name]
+        if not table_fields:
+            return {
+                "error": f"Unknown table: {table_name}",
+                "error_category": "invalid_request",
+                "available_tables": sorted({f.get("table_name") for f in user_fields}),
+            }
+        names = [f["field_name"] for f in table_fields]
+        if sample_field is None:
+            sample_field = max(
+                table_fields, key=lambda f: (not f.get("is_key"), f.get("distinct_values", 0)),
+            )["field_name"]
+        elif sample_field not in names:
+            return {
+                "error": f"Field {sample_field!r} is not in table {table_name!r}",
+                "error_category": "invalid_request",
+                "table_fields": names,
+            }
+        columns = [sample_field] + [n for n in names if n != sample_field][:MAX_SAMPLE_FIELDS - 1]
+        rows = max(1, min(rows, MAX_SAMPLE_ROWS))
+        timeout = timeout or self.ws_operation_timeout
+
+        values, distinct = self._stride_values(app_handle, sample_field, rows, timeout)
+        result: Dict[str, Any] = {
+            "table_name": table_name,
+            "table_rows": table_fields[0].get("rows_count", 0),
+            "sample_field": sample_field,
+            "sample_field_distinct_values": distinct,
+            "sampled_values": len(values),
+            "columns": columns,
+            "truncated_fields": len(names) > len(columns),
+            "rows": [],
+        }
+        if values:
+            # A few extra rows per value, so values with several rows still
+            # show some variety once every value has one row.
+            max_rows = min(rows * 4, MAX_PAGE_CELLS // (len(columns) + 1), 5000)
+            measure = ("Count({<" + set_modifier(sample_field, values) + ">} ["
+                       + sample_field.replace("]", "]]") + "])")
+            cube = self.create_hypercube(
+                app_handle, [{"field": c} for c in columns],
+                [{"expression": measure, "label": "rows"}],
+                max_rows=max_rows, suppress_zero=True, timeout=timeout,
+            )
+            if "error" in cube:
+                return dict(cube, sample_field=sample_field)
+            matrix = [row for page in cube["hypercube_data"].get("qDataPages", []) or []
+                      for row in page.get("qMatrix", [])]
+            first, more, seen = [], [], set()
+            for row in matrix:
+                key = row[0].get("qText") if row else None
+                (more if key in seen else first).append(row)
+                seen.add(key)
+            result["rows"] = [
+                {c: hypercube_cell_value(cell, False) for c, cell in zip(columns, row)}
+                for row in (first + more)[:rows]
+            ]
+        result["returned_rows"] = len(result["rows"])
+        result["elapsed_seconds"] = round(time.monotonic() - t0, 3)
+        return result
+
+    def _stride_values(
+        self, app_handle: int, field_name: str, count: int, timeout: float,
+    ) -> Tuple[List[str], int]:
+        """``count`` values of ``field_name`` at an even load-order stride, and its distinct count."""
+        list_def = {
+            "qInfo": {"qType": "ListObject"},
+            "qListObjectDef": {
+                "qDef": {
+                    "qFieldDefs": [field_name],
+                    "qSortCriterias": [{"qSortByLoadOrder": 1}],
+                },
+                "qInitialDataFetch": [],
+            },
+        }
+        with self._object_scope() as scope:
+            result = self._create_session_object(scope, list_def, app_handle, "sample",
+                                                 timeout=timeout)
+            handle = result.get("qReturn", {}).get("qHandle")
+            if handle is None:
+                raise QlikEngineError(f"Failed to create list object for {field_name!r}: {result}")
+            layout = self.send_request("GetLayout", [], handle=handle, timeout=timeout)
+            distinct = layout.get("qLayout", {}).get("qListObject", {}).get("qSize", {}).get("qcy", 0)
+            count = min(count, distinct)
+            if count <= 0:
+                return [], distinct
+            pages = [{"qTop": i * distinct // count, "qLeft": 0, "qWidth": 1, "qHeight": 1}
+                     for i in range(count)]
+            data = self.send_request("GetListObjectData", ["/qListObjectDef", pages],
+                                     handle=handle, timeout=timeout)
+        values = []
+        for page in data.get("qDataPages", []) or []:
+            for row in page.get("qMatrix", []):
+                if row and not row[0].get("qIsNull"):
+                    values.append(row[0].get("qText", ""))
+        return values, distinct
+
+    def search_field_values(
+        self,
+        app_handle: int,
+        field_name: str,
+        search: Optional[str],
+        offset: int = 0,
+        limit: int = 10,
+        accept: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Values of ``field_name`` matching ``search``, found by the Engine.
+
+        ``search`` is a Qlik search string (``*`` / ``?`` wildcards) applied
+        with ``SearchListObjectFor`` on a session ListObject; the matches are
+        then read with ``GetListObjectData``, so the cost follows the number
+        of matches, not the size of the field. The Engine's search is
+        case-insensitive and matches word starts, so callers that need
+        stricter semantics pass ``accept``, which every match cell must
+        pass before ``offset`` / ``limit`` are applied. With ``search``
+        None every value of the field is paged through ``accept``, for
+        filters the Engine's text search cannot express. Values come in
+        numeric, then text order, like ``get_field_values`` without
+        frequencies.
+
+        Returns ``{"values", "matches", "scanned"}``: the page of values in
+        ``get_field_values`` shape, the Engine's match count and how many
+        matches were read. Engine errors are raised.
+        """
+        list_def = {
+            "qInfo": {"qType": "ListObject"},
+            "qListObjectDef": {
+                "qDef": {
+                    "qFieldDefs": [field_name],
+                    "qSortCriterias": [{"qSortByNumeric": 1, "qSortByAscii": 1}],
+                },
+                "qInitialDataFetch": [],
+            },
+        }
+        timeout = self.ws_operation_timeout
+        with self._object_scope() as scope:
+            result = self._create_session_object(scope, list_def, app_handle, "field-search",
+                                                 timeout=timeout)
+            handle = result.get("qReturn", {}).get("qHandle")
+            if handle is None:
+                raise QlikEngineError(f"Failed to create list object for {field_name!r}: {result}")
+            if search is not None:
+                self.send_request("SearchListObjectFor", ["/qListObjectDef", search],
+                                  handle=handle, timeout=timeout)
+            layout = self.send_request("GetLayout", [], handle=handle, timeout=timeout)
+            matches = layout.get("qLayout", {}).get("qListObject", {}).get("qSize", {}).get("qcy", 0)
+
+            # Without a filter the requested page is read directly; with one,
+            # matches are read in full pages until enough of them pass.
+            top, end = (offset, min(matches, offset + limit)) if accept is None else (0, matches)
+            height = limit if accept is None else MAX_PAGE_CELLS
+            skip = 0 if accept is None else offset
+            values: List[Dict[str, Any]] = []
+            scanned = 0
+            while top < end and len(values) < limit:
+                page = {"qTop": top, "qLeft": 0, "qWidth": 1, "qHeight": min(height, end - top)}
+                data = self.send_request("GetListObjectData", ["/qListObjectDef", [page]],
+                                         handle=handle, timeout=timeout)
+                rows = [row for p in data.get("qDataPages", []) or [] for row in p.get("qMatrix", [])]
+                if not rows:
+                    break
+                top += len(rows)
+                for row in rows:
+                    scanned += 1
+                    cell = row[0] if row else {}
+                    if accept is not None and not accept(cell):
+                        continue
+                    if skip:
+                        skip -= 1
+                        continue
+                    values.append({
+                        "value": cell.get("qText", ""),
+                        "state": cell.get("qState", "O"),
+                        "numeric_value": cell.get("qNum", None),
+                        "is_numeric": cell.get("qIsNumeric", False),
+                    })
+                    if len(values) >= limit:
+                        break
+        return {"values": values, "matches": matches, "scanned": scanned}
+
+    def iter_field_values(
+        self,
+        app_handle: int,
+        field_name: str,
+        start: int = 0,
+        max_values: Optional[int] = None,
+        include_frequency: bool = False,
+        page_size: int = MAX_PAGE_CELLS,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every distinct value of ``field_name``, one ``GetListObjectData`` page at a time.
+
+        Values come in load order (stable until the app is reloaded), from
+        position ``start``, at most ``max_values`` of them; each is
+        ``{"elem", "text", "number", "frequency"}`` — ``number`` is None for
+        non-numeric values, ``frequency`` (``qFrequencyMode: "V"``) is None
+        unless ``include_frequency``. Pages hold at most ``page_size``
+        values (the cell budget), so memory stays flat for any field size.
+        The session ListObject lives until the generator is exhausted or
+        closed; Engine errors are raised.
+        """
+        list_def = {
+            "qInfo": {"qType": "ListObject"},
+            "qListObjectDef": {
+                "qDef": {
+                    "qFieldDefs": [field_name],
+                    "qSortCriterias": [{"qSortByLoadOrder": 1}],
+                },
+                "qFrequencyMode": "V" if include_frequency else "N",
+                "qInitialDataFetch": [],
+            },
+        }
+        timeout = self.ws_operation_timeout
+        height = max(1, min(page_size, MAX_PAGE_CELLS))
+        with self._object_scope() as scope:
+            result = self._create_session_object(scope, list_def, app_handle, "field-stream",
+                                                 timeout=timeout)
+            handle = result.get("qReturn", {}).get("qHandle")
+            if handle is None:
+                raise QlikEngineError(f"Failed to create list object for {field_name!r}: {result}")
+            layout = self.send_request("GetLayout", [], handle=handle, timeout=timeout)
+            total = layout.get("qLayout", {}).get("qListObject", {}).get("qSize", {}).get("qcy", 0)
+            end = total if max_values is None else min(total, start + max(0, max_values))
+            top = max(0, start)
+            while top < end:
+                page = {"qTop": top, "qLeft": 0, "qWidth": 1, "qHeight": min(height, end - top)}
+                data = self.send_request("GetListObjectData", ["/qListObjectDef", [page]],
+                                         handle=handle, timeout=timeout)
+                rows = [row for p in data.get("qDataPages", []) or [] for row in p.get("qMatrix", [])]
+                if not rows:
+                    break
+                for row in rows:
+                    yield _field_value(row[0] if row else {})
+                top += len(rows)
+
     def get_field_values(
         self,
         app_handle: int,
@@ -1598,7 +3640,7 @@ class QlikEngineAPI:
         try:
             # Use correct structure
             list_def = {
-                "qInfo": {"qId": f"field-values-{field_name}", "qType": "ListObject"},
+                "qInfo": {"qType": "ListObject"},
                 "qListObjectDef": {
                     "qStateName": "$",
                     "qLibraryId": "",
@@ -1623,29 +3665,17 @@ class QlikEngineAPI:
                 },
             }
 
-            # Create session object - use correct parameter format
-            result = self.send_request(
-                "CreateSessionObject", [list_def], handle=app_handle
-            )
-
-            if "qReturn" not in result or "qHandle" not in result["qReturn"]:
-                return {"error": "Failed to create session object", "response": result}
+            with self._object_scope() as scope:
+                result = self._create_session_object(scope, list_def, app_handle, "field-values")
 
-            list_handle = result["qReturn"]["qHandle"]
+                if "qReturn" not in result or "qHandle" not in result["qReturn"]:
+                    return {"error": "Failed to create session object", "response": result}
 
-            layout = self.send_request("GetLayout", [], handle=list_handle)
+                list_handle = result["qReturn"]["qHandle"]
+                layout = self.send_request("GetLayout", [], handle=list_handle)
 
             # Correct path to qListObject - it's in qLayout
             if "qLayout" not in layout or "qListObject" not in layout["qLayout"]:
-                # Clean up object before returning error
-                try:
-                    self.send_request(
-                        "DestroySessionObject",
-                        [f"field-values-{field_name}"],
-                        handle=app_handle,
-                    )
-                except Exception:
-                    pass
                 return {"error": "No list object in layout", "layout": layout}
 
             list_object = layout["qLayout"]["qListObject"]
@@ -1685,15 +3715,6 @@ class QlikEngineAPI:
                 },
             }
 
-            try:
-                self.send_request(
-                    "DestroySessionObject",
-                    [f"field-values-{field_name}"],
-                    handle=app_handle,
-                )
-            except Exception as cleanup_error:
-                field_info["cleanup_warning"] = str(cleanup_error)
-
             # Fallback: ListObject sometimes returns empty qMatrix for fields
             # in fact tables (no state for high-cardinality keys). Try a
             # one-dimension hypercube instead — it always materializes values.
@@ -1732,7 +3753,6 @@ class QlikEngineAPI:
         ListObject returns empty.
         """
         try:
-            obj_id = f"field-values-fb-{field_name}"
             hypercube_def = {
                 "qDimensions": [
                     {
@@ -1763,20 +3783,20 @@ class QlikEngineAPI:
                 "qMode": "S",
             }
             obj_def = {
-                "qInfo": {"qId": obj_id, "qType": "HyperCube"},
+                "qInfo": {"qType": "HyperCube"},
                 "qHyperCubeDef": hypercube_def,
             }
-            result = self.send_request(
-                "CreateSessionObject", [obj_def], handle=app_handle,
-                timeout=self.ws_operation_timeout,
-            )
-            if "qReturn" not in result or "qHandle" not in result["qReturn"]:
-                return {"error": "fallback hypercube create failed", "values": []}
-            cube_handle = result["qReturn"]["qHandle"]
-            layout = self.send_request(
-                "GetLayout", [], handle=cube_handle,
-                timeout=self.ws_operation_timeout,
-            )
+            with self._object_scope() as scope:
+                result = self._create_session_object(scope, obj_def, app_handle,
+                                                     "field-values-fb",
+                                                     timeout=self.ws_operation_timeout)
+                if "qReturn" not in result or "qHandle" not in result["qReturn"]:
+                    return {"error": "fallback hypercube create failed", "values": []}
+                cube_handle = result["qReturn"]["qHandle"]
+                layout = self.send_request(
+                    "GetLayout", [], handle=cube_handle,
+                    timeout=self.ws_operation_timeout,
+                )
             values_data: List[Dict[str, Any]] = []
             try:
                 hc = layout["qLayout"]["qHyperCube"]
@@ -1795,12 +3815,6 @@ class QlikEngineAPI:
                 total_values = hc.get("qSize", {}).get("qcy", len(values_data))
             except Exception:
                 total_values = len(values_data)
-            try:
-                self.send_request(
-                    "DestroySessionObject", [obj_id], handle=app_handle
-                )
-            except Exception:
-                pass
             return {
                 "field_name": field_name,
                 "values": values_data,
@@ -1836,19 +3850,16 @@ class QlikEngineAPI:
                 "qSuppressZero": False,
                 "qSuppressMissing": False,
             }
-            obj_def = {
-                "qInfo": {"qId": f"field-range-{field_name}", "qType": "HyperCube"},
-                "qHyperCubeDef": hypercube_def,
-            }
-            result = self.send_request(
-                "CreateSessionObject", [obj_def], handle=app_handle,
-                timeout=self.ws_operation_timeout,
-            )
-            if "qReturn" not in result or "qHandle" not in result["qReturn"]:
-                return {"error": "Failed to create field-range hypercube", "response": result}
-            cube_handle = result["qReturn"]["qHandle"]
-            layout = self.send_request("GetLayout", [], handle=cube_handle,
-                                       timeout=self.ws_operation_timeout)
+            with self._object_scope() as scope:
+                cube, result = self._checkout_cube(
+                    scope, hypercube_def, app_handle, "field-range",
+                    timeout=self.ws_operation_timeout,
+                )
+                if cube is None:
+                    return {"error": "Failed to create field-range hypercube", "response": result}
+                layout = self.send_request("GetLayout", [], handle=cube.handle,
+                                           timeout=self.ws_operation_timeout)
+                self._checkin_cube(scope, cube)
             if "qLayout" not in layout or "qHyperCube" not in layout["qLayout"]:
                 return {"error": "No hypercube in layout", "layout": layout}
             hypercube = layout["qLayout"]["qHyperCube"]
@@ -1864,11 +3875,6 @@ class QlikEngineAPI:
                                             if cell.get("qNum") != "NaN" else None),
                                 "is_numeric": cell.get("qIsNumeric", False),
                             }
-            try:
-                self.send_request("DestroySessionObject",
-                                  [f"field-range-{field_name}"], handle=app_handle)
-            except Exception:
-                pass
             return stats
         except Exception as e:
             import traceback
@@ -1931,42 +3937,30 @@ class QlikEngineAPI:
                 "qSuppressMissing": False,
             }
 
-            obj_def = {
-                "qInfo": {"qId": f"field-stats-{field_name}", "qType": "HyperCube"},
-                "qHyperCubeDef": hypercube_def,
-            }
-
-            # Create session object
-            debug_log.append(f"Creating session object with obj_def: {obj_def}")
-            result = self.send_request(
-                "CreateSessionObject", [obj_def], handle=app_handle,
-                timeout=self.ws_operation_timeout,
-            )
-            debug_log.append(f"CreateSessionObject result: {result}")
-
-            if "qReturn" not in result or "qHandle" not in result["qReturn"]:
-                debug_log.append(f"Failed to create session object, returning error")
-                return {
-                    "error": "Failed to create statistics hypercube",
-                    "response": result,
-                    "debug_log": debug_log
-                }
+            # Warm or new session object; destroyed when the scope closes
+            # unless it goes back to the warm pool
+            debug_log.append(f"Preparing hypercube with def: {hypercube_def}")
+            with self._object_scope() as scope:
+                cube, result = self._checkout_cube(
+                    scope, hypercube_def, app_handle, "field-stats",
+                    timeout=self.ws_operation_timeout,
+                )
+                debug_log.append(f"CreateSessionObject/ApplyPatches result: {result}")
 
-            cube_handle = result["qReturn"]["qHandle"]
+                if cube is None:
+                    debug_log.append(f"Failed to create session object, returning error")
+                    return {
+                        "error": "Failed to create statistics hypercube",
+                        "response": result,
+                        "debug_log": debug_log
+                    }
 
-            # Get layout with data
-            layout = self.send_request("GetLayout", [], handle=cube_handle,
-                                       timeout=self.ws_operation_timeout)
+                # Get layout with data
+                layout = self.send_request("GetLayout", [], handle=cube.handle,
+                                           timeout=self.ws_operation_timeout)
+                self._checkin_cube(scope, cube)
 
             if "qLayout" not in layout or "qHyperCube" not in layout["qLayout"]:
-                try:
-                    self.send_request(
-                        "DestroySessionObject",
-                        [f"field-stats-{field_name}"],
-                        handle=app_handle,
-                    )
-                except Exception:
-                    pass
                 return {"error": "No hypercube in statistics layout", "layout": layout, "debug_log": debug_log}
 
             hypercube = layout["qLayout"]["qHyperCube"]
@@ -2030,16 +4024,6 @@ class QlikEngineAPI:
                     )
                     debug_log.append(f"Percentages calculated successfully")
 
-            # Cleanup
-            try:
-                self.send_request(
-                    "DestroySessionObject",
-                    [f"field-stats-{field_name}"],
-                    handle=app_handle,
-                )
-            except Exception as cleanup_error:
-                statistics["cleanup_warning"] = str(cleanup_error)
-
             statistics["debug_log"] = debug_log
             return statistics
 
@@ -2149,35 +4133,9 @@ class QlikEngineAPI:
         measures: List[str],
         max_rows: int = 1000,
     ) -> Dict[str, Any]:
-        """Create pivot table for complex data analysis."""
-        pivot_def = {
-            "qInfo": {"qType": "PivotTable"},
-            "qHyperCubeDef": {
-                "qDimensions": [
-                    {"qDef": {"qFieldDefs": [dim]}, "qNullSuppression": True}
-                    for dim in dimensions
-                ],
-                "qMeasures": [
-                    {"qDef": {"qDef": measure}, "qSortBy": {"qSortByNumeric": -1}}
-                    for measure in measures
-                ],
-                "qInitialDataFetch": [
-                    {
-                        "qTop": 0,
-                        "qLeft": 0,
-                        "qHeight": max_rows,
-                        "qWidth": len(converted_dimensions) + len(converted_measures),
-                    }
-                ],
-                "qSuppressZero": True,
-                "qSuppressMissing": True,
-            },
-        }
-
-        result = self.send_request(
-            "CreateSessionObject", {"qProp": pivot_def}, handle=app_handle
-        )
-        return result
+        """Pivot table with every dimension on the rows; see ``create_pivot_hypercube``."""
+        return self.create_pivot_hypercube(app_handle, dimensions, None, measures, "pivot",
+                                           max_rows)
 
     def calculate_expression(
         self, app_handle: int, expression: str, dimensions: List[str] = None
@@ -2246,190 +4204,68 @@ class QlikEngineAPI:
 
     def create_data_export(
         self,
+        app_id: str,
         app_handle: int,
+        sink: RowSink,
         table_name: str = None,
         fields: List[str] = None,
-        format_type: str = "json",
-        max_rows: int = 10000,
+        max_rows: Optional[int] = None,
         filters: Dict[str, Any] = None,
     ) -> Dict[str, Any]:
-        """Create data export in various formats (JSON, CSV-like structure)."""
-        try:
-            # If no specific fields provided, get all fields from table
-            if not fields:
-                if table_name:
-                    fields_result = self.get_fields(app_handle)
-                    if "error" in fields_result:
-                        return fields_result
-
-                    table_fields = []
-                    for field in fields_result.get("fields", []):
-                        if field.get("table_name") == table_name:
-                            table_fields.append(field["field_name"])
-
-                    if not table_fields:
-                        return {"error": f"No fields found for table '{table_name}'"}
-
-                    fields = table_fields[:50]  # Limit to 50 fields max
-                else:
-                    return {
-                        "error": "Either table_name or fields list must be provided"
-                    }
-
-            # Create hypercube for data extraction
-            hypercube_def = {
-                "qDimensions": [
-                    {
-                        "qDef": {
-                            "qFieldDefs": [field],
-                            "qSortCriterias": [
-                                {
-                                    "qSortByState": 0,
-                                    "qSortByFrequency": 0,
-                                    "qSortByNumeric": 1,
-                                    "qSortByAscii": 1,
-                                    "qSortByLoadOrder": 1,
-                                    "qSortByExpression": 0,
-                                    "qExpression": {"qv": ""},
-                                }
-                            ],
-                        },
-                        "qNullSuppression": False,
-                        "qIncludeElemValue": True,
-                    }
-                    for field in fields
-                ],
-                "qMeasures": [],
-                "qInitialDataFetch": [
-                    {"qTop": 0, "qLeft": 0, "qHeight": max_rows, "qWidth": len(fields)}
-                ],
-                "qSuppressZero": False,
-                "qSuppressMissing": False,
-                "qMode": "S",
-            }
-
-            # Apply filters if provided
-            if filters:
-                # Add selection expressions as calculated dimensions
-                for field_name, filter_values in filters.items():
-                    if isinstance(filter_values, list):
-                        values_str = ", ".join([f"'{v}'" for v in filter_values])
-                        filter_expr = f"If(Match([{field_name}], {values_str}), [{field_name}], Null())"
-                    else:
-                        filter_expr = f"If([{field_name}] = '{filter_values}', [{field_name}], Null())"
-
-                    # Replace the original field with filtered version
-                    for dim in hypercube_def["qDimensions"]:
-                        if dim["qDef"]["qFieldDefs"][0] == field_name:
-                            dim["qDef"]["qFieldDefs"] = [filter_expr]
-                            break
-
-            obj_def = {
-                "qInfo": {
-                    "qId": f"data-export-{table_name or 'custom'}",
-                    "qType": "HyperCube",
-                },
-                "qHyperCubeDef": hypercube_def,
+        """
+        Stream the rows of ``fields`` (default: every field of ``table_name``) into ``sink``.
+
+        The fields become the dimensions of a cube that is paged to disk
+        by ``export_hypercube``, so memory stays bounded by one page for
+        any row count. ``filters`` maps field names to a value or a list of
+        values; they become one set-analysis ``Count`` that is computed
+        next to the rows but not written, and zero suppression drops every
+        row outside the filter — the Engine narrows the data before it
+        combines it, instead of evaluating ``If(Match(...))`` row by row.
+        At most ``MAX_EXPORT_FIELDS`` fields are exported: a longer
+        ``fields`` list is rejected, a wider table is cut to its first
+        ``MAX_EXPORT_FIELDS`` fields and the rest listed in
+        ``omitted_fields``. Returns the ``export_hypercube`` summary
+        (``path``, ``rows``, ``sha256``, ...) or an error dict.
+        """
+        omitted: List[str] = []
+        if fields and len(fields) > MAX_EXPORT_FIELDS:
+            return {
+                "error": f"{len(fields)} fields exceed the limit of {MAX_EXPORT_FIELDS} per export",
+                "error_category": "limit_exceeded",
+                "hint": "Export fewer fields; every extra field multiplies the distinct rows "
+                        "the Engine has to combine.",
             }
-
-            # Create session object
-            result = self.send_request(
-                "CreateSessionObject", [obj_def], handle=app_handle
+        if not fields:
+            if not table_name:
+                return {"error": "Either table_name or fields list must be provided",
+                        "error_category": "invalid_request"}
+            fields_data = self.cached_fields(app_id, app_handle)
+            if "error" in fields_data:
+                return fields_data
+            fields = [f["field_name"] for f in fields_data.get("fields", [])
+                      if f.get("table_name") == table_name and not f.get("is_system")]
+            if not fields:
+                return {"error": f"No fields found for table '{table_name}'",
+                        "error_category": "invalid_request"}
+            fields, omitted = fields[:MAX_EXPORT_FIELDS], fields[MAX_EXPORT_FIELDS:]
+
+        row_filter = None
+        if filters:
+            modifiers = ",".join(
+                set_modifier(name, values if isinstance(values, list) else [values])
+                for name, values in filters.items()
             )
-
-            if "qReturn" not in result or "qHandle" not in result["qReturn"]:
-                return {
-                    "error": "Failed to create export hypercube",
-                    "response": result,
-                }
-
-            cube_handle = result["qReturn"]["qHandle"]
-
-            # Get layout with data
-            layout = self.send_request("GetLayout", [], handle=cube_handle)
-
-            if "qLayout" not in layout or "qHyperCube" not in layout["qLayout"]:
-                try:
-                    self.send_request(
-                        "DestroySessionObject",
-                        [f"data-export-{table_name or 'custom'}"],
-                        handle=app_handle,
-                    )
-                except Exception:
-                    pass
-                return {"error": "No hypercube in export layout", "layout": layout}
-
-            hypercube = layout["qLayout"]["qHyperCube"]
-
-            # Process data based on format
-            export_data = []
-            headers = fields
-
-            for page in hypercube.get("qDataPages", []):
-                for row in page.get("qMatrix", []):
-                    if format_type.lower() == "json":
-                        row_data = {}
-                        for i, cell in enumerate(row):
-                            if i < len(headers):
-                                row_data[headers[i]] = {
-                                    "text": cell.get("qText", ""),
-                                    "numeric": (
-                                        cell.get("qNum", None)
-                                        if cell.get("qNum") != "NaN"
-                                        else None
-                                    ),
-                                    "is_numeric": cell.get("qIsNumeric", False),
-                                }
-                        export_data.append(row_data)
-
-                    elif format_type.lower() == "csv":
-                        # CSV-like structure (list of values)
-                        row_values = []
-                        for cell in row:
-                            row_values.append(cell.get("qText", ""))
-                        export_data.append(row_values)
-
-                    elif format_type.lower() == "simple":
-                        # Simple key-value structure
-                        row_data = {}
-                        for i, cell in enumerate(row):
-                            if i < len(headers):
-                                row_data[headers[i]] = cell.get("qText", "")
-                        export_data.append(row_data)
-
-            result_data = {
-                "export_format": format_type,
-                "table_name": table_name,
-                "fields": headers,
-                "data": export_data,
-                "metadata": {
-                    "total_rows": hypercube.get("qSize", {}).get("qcy", 0),
-                    "exported_rows": len(export_data),
-                    "total_columns": len(headers),
-                    "filters_applied": filters is not None,
-                    "export_timestamp": None,  # Could be added with datetime.now() if needed
-                    "dimension_info": hypercube.get("qDimensionInfo", []),
-                },
-            }
-
-            # Add CSV headers if CSV format
-            if format_type.lower() == "csv":
-                result_data["csv_headers"] = headers
-
-            # Cleanup
-            try:
-                self.send_request(
-                    "DestroySessionObject",
-                    [f"data-export-{table_name or 'custom'}"],
-                    handle=app_handle,
-                )
-            except Exception as cleanup_error:
-                result_data["cleanup_warning"] = str(cleanup_error)
-
-            return result_data
-
-        except Exception as e:
-            return {"error": str(e), "details": "Error in create_data_export method"}
+            first = next(iter(filters))
+            row_filter = "Count({<" + modifiers + ">} [" + first.replace("]", "]]") + "])"
+        result = self.export_hypercube(app_handle, sink, [{"field": f} for f in fields], [],
+                                       max_rows=max_rows, row_filter=row_filter)
+        if "error" not in result:
+            result["table_name"] = table_name
+            result["filters"] = filters or {}
+            if omitted:
+                result["omitted_fields"] = omitted
+        return result
 
     def get_visualization_data(self, app_handle: int, object_id: str) -> Dict[str, Any]:
         """Get data from existing visualization object (chart, table, etc.)."""
@@ -2875,12 +4711,15 @@ class QlikEngineAPI:
                 }
             }
 
-            variable_list_response = self.send_request("CreateSessionObject", [variable_list_def], handle=app_handle)
-            if "qReturn" not in variable_list_response:
-                return []
+            with self._object_scope() as scope:
+                variable_list_response = self._create_session_object(
+                    scope, variable_list_def, app_handle, "variablelist"
+                )
+                if "qReturn" not in variable_list_response:
+                    return []
 
-            variable_list_handle = variable_list_response["qReturn"]["qHandle"]
-            layout_response = self.send_request("GetLayout", [], handle=variable_list_handle)
+                variable_list_handle = variable_list_response["qReturn"]["qHandle"]
+                layout_response = self.send_request("GetLayout", [], handle=variable_list_handle)
 
             variables = layout_response.get("qLayout", {}).get("qVariableList", {}).get("qItems", [])
 
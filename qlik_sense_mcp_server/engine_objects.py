@@ -0,0 +1,205 @@
+"""
+Lifecycle of temporary Engine session objects.
+
+Most Engine helpers build a throw-away session object (``HyperCube``,
+``SheetList``, ``VariableList`` ...), read its layout and are done with it.
+On a pooled connection that stays open for hours, every object that is not
+destroyed keeps its handle and its calculation state alive on the Engine,
+growing memory and the set of objects the Engine re-validates on every
+selection change.
+
+``SessionObjectScope`` records every session object created inside it and
+destroys all of them when the scope closes — on error paths too — with the
+``DestroySessionObject`` calls pipelined into one round trip. Objects whose
+destroy times out are parked in ``OrphanedObjects`` and retried by the
+periodic sweeper in ``QlikEngineAPI``. Objects on a socket that has since
+closed are simply dropped: the Engine freed them with the session.
+
+``WarmCubePool`` keeps a few HyperCube session objects alive per socket
+after use. The next query re-targets one with ``ApplyPatches`` on
+``/qHyperCubeDef`` instead of creating a fresh object, which saves the
+object setup and lets the Engine reuse calculation state between similar
+queries of one analysis session.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (transport, app_handle, qId)
+SessionObject = Tuple[Any, int, str]
+
+
+def new_object_id(prefix: str) -> str:
+    """Unique ``qId`` so concurrent calls on one session never collide."""
+    return f"mcp-{prefix}-{uuid.uuid4().hex[:12]}"
+
+
+def destroy_objects(objects: List[SessionObject], timeout: float) -> List[SessionObject]:
+    """
+    Destroy session objects, pipelined per socket.
+
+    Returns the objects whose ``DestroySessionObject`` did not answer within
+    ``timeout`` seconds. Objects on closed sockets, and objects the Engine
+    reports as already gone, count as destroyed.
+    """
+    submitted = []
+    for obj in objects:
+        transport, app_handle, qid = obj
+        if transport.closed:
+            continue
+        try:
+            req_id, future = transport.submit("DestroySessionObject", [qid], app_handle)
+        except ConnectionError:
+            continue
+        submitted.append((obj, req_id, future))
+
+    deadline = time.monotonic() + timeout
+    failed: List[SessionObject] = []
+    for obj, req_id, future in submitted:
+        transport, _, qid = obj
+        try:
+            frame = future.result(timeout=max(deadline - time.monotonic(), 0.0))
+        except FutureTimeoutError:
+            transport.forget(req_id)
+            failed.append(obj)
+            continue
+        except ConnectionError:
+            continue
+        if "error" in frame:
+            logger.debug("DestroySessionObject %s: %s", qid, frame["error"])
+    return failed
+
+
+class OrphanedObjects:
+    """Session objects whose destroy failed; retried by the sweeper."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._objects: List[SessionObject] = []
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._objects)
+
+    def add(self, objects: List[SessionObject]) -> None:
+        if not objects:
+            return
+        with self._lock:
+            self._objects.extend(objects)
+        logger.warning("%d session object(s) could not be destroyed; the sweeper will retry",
+                       len(objects))
+
+    def retry(self, timeout: float) -> int:
+        """Retry every parked destroy; returns how many are still pending."""
+        with self._lock:
+            objects, self._objects = self._objects, []
+        failed = destroy_objects(objects, timeout) if objects else []
+        with self._lock:
+            self._objects.extend(failed)
+            return len(self._objects)
+
+
+class SessionObjectScope:
+    """Session objects created during one call, destroyed together on ``close``."""
+
+    def __init__(self, orphans: OrphanedObjects, destroy_timeout: float) -> None:
+        self._orphans = orphans
+        self._destroy_timeout = destroy_timeout
+        self._objects: List[SessionObject] = []
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def add(self, transport: Any, app_handle: int, qid: str) -> None:
+        self._objects.append((transport, app_handle, qid))
+
+    def release(self, qid: str) -> bool:
+        """Stop tracking ``qid`` (ownership moves elsewhere); False if unknown."""
+        for i, (_, _, known) in enumerate(self._objects):
+            if known == qid:
+                del self._objects[i]
+                return True
+        return False
+
+    def close(self) -> None:
+        objects, self._objects = self._objects, []
+        if objects:
+            self._orphans.add(destroy_objects(objects, self._destroy_timeout))
+
+
+class WarmCube:
+    """A HyperCube session object checked out of ``WarmCubePool``."""
+
+    def __init__(self, transport: Any, app_handle: int, qid: str, handle: int) -> None:
+        self.transport = transport
+        self.app_handle = app_handle
+        self.qid = qid
+        self.handle = handle
+        self.uses = 0
+
+
+class WarmCubePool:
+    """
+    Idle HyperCube session objects, per socket and app handle.
+
+    A cube is used by one call at a time: ``checkout`` removes it from the
+    pool and ``checkin`` puts it back. At most ``max_per_socket`` idle cubes
+    are kept per socket; ``checkin`` returns False when the pool is full and
+    the caller should destroy the cube instead. Cubes on closed sockets are
+    dropped lazily.
+    """
+
+    def __init__(self, max_per_socket: int) -> None:
+        self.max_per_socket = max(0, max_per_socket)
+        self._lock = threading.Lock()
+        self._idle: Dict[int, List[WarmCube]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def checkout(self, transport: Any, app_handle: int) -> Optional[WarmCube]:
+        with self._lock:
+            self._prune()
+            cubes = self._idle.get(id(transport), [])
+            for i, cube in enumerate(cubes):
+                if cube.transport is transport and cube.app_handle == app_handle:
+                    del cubes[i]
+                    self.hits += 1
+                    cube.uses += 1
+                    return cube
+            self.misses += 1
+            return None
+
+    def checkin(self, cube: WarmCube) -> bool:
+        if cube.transport.closed:
+            return False
+        with self._lock:
+            cubes = self._idle.setdefault(id(cube.transport), [])
+            if len(cubes) >= self.max_per_socket:
+                return False
+            cubes.append(cube)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune()
+            return {
+                "max_per_socket": self.max_per_socket,
+                "idle": sum(len(c) for c in self._idle.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _prune(self) -> None:
+        for key in [k for k, cubes in self._idle.items()
+                    if not cubes or cubes[0].transport.closed]:
+            del self._idle[key]
@@ -0,0 +1,132 @@
+"""
+Paging through HyperCubes larger than one ``GetHyperCubeData`` page.
+
+``create_hypercube`` deliberately returns only what fits into its
+``qInitialDataFetch`` page. Batch extractions that genuinely need the whole
+cube go through ``QlikEngineAPI.iter_hypercube_pages`` instead, which reads
+the cube one bounded page at a time and hands every page to the caller
+(usually a sink from ``sinks``), so memory stays flat however large the
+cube is.
+
+``HypercubePager`` decides the page geometry and keeps up to ``window``
+page requests in flight on the pipelined transport, so page i+1 is being
+computed while page i is still on the wire or being written. Pages are
+yielded strictly in row order; at most ``window`` of them are buffered.
+Every page spans all columns and as many rows as fit under the cell
+budget (the Engine refuses pages above 10 000 cells). When a page times
+out the pager cancels everything in flight, halves its height and
+resumes from that page's first row; after a run of successful pages it
+doubles the height again, up to the budget.
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The Engine rejects data pages above 10 000 cells; stay below it.
+MAX_PAGE_CELLS = 9900
+
+# Consecutive successful pages before a shrunken page height is doubled.
+GROW_AFTER_PAGES = 4
+
+
+class HypercubePager:
+    """
+    Adaptive, windowed ``(top, height)`` page reads of ``total_rows`` rows.
+
+    ``submit(top, height)`` sends one page request and returns a
+    ``Future`` of its ``qMatrix`` rows; ``cancel(future)`` (optional) aborts
+    a request that is no longer wanted. Each page is waited for at most
+    ``timeout`` seconds. A page that comes back shorter than asked (the
+    Engine trims pages it cannot fill) is followed by a request for the
+    missing rows before any later page is yielded; an empty page ends the
+    read early.
+    """
+
+    def __init__(
+        self,
+        submit: Callable[[int, int], Future],
+        n_cols: int,
+        total_rows: int,
+        page_cells: int = MAX_PAGE_CELLS,
+        window: int = 1,
+        timeout: Optional[float] = None,
+        cancel: Optional[Callable[[Future], None]] = None,
+    ) -> None:
+        self._submit = submit
+        self._cancel = cancel
+        self.total_rows = max(0, total_rows)
+        self.max_height = max(1, min(page_cells, MAX_PAGE_CELLS) // max(1, n_cols))
+        self.height = self.max_height
+        self.window = max(1, window)
+        self.timeout = timeout
+        self.pages = 0
+        self.rows = 0
+        self.timeouts = 0
+        self.min_height = self.max_height
+
+    def __iter__(self) -> Iterator[Tuple[int, List[Any]]]:
+        inflight: Deque[Tuple[int, int, Future]] = deque()
+        next_top = 0
+        streak = 0
+        try:
+            while True:
+                while len(inflight) < self.window and next_top < self.total_rows:
+                    height = min(self.height, self.total_rows - next_top)
+                    inflight.append((next_top, height, self._submit(next_top, height)))
+                    next_top += height
+                if not inflight:
+                    return
+                top, height, future = inflight[0]
+                try:
+                    matrix = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    self.timeouts += 1
+                    self._cancel_all(inflight)
+                    if height == 1:
+                        raise FutureTimeoutError(
+                            f"Hypercube page at row {top} timed out even at a height of one row"
+                        )
+                    self.height = max(1, height // 2)
+                    self.min_height = min(self.min_height, self.height)
+                    next_top = top
+                    streak = 0
+                    logger.info("Hypercube page at row %d timed out; page height now %d",
+                                top, self.height)
+                    continue
+                inflight.popleft()
+                if not matrix:
+                    logger.warning("Hypercube page at row %d came back empty; stopping at %d of %d rows",
+                                   top, top, self.total_rows)
+                    return
+                if len(matrix) < height:
+                    gap_top, gap_height = top + len(matrix), height - len(matrix)
+                    inflight.appendleft((gap_top, gap_height, self._submit(gap_top, gap_height)))
+                self.pages += 1
+                self.rows += len(matrix)
+                yield top, matrix
+                streak += 1
+                if self.height < self.max_height and streak >= GROW_AFTER_PAGES:
+                    self.height = min(self.max_height, self.height * 2)
+                    streak = 0
+        finally:
+            self._cancel_all(inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pages": self.pages,
+            "rows": self.rows,
+            "page_height": self.max_height,
+            "min_page_height": self.min_height,
+            "page_timeouts": self.timeouts,
+            "page_window": self.window,
+        }
+
+    def _cancel_all(self, inflight: Deque[Tuple[int, int, Future]]) -> None:
+        while inflight:
+            _, _, future = inflight.pop()
+            if self._cancel is not None and not future.done():
+                self._cancel(future)
@@ -0,0 +1,432 @@
+"""
+Pool of open Engine documents keyed by ``app_id``.
+
+A Qlik Engine session holds at most one open document, so every app the
+analyst touches gets its own WebSocket (``EngineTransport``) with the app
+opened on it. Before the pool existed ``QlikEngineAPI`` cached exactly one
+app: alternating between two apps closed the socket and re-ran ``OpenDoc``
+on every switch, which costs tens of seconds on multi-GB apps.
+
+``EngineSessionPool`` keeps up to ``max_docs`` documents open and evicts
+the least recently used one when a new app has to be opened, plus any
+document that has been idle for longer than ``idle_ttl`` seconds. Evicted
+documents are handed to the ``close_session`` callback, which closes the
+document and the socket. A session a tool call is still bound to is never
+closed under it: LRU eviction prefers unused sessions, idle eviction skips
+busy ones, and a busy session that has to leave the pool anyway is closed
+on its last ``release``.
+
+``AppSessionLeases`` adds up to N extra sessions for one hot app, each on
+its own ``/identity/<name>`` Engine session, leased out exclusively to one
+tool call at a time. Heavy hypercubes against the same app then compute
+side by side on the Engine instead of queueing behind each other on the
+single pooled socket. Waiters are served strictly first come, first
+served.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EngineSession:
+    """One Engine WebSocket with one opened document on it."""
+
+    def __init__(
+        self,
+        app_id: str,
+        transport: Any,
+        app_handle: int,
+        has_data: bool,
+        open_seconds: float = 0.0,
+        identity: Optional[str] = None,
+    ) -> None:
+        self.app_id = app_id
+        self.transport = transport
+        self.app_handle = app_handle
+        self.has_data = has_data
+        self.open_seconds = open_seconds
+        # Engine session identity (``/identity/<name>`` URL suffix); None
+        # for the default session of the user.
+        self.identity = identity
+        self.opened_at = time.time()
+        self.last_used = time.monotonic()
+        self.hits = 0
+        # Threads currently bound to this session (see EngineSessionPool.acquire).
+        self.in_use = 0
+        # Dropped from the pool while in use; closed on the last release.
+        self.close_pending = False
+
+    @property
+    def ws(self) -> Any:
+        return self.transport.ws
+
+    def touch(self) -> None:
+        """Record one reuse of this session."""
+        self.hits += 1
+        self.last_used = time.monotonic()
+
+    def idle_seconds(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.monotonic()) - self.last_used
+
+    def is_alive(self) -> bool:
+        """Check that the transport is open and the socket answers a ping."""
+        if self.transport.closed:
+            return False
+        ws = self.ws
+        if not ws or not ws.connected:
+            return False
+        try:
+            self.transport.ping()
+            return True
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "app_id": self.app_id,
+            "identity": self.identity,
+            "app_handle": self.app_handle,
+            "has_data": self.has_data,
+            "opened_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.opened_at)),
+            "open_seconds": round(self.open_seconds, 3),
+            "hits": self.hits,
+            "in_use": self.in_use,
+            "idle_seconds": round(self.idle_seconds(), 1),
+            "live_handles": self.transport.live_handles,
+        }
+
+
+class EngineSessionPool:
+    """
+    LRU + idle-TTL pool of ``EngineSession`` objects keyed by ``app_id``.
+
+    The pool never opens sessions itself — ``QlikEngineAPI.ensure_app``
+    does that and calls ``add``. It only decides which sessions to keep and
+    closes the rest through ``close_session``.
+    """
+
+    def __init__(
+        self,
+        max_docs: int,
+        idle_ttl: float,
+        close_session: Callable[[EngineSession], None],
+    ) -> None:
+        self.max_docs = max(1, max_docs)
+        self.idle_ttl = idle_ttl
+        self._close_session = close_session
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, EngineSession]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, app_id: str) -> bool:
+        with self._lock:
+            return app_id in self._entries
+
+    def get(self, app_id: str) -> Optional[EngineSession]:
+        """Return the session for ``app_id`` (marking it most recently used)."""
+        with self._lock:
+            session = self._entries.get(app_id)
+            if session is not None:
+                self._entries.move_to_end(app_id)
+            return session
+
+    def acquire(self, app_id: str) -> Optional[EngineSession]:
+        """
+        Like ``get``, but marks the session in use until ``release``.
+
+        Eviction never closes a session in use; see ``release``.
+        """
+        with self._lock:
+            session = self.get(app_id)
+            if session is not None:
+                session.in_use += 1
+            return session
+
+    def release(self, session: EngineSession) -> None:
+        """
+        Undo one ``acquire`` (or ``add(..., acquire=True)``).
+
+        Restarts the idle clock, and closes the session if it was evicted
+        while in use and this was its last user.
+        """
+        with self._lock:
+            session.in_use = max(0, session.in_use - 1)
+            session.last_used = time.monotonic()
+            close = session.in_use == 0 and session.close_pending
+            if close:
+                session.close_pending = False
+        if close:
+            self._close_all([session], "released after eviction")
+
+    def add(self, session: EngineSession, acquire: bool = False) -> None:
+        """
+        Register a freshly opened session, evicting others if needed.
+
+        With ``acquire`` the session is marked in use by the caller, as if
+        by ``acquire``, before any other thread can evict it.
+        """
+        with self._lock:
+            if acquire:
+                session.in_use += 1
+            previous = self._entries.pop(session.app_id, None)
+            evicted = self._retire([previous]) if previous not in (None, session) else []
+            evicted.extend(self._pop_lru(self.max_docs - 1))
+            self._entries[session.app_id] = session
+        self._close_all(evicted, "replaced or LRU")
+
+    def sessions(self) -> List[EngineSession]:
+        """Snapshot of the pooled sessions, least recently used first."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def make_room(self) -> None:
+        """Evict LRU sessions so one more document can be opened."""
+        with self._lock:
+            evicted = self._pop_lru(self.max_docs - 1)
+        self._close_all(evicted, "LRU")
+
+    def discard(self, app_id: str, session: Optional[EngineSession] = None,
+                close: bool = True) -> Optional[EngineSession]:
+        """
+        Drop ``app_id`` from the pool. When ``session`` is given, only drop
+        it if it is still the registered one (a concurrent reopen wins).
+        """
+        with self._lock:
+            current = self._entries.get(app_id)
+            if current is None or (session is not None and current is not session):
+                return None
+            del self._entries[app_id]
+            if close:
+                to_close = self._retire([current])
+        if close:
+            self._close_all(to_close, "discarded")
+        return current
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """Close every unused session idle for longer than ``idle_ttl``."""
+        if self.idle_ttl <= 0:
+            return []
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            stale = [s for s in self._entries.values()
+                     if not s.in_use and s.idle_seconds(now) > self.idle_ttl]
+            for s in stale:
+                del self._entries[s.app_id]
+            self.evictions += len(stale)
+        self._close_all(stale, "idle TTL")
+        return [s.app_id for s in stale]
+
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._entries.values())
+            self._entries.clear()
+        self._close_all(sessions, "pool shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = [s.stats() for s in reversed(self._entries.values())]
+            return {
+                "max_open_docs": self.max_docs,
+                "idle_ttl_seconds": self.idle_ttl,
+                "open_docs": len(entries),
+                "evictions": self.evictions,
+                "sessions": entries,
+            }
+
+    # ─── internals ─────────────────────────────────────────────────────
+
+    def _pop_lru(self, keep: int) -> List[EngineSession]:
+        """
+        Pop entries until at most ``keep`` remain, unused ones first, least
+        recently used first. Returns the sessions to close now; busy ones
+        are closed on their last ``release``.
+        """
+        excess = len(self._entries) - max(keep, 0)
+        if excess <= 0:
+            return []
+        order = sorted(self._entries.values(), key=lambda s: s.in_use > 0)
+        popped = order[:excess]
+        for session in popped:
+            del self._entries[session.app_id]
+        self.evictions += len(popped)
+        return self._retire(popped)
+
+    @staticmethod
+    def _retire(sessions: List[EngineSession]) -> List[EngineSession]:
+        """Split dropped sessions: return the unused ones, defer the busy ones."""
+        unused = []
+        for session in sessions:
+            if session.in_use:
+                session.close_pending = True
+            else:
+                unused.append(session)
+        return unused
+
+    def _close_all(self, sessions: List[EngineSession], reason: str) -> None:
+        for session in sessions:
+            logger.info("Closing Engine session for app %s (%s)", session.app_id, reason)
+            try:
+                self._close_session(session)
+            except Exception as e:
+                logger.warning("Failed to close Engine session for app %s: %s",
+                               session.app_id, e)
+
+
+class AppSessionLeases:
+    """
+    Bounded, FIFO-fair set of extra Engine sessions for one app.
+
+    ``acquire`` hands out an idle session, or opens a new one through
+    ``open_session`` while fewer than ``max_sessions`` exist, or waits.
+    Sessions are opened outside the lock, so several callers arriving at
+    once open their sessions in parallel. Waiters are served in arrival
+    order: a caller only takes a session once every earlier caller got one.
+    """
+
+    def __init__(
+        self,
+        app_id: str,
+        max_sessions: int,
+        open_session: Callable[[], EngineSession],
+        close_session: Callable[[EngineSession], None],
+    ) -> None:
+        self.app_id = app_id
+        self.max_sessions = max(1, max_sessions)
+        self._open_session = open_session
+        self._close_session = close_session
+        self._cond = threading.Condition()
+        self._idle: List[EngineSession] = []
+        self._sessions: List[EngineSession] = []
+        self._waiters: "deque[object]" = deque()
+        self._total = 0
+        self._closed = False
+        self.leases = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, timeout: float) -> EngineSession:
+        """
+        Lease a session, waiting at most ``timeout`` seconds for a free one.
+
+        Raises ``TimeoutError`` if none became free in time and
+        ``ConnectionError`` if the lease set was closed meanwhile.
+        """
+        t0 = time.monotonic()
+        deadline = t0 + timeout
+        ticket = object()
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    if self._closed:
+                        raise ConnectionError(f"Session leases for app {self.app_id} are closed")
+                    if self._waiters[0] is ticket:
+                        if self._idle:
+                            session = self._idle.pop()
+                            break
+                        if self._total < self.max_sessions:
+                            self._total += 1
+                            session = None
+                            break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"No Engine session for app {self.app_id} became free within "
+                            f"{timeout:.1f}s ({self.max_sessions} sessions, all leased)"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+            self.leases += 1
+            self.wait_seconds += time.monotonic() - t0
+
+        # A pooled session may have died while idle; replace it in place
+        # (its slot is already counted in ``_total``).
+        if session is not None:
+            if session.is_alive():
+                session.touch()
+                return session
+            self._close_quietly(session)
+        try:
+            session = self._open_session()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._sessions.append(session)
+        return session
+
+    def release(self, session: EngineSession) -> None:
+        """Return a leased session; dead sessions free their slot instead."""
+        with self._cond:
+            keep = not self._closed and not session.transport.closed
+            if keep:
+                session.last_used = time.monotonic()
+                self._idle.append(session)
+            else:
+                self._total -= 1
+            self._cond.notify_all()
+        if not keep:
+            self._close_quietly(session)
+
+    def evict_idle(self, idle_ttl: float, now: Optional[float] = None) -> int:
+        """Close idle sessions unused for longer than ``idle_ttl`` seconds."""
+        if idle_ttl <= 0:
+            return 0
+        now = now if now is not None else time.monotonic()
+        with self._cond:
+            stale = [s for s in self._idle if s.idle_seconds(now) > idle_ttl]
+            self._idle = [s for s in self._idle if s not in stale]
+            self._total -= len(stale)
+            self._cond.notify_all()
+        for s in stale:
+            self._close_quietly(s)
+        return len(stale)
+
+    def close(self) -> None:
+        """Close idle sessions now; leased ones are closed on release."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for s in idle:
+            self._close_quietly(s)
+
+    def sessions(self) -> List[EngineSession]:
+        """Snapshot of every open session, leased or idle."""
+        with self._cond:
+            return list(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "app_id": self.app_id,
+                "max_sessions": self.max_sessions,
+                "open_sessions": self._total,
+                "leased": self._total - len(self._idle),
+                "waiting": len(self._waiters),
+                "leases": self.leases,
+                "wait_seconds_total": round(self.wait_seconds, 3),
+            }
+
+    def _close_quietly(self, session: EngineSession) -> None:
+        with self._cond:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        try:
+            self._close_session(session)
+        except Exception as e:
+            logger.warning("Failed to close leased Engine session for app %s: %s",
+                           self.app_id, e)
@@ -0,0 +1,276 @@
+"""
+Pipelined JSON-RPC 2.0 transport over a single Engine WebSocket.
+
+The Engine API is a plain JSON-RPC 2.0 protocol: every request carries an
+``id`` and the Engine answers with a frame carrying the same ``id``. It does
+NOT require the client to wait for one answer before sending the next
+request — replies may arrive in any order and the Engine happily works on
+several requests of one session at once.
+
+``EngineTransport`` exploits that. A dedicated reader thread owns the
+receive side of the socket and dispatches every incoming frame to the
+``Future`` registered for its ``id``. Callers submit requests from any
+thread and either wait on a single future (``QlikEngineAPI.send_request``)
+or submit a whole batch first and collect the answers afterwards
+(``QlikEngineAPI.send_requests``), paying one round trip per dependency
+level instead of one per call.
+
+Frames without an ``id`` are Engine notifications (``OnConnected``,
+``OnAuthenticated``, ``OnSessionTimedOut``, change events) and are logged
+and dropped. Frames whose ``id`` has no pending future are late replies to
+requests the caller already gave up on; they are logged and dropped too,
+so they can never be mistaken for the answer to a newer request.
+
+A request the caller stops waiting for is normally ``cancel``-ed: the
+Engine is asked to abort it with ``CancelRequest`` and its late reply
+(the result or a "request aborted" error) is drained quietly, so the
+socket and the documents opened on it stay usable.
+"""
+
+import json
+import logging
+import socket
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import websocket
+
+logger = logging.getLogger(__name__)
+
+
+class EngineTransport:
+    """
+    Owns one Engine WebSocket and multiplexes JSON-RPC requests over it.
+
+    The transport is the only code that touches the socket: the reader
+    thread is the only caller of ``recv()`` and every write (``submit``,
+    ``ping``) goes through one send lock, so ``submit`` can be called from
+    any number of threads. The reader thread is started in the constructor
+    and stops when the socket is closed — either explicitly via ``close()``
+    or because the connection dropped, in which case every pending future
+    fails with ``ConnectionError``.
+    """
+
+    def __init__(self, ws: Any, name: str = "engine") -> None:
+        self._ws = ws
+        self._name = name
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        # Ids of cancelled requests whose late reply is still expected.
+        self._cancelled: Set[int] = set()
+        # Object handles the Engine opened on this socket and has not yet
+        # reported in a frame's ``close`` list.
+        self._handles: Set[int] = set()
+        self._next_id = 0
+        self._closed = False
+        self._close_reason: Optional[str] = None
+        self._reader = threading.Thread(
+            target=self._read_loop, name=f"qlik-{name}-reader", daemon=True
+        )
+        self._reader.start()
+
+    # ─── public surface ────────────────────────────────────────────────
+
+    @property
+    def ws(self) -> Any:
+        """The underlying ``websocket.WebSocket`` (for ping / diagnostics)."""
+        return self._ws
+
+    @property
+    def closed(self) -> bool:
+        """True once the transport was closed or the socket dropped."""
+        with self._lock:
+            return self._closed
+
+    @property
+    def pending_count(self) -> int:
+        """Number of requests sent but not yet answered."""
+        with self._lock:
+            return len(self._pending)
+
+    @property
+    def live_handles(self) -> int:
+        """Object handles currently open on this socket."""
+        with self._lock:
+            return len(self._handles)
+
+    def submit(
+        self, method: str, params: Any = None, handle: int = -1,
+    ) -> Tuple[int, Future]:
+        """
+        Send one JSON-RPC request and return ``(request_id, future)``.
+
+        The future resolves to the raw response frame (a dict that contains
+        either ``result`` or ``error``). Raises ``ConnectionError`` right
+        away if the transport is closed or the frame cannot be sent.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise ConnectionError(
+                    f"Engine transport is closed ({self._close_reason or 'closed'})"
+                )
+            self._next_id += 1
+            req_id = self._next_id
+            self._pending[req_id] = future
+
+        request = {
+            "jsonrpc": "2.0",
+            "id": req_id,
+            "handle": handle,
+            "method": method,
+            "params": params if params is not None else [],
+        }
+        try:
+            with self._send_lock:
+                self._ws.send(json.dumps(request))
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(req_id, None)
+            self.close(f"send failed: {type(e).__name__}: {e}")
+            raise ConnectionError(
+                f"WebSocket send() failed for Engine method '{method}' "
+                f"(handle={handle}, req_id={req_id}): {type(e).__name__}: {e}"
+            ) from e
+        return req_id, future
+
+    def ping(self) -> None:
+        """Send a WebSocket ping frame; raises if the socket is unusable."""
+        if self.closed:
+            raise ConnectionError("Engine transport is closed")
+        with self._send_lock:
+            self._ws.ping()
+
+    def cancel(self, req_id: int) -> bool:
+        """
+        Stop waiting for ``req_id`` and ask the Engine to abort it.
+
+        Sends ``CancelRequest`` without waiting for its answer. The late
+        reply to ``req_id`` is drained silently by the reader thread.
+        Returns False if the request was no longer pending or the cancel
+        could not be sent (the transport is then closed).
+        """
+        with self._lock:
+            if self._pending.pop(req_id, None) is None:
+                return False
+            self._cancelled.add(req_id)
+        try:
+            self.submit("CancelRequest", {"qRequestId": req_id}, -1)
+        except ConnectionError:
+            return False
+        return True
+
+    @property
+    def cancelled_count(self) -> int:
+        """Cancelled requests whose late reply has not arrived yet."""
+        with self._lock:
+            return len(self._cancelled)
+
+    def forget(self, req_id: int) -> None:
+        """Stop waiting for ``req_id``; a late reply will be dropped."""
+        with self._lock:
+            self._pending.pop(req_id, None)
+
+    def close(self, reason: Optional[str] = None) -> None:
+        """Close the socket and fail every pending future. Idempotent."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._close_reason = reason or "closed by client"
+            pending = list(self._pending.items())
+            self._pending.clear()
+            self._cancelled.clear()
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+        self._fail(pending, self._close_reason)
+
+    # ─── reader thread ─────────────────────────────────────────────────
+
+    def _read_loop(self) -> None:
+        while True:
+            try:
+                data = self._ws.recv()
+            except (websocket.WebSocketTimeoutException, socket.timeout, TimeoutError):
+                # Idle socket — per-request timeouts are enforced by the
+                # waiting caller, not here.
+                if self.closed:
+                    return
+                continue
+            except Exception as e:
+                self.close(f"recv failed: {type(e).__name__}: {e}")
+                return
+
+            if self.closed:
+                return
+            if not data:
+                if not getattr(self._ws, "connected", True):
+                    self.close("connection closed by server")
+                    return
+                continue
+
+            try:
+                frame = json.loads(data)
+            except Exception as parse_err:
+                # Unparseable frame — the stream can no longer be trusted.
+                self.close(f"failed to parse WebSocket frame: {parse_err}")
+                return
+
+            if isinstance(frame, dict):
+                self._track_handles(frame)
+            frame_id = frame.get("id") if isinstance(frame, dict) else None
+            if frame_id is None:
+                logger.debug(
+                    "%s transport: skipping notification: %s",
+                    self._name, frame.get("method", "<no-method>")
+                    if isinstance(frame, dict) else "<non-object>",
+                )
+                continue
+
+            with self._lock:
+                future = self._pending.pop(frame_id, None)
+                drained = future is None and frame_id in self._cancelled
+                if drained:
+                    self._cancelled.discard(frame_id)
+            if drained:
+                logger.debug("%s transport: drained late reply to cancelled request id=%s",
+                             self._name, frame_id)
+                continue
+            if future is None:
+                logger.warning(
+                    "%s transport: discarding stale frame with id=%s (late "
+                    "reply to a request the caller stopped waiting for)",
+                    self._name, frame_id,
+                )
+                continue
+            if not future.done():
+                future.set_result(frame)
+
+    def _track_handles(self, frame: Dict[str, Any]) -> None:
+        """Count handles from ``qReturn`` results and ``close`` lists."""
+        result = frame.get("result")
+        opened = None
+        if isinstance(result, dict):
+            ret = result.get("qReturn")
+            if isinstance(ret, dict) and ret.get("qType") and isinstance(ret.get("qHandle"), int):
+                opened = ret["qHandle"]
+        closed = frame.get("close") or []
+        if opened is None and not closed:
+            return
+        with self._lock:
+            if opened is not None:
+                self._handles.add(opened)
+            for h in closed:
+                self._handles.discard(h)
+
+    @staticmethod
+    def _fail(pending: List[Tuple[int, Future]], reason: str) -> None:
+        for req_id, future in pending:
+            if not future.done():
+                future.set_exception(ConnectionError(
+                    f"Engine connection lost before reply to req_id={req_id}: {reason}"
+                ))
@@ -0,0 +1,473 @@
+"""
+Pre-flight planning of hypercube requests.
+
+``create_hypercube`` only checks ``max_rows`` against the column count;
+everything else is discovered by the Engine, often after minutes. The
+planner looks at a request before anything is sent, using the app's field
+index (``GetTablesAndKeys``: distinct values per field and rows per
+table), and:
+
+- estimates the worst-case row count as the product of the dimensions'
+  distinct values, capped by the rows of the largest table involved;
+- estimates the rows each measure scans, narrowed by the set-analysis
+  element lists it can parse (``{<Year={2024,2025}>}`` scans 2 of the
+  field's distinct values);
+- flags per-row ``If()`` inside aggregations, ``=``-prefixed dimensions
+  and expression sorts over high-cardinality dimensions;
+- rewrites what it can do safely, but only for requests that would be
+  expensive as sent: ``Sum(If(Year=2025, X))`` becomes
+  ``Sum({<[Year]*={"=[Year]=2025"}>}X)`` and ``=[Field]`` becomes ``Field``;
+- turns the estimate into a cost class using a rough Engine throughput.
+
+The numbers are heuristics meant to catch requests that are obviously
+going to time out, not a query optimizer.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from .utils import (
+    SET_AGGREGATIONS,
+    find_closing,
+    iter_function_calls,
+    leading_set,
+    skip_quoted,
+)
+
+# Rough Engine throughput for a plain aggregation, in row visits per second.
+ROWS_PER_SECOND = 2e8
+# Cost multipliers relative to a plain aggregation over the same rows.
+PER_ROW_IF_WEIGHT = 10.0
+CALCULATED_DIMENSION_WEIGHT = 10.0
+AGGR_WEIGHT = 5.0
+DISTINCT_WEIGHT = 2.0
+# Dimensions above this many distinct values make qSortByExpression slow.
+HIGH_CARDINALITY = 1_000_000
+
+COST_CLASSES = ("cheap", "moderate", "expensive", "prohibitive")
+# Cost classes worth rewriting for; cheaper requests are sent as they are.
+REWRITE_CLASSES = ("expensive", "prohibitive")
+
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+_BARE_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_.]*$")
+_NULL_ELSE = re.compile(r"^(0|null\(\s*\))$", re.IGNORECASE)
+_AND = re.compile(r"\s+and\s+", re.IGNORECASE)
+_EQUALITY_SEARCH = re.compile(r'''^"=\[((?:[^\]]|\]\])+)\]=(-?\d+(\.\d+)?|'[^"]*')"$''')
+
+
+class FieldIndex:
+    """Distinct values per field and rows per table of one app."""
+
+    def __init__(self, fields: List[Dict[str, Any]]) -> None:
+        self.distinct: Dict[str, int] = {}
+        self.table_of: Dict[str, str] = {}
+        self.table_rows: Dict[str, int] = {}
+        for f in fields:
+            if f.get("is_system"):
+                continue
+            name = f.get("field_name") or f.get("name")
+            table = f.get("table_name") or f.get("table") or ""
+            if not name:
+                continue
+            rows = f.get("rows_count") or f.get("rows") or 0
+            self.table_rows[table] = max(self.table_rows.get(table, 0), rows)
+            # Key fields appear once per table; keep the largest cardinality.
+            self.distinct[name] = max(self.distinct.get(name, 0), f.get("distinct_values") or 0)
+            if rows >= self.table_rows.get(self.table_of.get(name, ""), 0):
+                self.table_of[name] = table
+
+    @classmethod
+    def from_fields_data(cls, fields_data: Any) -> Optional["FieldIndex"]:
+        """Index from ``get_fields`` output; None if it carries no fields."""
+        if not isinstance(fields_data, dict) or not fields_data.get("fields"):
+            return None
+        return cls(fields_data["fields"])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.distinct
+
+    @property
+    def largest_table_rows(self) -> int:
+        return max(self.table_rows.values(), default=0)
+
+    def rows_for(self, names: List[str]) -> int:
+        """Rows of the largest table holding any of ``names`` (largest table overall if none is known)."""
+        rows = [self.table_rows.get(self.table_of[n], 0) for n in names if n in self.table_of]
+        return max(rows) if rows else self.largest_table_rows
+
+    def referenced(self, expression: str) -> List[str]:
+        """Known fields referenced in ``expression`` (bracketed or bare)."""
+        found: List[str] = []
+        i, n = 0, len(expression)
+        while i < n:
+            ch = expression[i]
+            if ch == "[":
+                end = skip_quoted(expression, i)
+                name = expression[i + 1:end - 1].replace("]]", "]")
+                i = end
+            elif ch in "'\"":
+                end = skip_quoted(expression, i)
+                name = expression[i + 1:end - 1] if ch == '"' else ""
+                i = end
+            elif ch.isalpha() or ch == "_":
+                j = i
+                while j < n and (expression[j].isalnum() or expression[j] in "_."):
+                    j += 1
+                name, i = expression[i:j], j
+            else:
+                i += 1
+                continue
+            if name in self.distinct and name not in found:
+                found.append(name)
+        return found
+
+
+def plan_hypercube(
+    index: FieldIndex,
+    dimensions: List[Dict[str, Any]],
+    measures: List[Dict[str, Any]],
+    max_rows: int,
+    timeout: float,
+    rewrite: bool = True,
+) -> Dict[str, Any]:
+    """
+    Estimate and, with ``rewrite``, repair one normalized hypercube request.
+
+    Returns ``dimensions`` / ``measures`` (rewritten copies),
+    ``suppress_zero``, ``estimated_rows``, ``scan_rows``,
+    ``estimated_seconds``, ``cost_class``, ``issues`` and ``rewrites``.
+    ``cost_class`` is ``prohibitive`` when the estimate exceeds ``timeout``.
+
+    Rewrites are only applied to requests estimated ``expensive`` or
+    ``prohibitive`` as sent; anything cheaper is returned unchanged, with
+    ``suppress_zero`` off. Zero suppression is only turned on when every
+    measure was rewritten and restricts a dimension field.
+    """
+    dims = [dict(d) for d in dimensions]
+    meas = [dict(m) for m in measures]
+    plan = _estimate(index, dims, meas, max_rows, timeout, {})
+    if not rewrite or plan["cost_class"] not in REWRITE_CLASSES:
+        return plan
+
+    dims = [dict(d) for d in dimensions]
+    meas = [dict(m) for m in measures]
+    rewrites: List[Dict[str, Any]] = []
+    for i, dim in enumerate(dims):
+        field = dim.get("field", "")
+        if field.startswith("="):
+            plain = _plain_field(field[1:], index)
+            if plain is not None:
+                rewrites.append({"target": f"dimensions[{i}]", "from": field, "to": plain,
+                                 "reason": "calculated dimension that is just a field"})
+                dim["field"] = plain
+    rewritten_measures = 0
+    for i, measure in enumerate(meas):
+        rewritten = _rewrite_if_aggregations(measure["expression"])
+        if rewritten != measure["expression"]:
+            rewrites.append({"target": f"measures[{i}]", "from": measure["expression"],
+                             "to": rewritten, "reason": "per-row If() replaced by set analysis"})
+            measure["expression"] = rewritten
+            rewritten_measures += 1
+    if not rewrites:
+        return plan
+
+    narrowed_everywhere: Dict[str, int] = {}
+    if meas and rewritten_measures == len(meas):
+        restricted = [_set_restrictions(m["expression"], index) for m in meas]
+        narrowed_everywhere = {
+            f: max(r[f] for r in restricted)
+            for f in (d.get("field", "") for d in dims) if all(f in r for r in restricted)
+        }
+    plan = _estimate(index, dims, meas, max_rows, timeout, narrowed_everywhere)
+    if plan["suppress_zero"]:
+        rewrites.append({
+            "target": "suppress_zero", "from": False, "to": True,
+            "reason": "every measure restricts " + ", ".join(sorted(narrowed_everywhere))
+                      + "; rows outside the restriction would be all-empty",
+        })
+    plan["rewrites"] = rewrites
+    return plan
+
+
+def _estimate(
+    index: FieldIndex,
+    dims: List[Dict[str, Any]],
+    meas: List[Dict[str, Any]],
+    max_rows: int,
+    timeout: float,
+    narrowed_everywhere: Dict[str, int],
+) -> Dict[str, Any]:
+    """Cost of a request as given; zero rows are suppressed when ``narrowed_everywhere`` is set."""
+    issues: List[Dict[str, Any]] = []
+    dim_fields = [d.get("field", "") for d in dims]
+    restricted = [_set_restrictions(m["expression"], index) for m in meas]
+    suppress_zero = bool(narrowed_everywhere)
+    estimated_rows = 1
+    for i, field in enumerate(dim_fields):
+        if field.startswith("="):
+            issues.append(_issue("error", "calculated_dimension", f"dimensions[{i}]",
+                                 "'=' expression in a dimension is evaluated for every row of the "
+                                 "data model. Use a plain field (or a pre-built calendar field)."))
+            estimated_rows *= index.largest_table_rows or 1
+            continue
+        if field not in index:
+            issues.append(_issue("warning", "unknown_field", f"dimensions[{i}]",
+                                 f"Field {field!r} is not in the data model (names are case-sensitive)."))
+            continue
+        card = index.distinct[field]
+        if suppress_zero and field in narrowed_everywhere:
+            card = min(card, narrowed_everywhere[field])
+        if dims[i].get("top_n"):
+            # Engine-side top-N: N values plus the "Others" row.
+            card = min(card, int(dims[i]["top_n"]) + 1)
+        estimated_rows *= max(1, card)
+        if (dims[i].get("sort_by", {}).get("qSortByExpression") and not dims[i].get("top_n")
+                and index.distinct[field] >= HIGH_CARDINALITY):
+            issues.append(_issue("warning", "expression_sort_high_cardinality", f"dimensions[{i}]",
+                                 f"qSortByExpression over {index.distinct[field]:,} values sorts the whole "
+                                 "field; keep max_rows small and narrow with set analysis."))
+    known_dims = [f for f in dim_fields if f in index]
+    if dims:
+        cap = index.rows_for(known_dims) if known_dims else index.largest_table_rows
+        if cap:
+            estimated_rows = min(estimated_rows, cap)
+    else:
+        estimated_rows = 1
+    if estimated_rows > max_rows:
+        issues.append(_issue("info", "truncated", "max_rows",
+                             f"Up to ~{estimated_rows:,} rows but max_rows={max_rows}: the result will be "
+                             "truncated. Narrow with set analysis, use top-N, or pass slice_by."))
+
+    # Work: rows each measure scans, weighted by how it computes.
+    scan_rows = 0.0
+    work = 0.0
+    for i, measure in enumerate(meas):
+        expr = measure["expression"]
+        rows = index.rows_for(index.referenced(expr) + known_dims)
+        rows *= _narrowing(restricted[i], index)
+        weight = 1.0
+        if _has_if_in_aggregation(expr):
+            weight *= PER_ROW_IF_WEIGHT
+            issues.append(_issue("warning", "per_row_if", f"measures[{i}]",
+                                 "If() inside an aggregation is evaluated row by row; use set "
+                                 "analysis {<Field={value}>} instead."))
+        lowered = expr.lower()
+        if re.search(r"\baggr\s*\(", lowered):
+            weight *= AGGR_WEIGHT
+        if re.search(r"\bdistinct\b", lowered):
+            weight *= DISTINCT_WEIGHT
+        scan_rows += rows
+        work += rows * weight
+    for field in dim_fields:
+        if field.startswith("="):
+            work += (index.largest_table_rows or 0) * CALCULATED_DIMENSION_WEIGHT
+    if not meas and dims:
+        work += index.rows_for(known_dims)
+
+    seconds = work / ROWS_PER_SECOND
+    if seconds >= timeout:
+        cost_class = "prohibitive"
+    elif seconds >= timeout / 4:
+        cost_class = "expensive"
+    elif seconds >= 1.0:
+        cost_class = "moderate"
+    else:
+        cost_class = "cheap"
+
+    return {
+        "dimensions": dims,
+        "measures": meas,
+        "suppress_zero": suppress_zero,
+        "estimated_rows": int(estimated_rows),
+        "scan_rows": int(scan_rows),
+        "estimated_seconds": round(seconds, 2),
+        "cost_class": cost_class,
+        "issues": issues,
+        "rewrites": [],
+    }
+
+
+def _issue(severity: str, kind: str, target: str, message: str) -> Dict[str, Any]:
+    return {"severity": severity, "kind": kind, "target": target, "message": message}
+
+
+def _plain_field(expression: str, index: FieldIndex) -> Optional[str]:
+    """Field name if ``expression`` is just ``[Field]`` or ``Field`` of a known field."""
+    expression = expression.strip()
+    if expression.startswith("[") and expression.endswith("]"):
+        name = expression[1:-1].replace("]]", "]")
+    elif _BARE_FIELD.match(expression):
+        name = expression
+    else:
+        return None
+    return name if name in index else None
+
+
+def _split_top_level(text: str, sep: str = ",") -> List[str]:
+    """Split on ``sep`` outside brackets, parentheses, braces and literals."""
+    parts, depth, start, i = [], 0, 0, 0
+    while i < len(text):
+        ch = text[i]
+        if ch in "'\"[":
+            i = skip_quoted(text, i)
+            continue
+        if ch in "({":
+            depth += 1
+        elif ch in ")}":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _set_restrictions(expression: str, index: FieldIndex) -> Dict[str, int]:
+    """
+    Fields restricted to an explicit element list in every aggregation's set.
+
+    ``{<Year={2024,2025}>}`` restricts ``Year`` to 2 values, and so does
+    ``Year*={...}``. Searches (``"..."``) other than the planner's own
+    ``"=[Year]=2025"``, dollar expansions, set operators and ``+=``-style
+    modifiers are not parsed and do not count as narrowing. Returns
+    ``{}`` if any aggregation has no set at all.
+    """
+    per_aggregation: List[Dict[str, int]] = []
+    done = 0
+    for name, _, paren in iter_function_calls(expression):
+        if name.lower() not in SET_AGGREGATIONS or paren < done:
+            continue
+        span = leading_set(expression, paren)
+        if span is None:
+            return {}
+        start, end = span
+        done = end + 1
+        per_aggregation.append(_parse_set(expression[start + 1:end].strip(), index))
+    if not per_aggregation:
+        return {}
+    common = set(per_aggregation[0]).intersection(*per_aggregation[1:])
+    return {f: max(r[f] for r in per_aggregation) for f in common}
+
+
+def _parse_set(body: str, index: FieldIndex) -> Dict[str, int]:
+    """Element counts of ``<F={a,b}, ...>`` in a single-modifier set body (with optional identifier)."""
+    match = re.match(r"^(\$|1)?\s*<(.*)>$", body, re.DOTALL)
+    if not match:
+        return {}
+    counts: Dict[str, int] = {}
+    for part in _split_top_level(match.group(2)):
+        field, sep, values = part.partition("=")
+        field = field.strip()
+        values = values.strip()
+        if field.endswith("*"):
+            # Intersection with the selection narrows at least as much.
+            field = field[:-1].rstrip()
+        if not sep or field.endswith(("+", "-", "*", "/")) or not values.startswith("{"):
+            continue
+        if field.startswith("[") and field.endswith("]"):
+            field = field[1:-1].replace("]]", "]")
+        if field not in index or find_closing(values, 0) != len(values) - 1:
+            continue
+        elements = [e.strip() for e in _split_top_level(values[1:-1]) if e.strip()]
+        if elements and all(e.startswith("'") or _NUMBER.match(e) or _is_equality_search(e, field)
+                            for e in elements):
+            counts[field] = len(elements)
+    return counts
+
+
+def _is_equality_search(element: str, field: str) -> bool:
+    """True for ``"=[field]=v"``, the single-value search ``_rewrite_if_aggregations`` writes."""
+    match = _EQUALITY_SEARCH.match(element)
+    return bool(match) and match.group(1).replace("]]", "]") == field
+
+
+def _narrowing(restrictions: Dict[str, int], index: FieldIndex) -> float:
+    """Fraction of rows scanned under ``restrictions``, assuming evenly spread values."""
+    fraction = 1.0
+    for field, count in restrictions.items():
+        distinct = index.distinct.get(field) or 0
+        if distinct > 0:
+            fraction *= min(1.0, count / distinct)
+    return fraction
+
+
+def _has_if_in_aggregation(expression: str) -> bool:
+    spans = []
+    for name, _, paren in iter_function_calls(expression):
+        lowered = name.lower()
+        if lowered in SET_AGGREGATIONS:
+            end = find_closing(expression, paren)
+            if end is not None:
+                spans.append((paren, end))
+        elif lowered == "if" and any(a < paren < b for a, b in spans):
+            return True
+    return False
+
+
+def _rewrite_if_aggregations(expression: str) -> str:
+    """
+    ``Agg(If(F=v and G=w, X))`` → ``Agg({<[F]*={"=[F]=v"},[G]*={"=[G]=w"}>}X)``.
+
+    The search repeats the If() test on each field value, so dual values
+    compare exactly as before (``{1}`` would match the text ``1``), and
+    ``*=`` keeps the user's selections on the field instead of replacing
+    them. Only rewrites aggregations without a set whose whole argument is an
+    ``If()`` with equality tests on plain fields joined by ``and``; an
+    else branch is allowed only if it is ``Null()``, or ``0`` under
+    ``Sum``. Everything else is left for the caller to fix.
+    """
+    out: List[str] = []
+    done = 0
+    for name, _, paren in iter_function_calls(expression):
+        if name.lower() not in SET_AGGREGATIONS or paren < done:
+            continue
+        if leading_set(expression, paren) is not None:
+            continue
+        close = find_closing(expression, paren)
+        if close is None:
+            continue
+        replacement = _if_as_set(name, expression[paren + 1:close])
+        if replacement is None:
+            continue
+        out.append(expression[done:paren + 1] + replacement + ")")
+        done = close + 1
+    out.append(expression[done:])
+    return "".join(out)
+
+
+def _if_as_set(aggregation: str, argument: str) -> Optional[str]:
+    match = re.match(r"^\s*if\s*\(", argument, re.IGNORECASE)
+    if not match:
+        return None
+    open_paren = match.end() - 1
+    close = find_closing(argument, open_paren)
+    if close is None or argument[close + 1:].strip():
+        return None
+    args = [a.strip() for a in _split_top_level(argument[open_paren + 1:close])]
+    if len(args) not in (2, 3) or not args[1]:
+        return None
+    if len(args) == 3:
+        if not _NULL_ELSE.match(args[2]):
+            return None
+        if args[2] == "0" and aggregation.lower() != "sum":
+            return None
+    modifiers = []
+    for term in _AND.split(args[0]):
+        field, sep, value = term.partition("=")
+        field, value = field.strip(), value.strip()
+        if not sep or field.endswith(("<", ">", "!")) or value.startswith("="):
+            return None
+        if field.startswith("[") and field.endswith("]"):
+            name = field[1:-1].replace("]]", "]")
+        elif _BARE_FIELD.match(field):
+            name = field
+        else:
+            return None
+        if not _NUMBER.match(value) and not (
+                len(value) >= 2 and value[0] == value[-1] == "'"
+                and skip_quoted(value, 0) == len(value) and '"' not in value):
+            return None
+        bracketed = "[" + name.replace("]", "]]") + "]"
+        modifiers.append(bracketed + '*={"=' + bracketed + "=" + value + '"}')
+    return "{<" + ",".join(modifiers) + ">}" + args[1]
@@ -0,0 +1,281 @@
+"""
+Background profiling of a whole app.
+
+``get_app_table_profiles`` answers within one tool call, so on a large app
+an agent still ends up issuing many slow statistics calls. ``ProfileJob``
+walks every table and field of an app on a worker thread instead, cheapest
+work first:
+
+1. the symbol tables (``GetTablesAndKeys``): rows, distinct values, key
+   flag and type tags of every field — no computation at all;
+2. light statistics (``PROFILE_STATS``) of every field, resolved from the
+   symbol tables and cheap on any table size;
+3. heavy statistics (``HEAVY_PROFILE_STATS``: avg, sum, median, mode,
+   stdev) of the numeric, non-key, non-date fields of tables with at most
+   ``heavy_max_rows`` rows — these scan rows.
+
+Steps 2 and 3 are split per table and run on up to ``concurrency`` worker
+threads, each on its own leased Engine session; every light step is queued
+before the first heavy one. A step that has not started when the
+wall-clock budget runs out is skipped and listed in the profile, which is
+then marked incomplete. The finished profile is handed to ``on_done`` —
+the server stores it in the metadata cache. ``ProfileJobs`` keeps one job
+per app.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .engine_api import HEAVY_PROFILE_STATS, PROFILE_STATS
+from .exceptions import QlikEngineError
+
+logger = logging.getLogger(__name__)
+
+# Type tags that rule a field out of heavy statistics.
+_NO_HEAVY_TAGS = ("$key", "$date", "$timestamp")
+
+
+def _symbol_tables(fields_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """``{table: {"rows", "fields": {name: symbol info}}}`` from ``get_fields``, system tables skipped."""
+    tables: Dict[str, Dict[str, Any]] = {}
+    for field in fields_data.get("fields", []):
+        if field.get("is_system"):
+            continue
+        table = tables.setdefault(field["table_name"],
+                                  {"rows": field.get("rows_count", 0), "fields": {}})
+        table["fields"][field["field_name"]] = {
+            "field_name": field["field_name"],
+            "distinct_values": field.get("distinct_values", 0),
+            "is_key": bool(field.get("is_key")),
+            "tags": field.get("tags", []),
+        }
+    return tables
+
+
+def _wants_heavy(info: Dict[str, Any]) -> bool:
+    tags = info.get("tags", [])
+    return ("$numeric" in tags and not info.get("is_key")
+            and not any(tag in tags for tag in _NO_HEAVY_TAGS))
+
+
+class ProfileJob:
+    """
+    One background profiling run of an app.
+
+    ``state`` goes ``pending`` → ``running`` → ``finished`` (``profile`` is
+    set) or ``failed`` (``error`` is set). ``done`` / ``total`` count the
+    light and heavy steps; ``total`` is known once the symbol tables have
+    been read.
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        app_id: str,
+        budget_seconds: float,
+        concurrency: int,
+        heavy_max_rows: int,
+        on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.engine = engine
+        self.app_id = app_id
+        self.budget_seconds = budget_seconds
+        self.concurrency = max(1, concurrency)
+        self.heavy_max_rows = heavy_max_rows
+        self.on_done = on_done
+        self.state = "pending"
+        self.done = 0
+        self.total = 0
+        self.message = "queued"
+        self.profile: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._t0 = time.monotonic()
+        self._elapsed: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self.state in ("pending", "running")
+
+    def start(self) -> "ProfileJob":
+        self.state = "running"
+        self._thread = threading.Thread(target=self._run, name=f"qlik-profile-{self.app_id}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job ends or ``timeout`` passes; True when it has ended."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
+
+    def progress(self) -> Dict[str, Any]:
+        """``{app_id, state, done, total, message, elapsed_seconds, budget_seconds, error?}``."""
+        with self._lock:
+            elapsed = self._elapsed if self._elapsed is not None else time.monotonic() - self._t0
+            progress = {
+                "app_id": self.app_id,
+                "state": self.state,
+                "done": self.done,
+                "total": self.total,
+                "message": self.message,
+                "elapsed_seconds": round(elapsed, 3),
+                "budget_seconds": self.budget_seconds,
+            }
+            if self.error:
+                progress["error"] = self.error
+            return progress
+
+    def _run(self) -> None:
+        try:
+            profile = self._profile()
+        except Exception as e:
+            logger.exception("Profiling app %s failed", self.app_id)
+            with self._lock:
+                self.state, self.error = "failed", str(e) or repr(e)
+                self.message = "failed"
+                self._elapsed = time.monotonic() - self._t0
+            return
+        if self.on_done is not None:
+            try:
+                self.on_done(profile)
+            except Exception:
+                logger.exception("Storing the profile of app %s failed", self.app_id)
+        with self._lock:
+            self.profile, self.state, self.message = profile, "finished", "finished"
+            self._elapsed = time.monotonic() - self._t0
+
+    def _profile(self) -> Dict[str, Any]:
+        deadline = self._t0 + self.budget_seconds
+        with self.engine.lease(self.app_id, timeout=self.budget_seconds) as handle:
+            reload_time = self.engine.get_app_reload_time(handle)
+            fields_data = self.engine.cached_fields(self.app_id, handle, reload_time)
+        if "error" in fields_data:
+            raise QlikEngineError(f"Could not read the data model: {fields_data['error']}")
+        tables = _symbol_tables(fields_data)
+
+        # A field shared by several tables (a key) is profiled once, with
+        # the first table that lists it.
+        steps: List[Tuple[str, str, List[str]]] = []
+        for kind in ("light", "heavy"):
+            seen = set()
+            for name in sorted(tables):
+                table = tables[name]
+                if kind == "heavy" and not 0 < table["rows"] <= self.heavy_max_rows:
+                    continue
+                fields = [f for f, info in table["fields"].items()
+                          if f not in seen and (kind == "light" or _wants_heavy(info))]
+                seen.update(fields)
+                if fields:
+                    steps.append((kind, name, fields))
+        with self._lock:
+            self.total = len(steps)
+            self.message = f"read {len(tables)} symbol tables"
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(len(steps), self.concurrency)),
+                                      thread_name_prefix="qlik-profile")
+        try:
+            futures = [executor.submit(self._run_step, kind, table, fields, deadline)
+                       for kind, table, fields in steps]
+            outcomes = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        stats: Dict[str, Dict[str, Dict[str, Any]]] = {"light": {}, "heavy": {}}
+        skipped: List[Dict[str, str]] = []
+        errors: List[Dict[str, str]] = []
+        for (kind, table, _), (status, value) in zip(steps, outcomes):
+            if status == "done":
+                stats[kind].update(value)
+            elif status == "skipped":
+                skipped.append({"kind": kind, "table": table})
+            else:
+                errors.append({"kind": kind, "table": table, "error": value})
+
+        profiled_tables = []
+        for name in sorted(tables):
+            table = tables[name]
+            fields = []
+            for field_name, info in table["fields"].items():
+                entry = dict(info)
+                for kind in ("light", "heavy"):
+                    computed = stats[kind].get(field_name)
+                    if computed is None:
+                        continue
+                    if "error" in computed:
+                        entry[f"{kind}_error"] = computed["error"]
+                    else:
+                        entry.update((k, v) for k, v in computed.items() if k != "field_name")
+                fields.append(entry)
+            profiled_tables.append({
+                "table": name,
+                "rows": table["rows"],
+                "heavy_stats": 0 < table["rows"] <= self.heavy_max_rows,
+                "fields": fields,
+            })
+        return {
+            "app_id": self.app_id,
+            "reload_time": reload_time,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "complete": not skipped and not errors,
+            "tables": profiled_tables,
+            "fields_profiled": len(stats["light"]) + len(stats["heavy"]),
+            "skipped_steps": skipped,
+            "errors": errors,
+            "heavy_max_rows": self.heavy_max_rows,
+            "budget_seconds": self.budget_seconds,
+            "elapsed_seconds": round(time.monotonic() - self._t0, 3),
+        }
+
+    def _run_step(self, kind: str, table: str, fields: List[str],
+                  deadline: float) -> Tuple[str, Any]:
+        """One table's light or heavy stats; returns ``(done | skipped | error, value)``."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._step_done(f"{kind} statistics of {table} skipped: budget exhausted")
+            return "skipped", None
+        stats = PROFILE_STATS if kind == "light" else HEAVY_PROFILE_STATS
+        try:
+            with self.engine.lease(self.app_id, timeout=remaining) as handle:
+                profiles, _ = self.engine.profile_fields(handle, fields, stats,
+                                                         timeout=max(1.0, deadline - time.monotonic()))
+        except Exception as e:
+            logger.warning("Profiling %s statistics of %s in app %s failed: %s",
+                           kind, table, self.app_id, e)
+            self._step_done(f"{kind} statistics of {table} failed")
+            return "error", str(e) or repr(e)
+        self._step_done(f"{kind} statistics of {table}")
+        return "done", profiles
+
+    def _step_done(self, message: str) -> None:
+        with self._lock:
+            self.done += 1
+            self.message = message
+
+
+class ProfileJobs:
+    """The profiling job of each app: the running one, or the last one that ended."""
+
+    def __init__(self):
+        self._jobs: Dict[str, ProfileJob] = {}
+        self._lock = threading.Lock()
+
+    def start(self, engine: Any, app_id: str, **options: Any) -> Tuple[ProfileJob, bool]:
+        """Start a job for ``app_id`` unless one is running; returns ``(job, started)``."""
+        with self._lock:
+            job = self._jobs.get(app_id)
+            if job is not None and job.running:
+                return job, False
+            job = ProfileJob(engine, app_id, **options)
+            self._jobs[app_id] = job
+            job.start()
+        return job, True
+
+    def get(self, app_id: str) -> Optional[ProfileJob]:
+        with self._lock:
+            return self._jobs.get(app_id)
@@ -2,6 +2,7 @@
 
 import asyncio
 import functools
+import inspect
 import json
 import ssl
 import sys
@@ -18,7 +19,7 @@ if sys.platform == "win32":
     if hasattr(sys.stderr, "reconfigure"):
         sys.stderr.reconfigure(encoding="utf-8")
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 from .config import (
     QlikSenseConfig,
@@ -30,14 +31,24 @@ from .config import (
     DEFAULT_FIELD_FETCH_SIZE,
     MAX_FIELD_FETCH_SIZE,
     DEFAULT_TICKET_TIMEOUT,
+    DEFAULT_PROFILE_BUDGET,
+    DEFAULT_PROFILE_HEAVY_MAX_ROWS,
+    MAX_PROFILE_WAIT,
+    DEFAULT_SAMPLE_ROWS,
+    MAX_SAMPLE_ROWS,
     AUTH_MODE_JWT,
 )
 from .repository_api import QlikRepositoryAPI
-from .engine_api import QlikEngineAPI
+from .engine_api import PIVOT_MODES, REDUCTION_MODES, QlikEngineAPI
+from .engine_paging import MAX_PAGE_CELLS
+from .profiling import ProfileJobs
+from .sinks import SINK_FORMATS, open_sink, resolve_export_path
 from .jwt_session import JwtSession
-from .utils import generate_xrfkey
+from .cache import request_hash
+from .utils import decode_cursor, encode_columnar, encode_cursor, generate_xrfkey
 from . import __version__
 
+import anyio
 import httpx
 import logging
 from dotenv import load_dotenv
@@ -63,6 +74,8 @@ logger = logging.getLogger(__name__)
 config: Optional[QlikSenseConfig] = None
 repo_api: Optional[QlikRepositoryAPI] = None
 engine_api: Optional[QlikEngineAPI] = None
+# Background app profiling jobs (start_app_profiling / get_app_profile).
+profile_jobs = ProfileJobs()
 jwt_session: Optional[JwtSession] = None
 
 
@@ -109,7 +122,10 @@ def _err(msg: str, **extra: Any) -> str:
     return json.dumps(d, indent=2, ensure_ascii=False)
 
 
-def _ok(obj: Any) -> str:
+def _ok(obj: Any, compact: bool = False) -> str:
+    """JSON response; ``compact`` drops indentation and spaces for bulky payloads."""
+    if compact:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
     return json.dumps(obj, indent=2, ensure_ascii=False)
 
 
@@ -120,56 +136,137 @@ def _check() -> Optional[str]:
     return None
 
 
-def _timed(func):
+def _app_version(app_id: str) -> Optional[str]:
+    """QRS ``lastReloadTime|modifiedDate`` of an app; None if it cannot be read."""
+    try:
+        meta = repo_api.get_app_by_id(app_id)
+    except Exception as ex:
+        logger.debug("Could not read QRS dates of app %s: %s", app_id, ex)
+        return None
+    if not isinstance(meta, dict) or not meta.get("id"):
+        return None
+    return f"{meta.get('lastReloadTime', '')}|{meta.get('modifiedDate', '')}"
+
+
+# Metadata cache kind of the profiles built by start_app_profiling.
+PROFILE_KIND = "app_profile"
+
+
+def _metadata_key(kind: str, app_id: str, version: Optional[str] = None) -> Optional[tuple]:
     """
-    Decorator for MCP tools: measures wall-clock time and injects
-    `tool_call_seconds` as the first key of the JSON response.
+    Metadata cache key of ``kind`` for the app's current QRS reload /
+    modified dates; None when the cache is off or the dates cannot be read.
+    """
+    cache = engine_api.metadata_cache
+    if not cache.enabled:
+        return None
+    version = version or _app_version(app_id)
+    if version is None:
+        return None
+    cache.note_version(app_id, version)
+    return (app_id, version, request_hash({"kind": kind}))
 
-    Works with tools that return a JSON string (via _ok / _err).
-    If the result is not a JSON dict, wraps it into one.
+
+def _cached_metadata(kind: str, app_id: str, compute, version: Optional[str] = None) -> Any:
     """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        t0 = time.monotonic()
+    ``compute()`` through the metadata cache (memory, then the SQLite tier).
+
+    Keyed by ``app_id``, the app's QRS reload / modified dates and
+    ``kind``; a reload or republish of the app invalidates the entry.
+    Empty results and dicts with an ``error`` key are not cached — the
+    Engine helpers return those on failure.
+    """
+    key = _metadata_key(kind, app_id, version)
+    if key is None:
+        return compute()
+    cache = engine_api.metadata_cache
+    hit = cache.get(key)
+    if hit is not None:
+        return hit["value"]
+    value = compute()
+    if value and not (isinstance(value, dict) and "error" in value):
+        cache.put(key, {"value": value})
+    return value
+
+
+def _timed_result(result: Any, t0: float) -> str:
+    """The tool result as JSON with ``tool_call_seconds`` as its first key."""
+    elapsed = round(time.monotonic() - t0, 3)
+    if isinstance(result, str):
         try:
-            result = func(*args, **kwargs)
-        except Exception as ex:
-            elapsed = round(time.monotonic() - t0, 3)
-            logger.exception("Tool %s raised after %.3fs", func.__name__, elapsed)
+            parsed = json.loads(result)
+        except Exception:
             return json.dumps(
-                {
-                    "tool_call_seconds": elapsed,
-                    "error": str(ex) or repr(ex),
-                    "error_type": type(ex).__name__,
-                    "tool": func.__name__,
-                },
-                indent=2,
-                ensure_ascii=False,
-            )
-        elapsed = round(time.monotonic() - t0, 3)
-        if isinstance(result, str):
-            try:
-                parsed = json.loads(result)
-            except Exception:
-                return json.dumps(
-                    {"tool_call_seconds": elapsed, "result": result},
-                    indent=2,
-                    ensure_ascii=False,
-                )
-            if isinstance(parsed, dict):
-                new_dict = {"tool_call_seconds": elapsed}
-                new_dict.update(parsed)
-                return json.dumps(new_dict, indent=2, ensure_ascii=False)
-            return json.dumps(
-                {"tool_call_seconds": elapsed, "result": parsed},
+                {"tool_call_seconds": elapsed, "result": result},
                 indent=2,
                 ensure_ascii=False,
             )
+        if isinstance(parsed, dict):
+            new_dict = {"tool_call_seconds": elapsed}
+            new_dict.update(parsed)
+            return _ok(new_dict, compact=not result.startswith("{\n"))
         return json.dumps(
-            {"tool_call_seconds": elapsed, "result": result},
+            {"tool_call_seconds": elapsed, "result": parsed},
             indent=2,
             ensure_ascii=False,
         )
+    return json.dumps(
+        {"tool_call_seconds": elapsed, "result": result},
+        indent=2,
+        ensure_ascii=False,
+    )
+
+
+def _timed_error(func, ex: Exception, t0: float) -> str:
+    elapsed = round(time.monotonic() - t0, 3)
+    logger.exception("Tool %s raised after %.3fs", func.__name__, elapsed)
+    return json.dumps(
+        {
+            "tool_call_seconds": elapsed,
+            "error": str(ex) or repr(ex),
+            "error_type": type(ex).__name__,
+            "tool": func.__name__,
+        },
+        indent=2,
+        ensure_ascii=False,
+    )
+
+
+def _run_tool(func, *args, **kwargs):
+    """Run a sync tool on a worker thread, then unbind the thread's Engine session."""
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if engine_api is not None:
+            engine_api.release_thread()
+
+
+def _timed(func):
+    """
+    Decorator for MCP tools: measures wall-clock time and injects
+    `tool_call_seconds` as the first key of the JSON response.
+
+    Works with tools that return a JSON string (via _ok / _err). If the
+    result is not a JSON dict, wraps it into one. Compact results
+    (``_ok(..., compact=True)``) stay compact.
+
+    The wrapped tool is always a coroutine. FastMCP calls a sync tool
+    directly on the event-loop thread, so one slow Engine call would
+    stall every other client; sync tools therefore run on an anyio worker
+    thread and concurrent tool calls overlap; the thread gives its pooled
+    Engine session back when the call ends (see ``_run_tool``).
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        t0 = time.monotonic()
+        try:
+            if inspect.iscoroutinefunction(func):
+                result = await func(*args, **kwargs)
+            else:
+                result = await anyio.to_thread.run_sync(functools.partial(_run_tool, func, *args, **kwargs))
+        except Exception as ex:
+            return _timed_error(func, ex, t0)
+        return _timed_result(result, t0)
     return wrapper
 
 
@@ -422,9 +519,15 @@ def get_app_details(app_id: Optional[str] = None, name: Optional[str] = None) ->
     aid = resolved["app_id"]
 
     # Get tables and fields via Engine API (WebSocket)
-    try:
+    def _fields():
         app_handle = engine_api.ensure_app(aid, no_data=False)
-        fields_data = engine_api.get_fields(app_handle)
+        return engine_api.get_fields(app_handle)
+
+    version = None
+    if resolved.get("reload_dttm") or resolved.get("modified_dttm"):
+        version = f"{resolved.get('reload_dttm', '')}|{resolved.get('modified_dttm', '')}"
+    try:
+        fields_data = _cached_metadata("fields", aid, _fields, version=version)
     except Exception as ex:
         fields_data = {"error": str(ex)}
 
@@ -562,9 +665,12 @@ def get_app_script(app_id: str) -> str:
     if e:
         return e
     try:
-        # no_data=False so the cached connection is reusable for later data calls
-        app_handle = engine_api.ensure_app(app_id, no_data=False)
-        script = engine_api.get_script(app_handle)
+        def _script():
+            # no_data=False so the cached connection is reusable for later data calls
+            app_handle = engine_api.ensure_app(app_id, no_data=False)
+            return engine_api.get_script(app_handle)
+
+        script = _cached_metadata("script", app_id, _script)
         return _ok({"qScript": script, "app_id": app_id, "script_length": len(script) if script else 0})
     except Exception as ex:
         return _err(str(ex), app_id=app_id)
@@ -619,13 +725,229 @@ def get_app_field_statistics(
     if e:
         return e
     try:
-        app_handle = engine_api.ensure_app(app_id, no_data=False)
-        result = engine_api.get_field_statistics(app_handle, field_name, light=not full)
+        with engine_api.lease(app_id) as app_handle:
+            result = engine_api.get_field_statistics(app_handle, field_name, light=not full)
         return _ok(result)
     except Exception as ex:
         return _err(str(ex))
 
 
+@mcp.tool()
+@_timed
+def get_app_table_profiles(
+    app_id: str,
+    tables: Optional[List[str]] = None,
+) -> str:
+    """
+    Profile every field of one or more tables in one call.
+
+    Use this instead of calling `get_app_field_statistics` once per field:
+    the light statistics of ALL requested fields are packed into as few
+    measures-only hypercubes as Qlik's 10 000-cell page allows (about 1980
+    fields per cube) and fetched in one pipelined batch. Profiles are
+    cached until the app is reloaded.
+
+    Args:
+        app_id: Application GUID. Required.
+        tables: Table names from `get_app_details`. Omit to profile every
+            table of the data model.
+
+    Returns:
+        JSON `{tables, fields_profiled, cubes, elapsed_seconds}`. `tables`
+        holds one `{table, rows, fields, cache}` per table; each field is
+        `{field_name, unique_values, non_null_count, null_count,
+        completeness_percentage, min_value, max_value}` with min/max as
+        `{text, numeric}` — or `{field_name, error}`. Unknown table names
+        fail with `invalid_request` and the list of `available_tables`.
+    """
+    e = _check()
+    if e:
+        return e
+    try:
+        with engine_api.lease(app_id) as app_handle:
+            result = engine_api.profile_tables(app_id, app_handle, tables)
+        return _ok(result)
+    except Exception as ex:
+        logger.exception("get_app_table_profiles failed")
+        return _err(str(ex) or repr(ex), error_type=type(ex).__name__, app_id=app_id)
+
+
+@mcp.tool()
+@_timed
+def start_app_profiling(
+    app_id: str,
+    budget_seconds: float = DEFAULT_PROFILE_BUDGET,
+    concurrency: Optional[int] = None,
+    heavy_max_rows: int = DEFAULT_PROFILE_HEAVY_MAX_ROWS,
+    refresh: bool = False,
+) -> str:
+    """
+    Start profiling every table and field of an app in the background.
+
+    Returns at once; read the result (or the progress) with
+    `get_app_profile`. The job reads the symbol tables first (rows,
+    distinct values, key flags, type tags), then the light statistics of
+    every field (distinct / non-null / null counts, min, max), and last the
+    heavy ones (avg, sum, median, mode, stdev) of numeric, non-key,
+    non-date fields — only for tables of at most `heavy_max_rows` rows.
+    Work not started when `budget_seconds` runs out is skipped and the
+    profile is marked incomplete. The profile is cached until the app is
+    reloaded: read it instead of calling `get_app_field_statistics` field
+    by field.
+
+    Args:
+        app_id: Application GUID. Required.
+        budget_seconds: Wall-clock budget of the whole job (default 600).
+        concurrency: Tables profiled at once, each on its own leased Engine
+            session (default `QLIK_PROFILE_CONCURRENCY`, 2).
+        heavy_max_rows: Largest table that still gets heavy statistics
+            (default 1 000 000; 0 skips heavy statistics).
+        refresh: Profile again even if a complete cached profile exists.
+
+    Returns:
+        JSON `{started, app_id, state, done, total, message,
+        elapsed_seconds, budget_seconds}`. `started` is false when a job for
+        the app is already running (its progress is returned) or when a
+        complete cached profile exists (`cached: true`).
+    """
+    e = _check()
+    if e:
+        return e
+    if budget_seconds <= 0 or heavy_max_rows < 0 or (concurrency is not None and concurrency < 1):
+        return _err("budget_seconds and concurrency must be positive, heavy_max_rows non-negative",
+                    error_category="invalid_request")
+    job = profile_jobs.get(app_id)
+    if not refresh and not (job is not None and job.running):
+        key = _metadata_key(PROFILE_KIND, app_id)
+        hit = engine_api.metadata_cache.get(key) if key is not None else None
+        if hit is not None and hit["value"].get("complete"):
+            return _ok({"started": False, "cached": True, "app_id": app_id, "state": "finished"})
+
+    def store(profile: Dict[str, Any]) -> None:
+        key = _metadata_key(PROFILE_KIND, app_id)
+        if key is not None:
+            engine_api.metadata_cache.put(key, {"value": profile})
+
+    job, started = profile_jobs.start(
+        engine_api, app_id,
+        budget_seconds=float(budget_seconds),
+        concurrency=concurrency or engine_api.profile_concurrency,
+        heavy_max_rows=int(heavy_max_rows),
+        on_done=store,
+    )
+    return _ok(dict({"started": started}, **job.progress()))
+
+
+def _stored_profile(app_id: str) -> Optional[Dict[str, Any]]:
+    key = _metadata_key(PROFILE_KIND, app_id)
+    hit = engine_api.metadata_cache.get(key) if key is not None else None
+    return hit["value"] if hit is not None else None
+
+
+@mcp.tool()
+@_timed
+async def get_app_profile(app_id: str, wait_seconds: float = 0, ctx: Context = None) -> str:
+    """
+    Read the precomputed profile of an app built by `start_app_profiling`.
+
+    While the job runs this returns its progress. With `wait_seconds`
+    (max 120) the call waits for the job to finish, sending MCP progress
+    notifications (`done` of `total` steps) meanwhile.
+
+    Args:
+        app_id: Application GUID. Required.
+        wait_seconds: How long to wait for a running job (default 0).
+
+    Returns:
+        JSON `{state: "finished", profile}`; `profile` is `{app_id,
+        reload_time, generated_at, complete, tables, fields_profiled,
+        skipped_steps, errors, heavy_max_rows, budget_seconds,
+        elapsed_seconds}`. Each table is `{table, rows, heavy_stats,
+        fields}`; each field `{field_name, distinct_values, is_key, tags,
+        unique_values, non_null_count, null_count, completeness_percentage,
+        min_value, max_value}` plus `avg_value, sum_value, median_value,
+        mode_value, std_deviation` where heavy statistics ran, and
+        `light_error` / `heavy_error` where a step failed. While the job
+        runs: `{app_id, state: "running", done, total, message, ...}`.
+        Fails with `not_found` when the app has not been profiled and with
+        `profile_failed` when the job failed.
+    """
+    e = _check()
+    if e:
+        return e
+    job = profile_jobs.get(app_id)
+    if job is not None and job.running and wait_seconds > 0:
+        end = time.monotonic() + min(float(wait_seconds), MAX_PROFILE_WAIT)
+        while job.running and time.monotonic() < end:
+            if ctx is not None:
+                await ctx.report_progress(job.done, job.total or None)
+            await asyncio.sleep(max(0.0, min(1.0, end - time.monotonic())))
+    if job is not None and job.running:
+        return _ok(job.progress())
+    profile = job.profile if job is not None else None
+    if profile is None:
+        # QRS lookup of the app's dates; keep it off the event loop.
+        profile = await asyncio.to_thread(_stored_profile, app_id)
+    if profile is not None:
+        return _ok({"state": "finished", "profile": profile}, compact=True)
+    if job is not None and job.state == "failed":
+        return _err(f"Profiling failed: {job.error}", error_category="profile_failed",
+                    app_id=app_id)
+    return _err("App has not been profiled yet; start a job with start_app_profiling",
+                error_category="not_found", app_id=app_id)
+
+
+@mcp.tool()
+@_timed
+def get_app_table_sample(
+    app_id: str,
+    table_name: str,
+    rows: int = DEFAULT_SAMPLE_ROWS,
+    sample_field: Optional[str] = None,
+) -> str:
+    """
+    Show what a table looks like: a few representative rows of it.
+
+    Use this for "what is in table X?" instead of a hypercube over all of
+    its fields — that one sorts the whole table and returns only rows
+    sharing its lowest values. Here the distinct values of one field
+    (`sample_field`, default the table's most selective field) are picked
+    at an even stride through their load order, and only the rows with
+    those values are computed. Costs one ListObject read and one small
+    cube, on any table size.
+
+    Args:
+        app_id: Application GUID. Required.
+        table_name: Table name from `get_app_details`. Required.
+        rows: Rows to return (default 20, max 500).
+        sample_field: Field of the table whose values are sampled. Omit to
+            let the server pick the field with the most distinct values,
+            preferring fields not shared with other tables.
+
+    Returns:
+        JSON `{table_name, table_rows, sample_field,
+        sample_field_distinct_values, sampled_values, columns,
+        truncated_fields, rows, returned_rows, elapsed_seconds}`. `rows` are
+        `{field: text}` objects over `columns` (the sample field first, at
+        most 20 fields); each sampled value contributes one row before any
+        value contributes a second. Unknown tables or fields fail with
+        `invalid_request`.
+    """
+    e = _check()
+    if e:
+        return e
+    if not 1 <= rows <= MAX_SAMPLE_ROWS:
+        return _err(f"rows must be between 1 and {MAX_SAMPLE_ROWS}",
+                    error_category="invalid_request")
+    try:
+        with engine_api.lease(app_id) as app_handle:
+            result = engine_api.sample_table(app_id, app_handle, table_name, rows, sample_field)
+        return _ok(result)
+    except Exception as ex:
+        logger.exception("get_app_table_sample failed")
+        return _err(str(ex) or repr(ex), error_type=type(ex).__name__, app_id=app_id)
+
+
 @mcp.tool()
 @_timed
 def engine_get_field_range(app_id: str, field_name: str) -> str:
@@ -660,8 +982,83 @@ def engine_get_field_range(app_id: str, field_name: str) -> str:
     if e:
         return e
     try:
-        app_handle = engine_api.ensure_app(app_id, no_data=False)
-        return _ok(engine_api.get_field_range(app_handle, field_name))
+        with engine_api.lease(app_id) as app_handle:
+            return _ok(engine_api.get_field_range(app_handle, field_name))
+    except Exception as ex:
+        return _err(str(ex), app_id=app_id, field_name=field_name)
+
+
+@mcp.tool()
+@_timed
+def engine_get_field_values(
+    app_id: str,
+    field_name: str,
+    cursor: Optional[str] = None,
+    page_size: int = 1000,
+    include_frequency: bool = False,
+) -> str:
+    """
+    Read the COMPLETE distinct value list of a field, page by page.
+
+    For lookups and local indexes over fields of any size (hundreds of
+    thousands of values). Values come in load order, which is stable until
+    the app is reloaded; pass `next_cursor` back to get the next page.
+    To find a few values, use `get_app_field` with a search instead; for
+    counts and bounds use `engine_get_field_range`.
+
+    Args:
+        app_id: Application GUID. Required.
+        field_name: Exact field name, no square brackets. Required.
+        cursor: `next_cursor` of the previous page; omit for the first.
+        page_size: Values per page. Default 1000, cap 9900.
+        include_frequency: Add each value's row count (`frequency`).
+
+    Returns:
+        JSON `{field_name, offset, values, returned, next_cursor}`. Each
+        value is `{elem, text, number}` (plus `frequency`): `elem` is the
+        Engine's element number, `number` is null for non-numeric values.
+        `next_cursor` is null on the last page.
+
+    ON ERROR: `invalid_cursor` (malformed, or issued for another app or
+    field) or `stale_cursor` (the app was reloaded since — start over
+    without a cursor).
+    """
+    e = _check()
+    if e:
+        return e
+    size = min(max(page_size or 1, 1), MAX_PAGE_CELLS)
+    offset = 0
+    try:
+        with engine_api.lease(app_id) as app_handle:
+            version = engine_api.get_app_reload_time(app_handle)
+            if cursor:
+                try:
+                    state = decode_cursor(cursor)
+                    offset = max(0, int(state.get("offset", 0)))
+                except (TypeError, ValueError) as ex:
+                    return _err(str(ex), error_category="invalid_cursor")
+                if state.get("app") != app_id or state.get("field") != field_name:
+                    return _err("Cursor was issued for another app or field",
+                                error_category="invalid_cursor")
+                if state.get("version") != version:
+                    return _err("The app was reloaded since this cursor was issued; "
+                                "start over without a cursor", error_category="stale_cursor")
+            values = list(engine_api.iter_field_values(app_handle, field_name, offset, size + 1,
+                                                       include_frequency))
+        more = len(values) > size
+        values = values[:size]
+        if not include_frequency:
+            for value in values:
+                value.pop("frequency", None)
+        next_cursor = encode_cursor({"app": app_id, "field": field_name, "offset": offset + size,
+                                     "version": version}) if more else None
+        return _ok({
+            "field_name": field_name,
+            "offset": offset,
+            "values": values,
+            "returned": len(values),
+            "next_cursor": next_cursor,
+        }, compact=True)
     except Exception as ex:
         return _err(str(ex), app_id=app_id, field_name=field_name)
 
@@ -673,6 +1070,13 @@ def engine_create_hypercube(
     dimensions: Optional[List[Dict[str, Any]]] = None,
     measures: Optional[List[Dict[str, Any]]] = None,
     max_rows: int = DEFAULT_HYPERCUBE_MAX_ROWS,
+    format: str = "raw",
+    slice_by: Optional[str] = None,
+    max_slices: int = 50,
+    plan: str = "auto",
+    calc_condition: Optional[str] = None,
+    reduce: Optional[str] = None,
+    target_points: int = 1000,
 ) -> str:
     """
     Build a Qlik Engine hypercube (grouped aggregation) and return its rows.
@@ -693,15 +1097,15 @@ def engine_create_hypercube(
                (the dimensions themselves can't be filtered this way —
                see RULE #2 below), OR
            (b) drop one of the dimensions, OR
-           (c) switch to a top-N pattern (`max_rows=15` +
-               `qSortByExpression` on the ranking), OR
-           (d) split the problem into N separate hypercubes, each
-               slicing by one value of a categorical dimension.
+           (c) switch to a top-N pattern (`"top_n": 15` on the ranking
+               dimension — the rest becomes one "Others" row), OR
+           (d) pass `slice_by=<DimCat>`: the server runs one cube per
+               value of that categorical field and merges them.
          Generic example: dims=[<DimA> (10 distinct), <DimB> (5000
          distinct)] → worst case 10*5000 = 50,000 rows → TOO BIG.
          Fix: drop <DimB> or filter it via
          `Sum({<[<DimB>]={'<val1>'}>}<MetricX>)` on the measure side,
-         or run 10 separate cubes (one per value of <DimA>).
+         or pass `slice_by="<DimA>"` (10 slices, merged server-side).
       3. Read `get_app_script` to understand how calendar / derived
          fields are built in the specific app — it matters for set
          analysis. NEVER assume field names from examples.
@@ -817,11 +1221,18 @@ def engine_create_hypercube(
                 "qSortByExpression": -1,          # -1 desc, 1 asc, 0 disabled
                 "qExpression": "Sum({<[<DimYear>]={<Y>}>}<MetricX>)"
                                                    # required if qSortByExpression != 0
-              }
+              },
+              "top_n": 10,                        # OPTIONAL: Engine-side top-N
+              "others_label": "Others",           # OPTIONAL, label of the rest
+              "show_others": true                 # OPTIONAL, false drops it
             }
             ```
             Omit the whole list or pass `[]` for a grand-total row only.
-            Use `qSortByExpression` for "top/bottom N by metric" queries.
+            `top_n` keeps the N values with the largest FIRST measure and
+            folds all other values into one "Others" row, computed by the
+            Engine in the same pass — no full sort of a huge field, no
+            second cube for the remainder. Prefer it over
+            `qSortByExpression` + small `max_rows` for "top N by metric".
         measures: List of aggregate expressions. Each element is an object:
             ```
             {
@@ -848,18 +1259,61 @@ def engine_create_hypercube(
             (substitute the placeholders with real field names from
             `get_app_details`):
 
-              TOP-N: max_rows=15, qSortByExpression=-1 on the ranking dim,
-                qExpression="Sum({<[<DimPeriod>]={<val>}>}<MetricX>)".
+              TOP-N: `"top_n": 15` on the ranking dimension, ranking
+                measure first — returns 15 rows + "Others"; `totals`
+                holds the grand total.
               PERIOD FILTER: put the period inside every measure —
                 Sum({<[<DimYear>]={<Y>},[<DimPeriod>]={'<v>'}>}<MetricX>).
-              SLICE-BY-CATEGORY: run N small hypercubes, one per category
-                value, each filtered via {<[<DimCat>]={'<v>'}>}. Prefer
-                100 focused queries over 1 giant scan — they're faster
-                AND don't timeout.
+              SLICE-BY-CATEGORY: pass `slice_by="<DimCat>"` — the server
+                runs one small cube per value, each filtered via
+                {<[<DimCat>]={'<v>'}>}, concurrently, and merges them.
+                Many focused slices beat 1 giant scan — they're faster
+                AND don't timeout. Do NOT loop over values yourself.
               ESTIMATE BEFORE CALLING: multiply `distinct_values` of your
                 dimensions (from `get_app_details`). If the product
                 exceeds 5000, the query is too broad — add more
                 set-analysis filters or switch to top-N.
+        format: `raw` (default) returns the Engine's `qHyperCube` as is.
+            `columnar` replaces it with one array per column — several
+            times smaller and faster to read; prefer it for anything
+            beyond a handful of rows.
+        slice_by: Optional field name to slice by (e.g. a region or month
+            field with at most `max_slices` distinct values). The server
+            lists the field's values, injects `[slice_by]={'<value>'}` into
+            every aggregation of every measure (and sort expression), runs
+            the slices concurrently and returns ONE merged result with
+            `slice_by` as an extra first dimension. `max_rows` applies per
+            slice; rows whose measures are all zero/null in a slice are
+            dropped. Requires at least one measure.
+        max_slices: Most distinct values `slice_by` may have (default 50,
+            hard limit 200). Fields with more values are rejected with
+            `too_many_slices`.
+        plan: Pre-flight check against the app's field cardinalities,
+            before anything is computed:
+            `auto` (default) leaves cheap and moderate requests as they
+            are. Requests predicted to be expensive get safe rewrites —
+            `Agg(If(F=v, X))` becomes `Agg({<[F]*={"=[F]=v"}>}X)`,
+            `=[Field]` dimensions become `Field`, and zero rows are
+            suppressed when every measure was rewritten to restrict a
+            dimension field — and requests predicted to exceed
+            `QLIK_WS_TIMEOUT` are REJECTED (`predicted_timeout`).
+            `explain` returns only the plan, without running the cube.
+            `off` sends the request as is. Not applied with `slice_by`.
+        calc_condition: Optional Qlik condition evaluated before anything
+            is aggregated, e.g. `Count(DISTINCT [<DimA>]) <= 1000`. When
+            it is false the Engine computes nothing and the call fails
+            fast with `calc_condition_unmet`. Not applied with `slice_by`.
+        reduce: Optional Engine-side data reduction, for charts over far
+            more rows than `max_rows` (years of daily data, scatter plots):
+            `line` keeps the shape of a series (sort the x dimension, e.g.
+            `qSortByNumeric: 1` on a date), `scatter` and `clustered` thin
+            out 2D point clouds, `binned` returns a density grid of one
+            dimension and two measures (x, y). The Engine computes a
+            representative `target_points`-row result in ONE request —
+            no paging, no truncation. `max_rows`, `slice_by` and
+            `calc_condition` do not apply.
+        target_points: Rows (or bins, for `binned`) to return with
+            `reduce`. Default 1000; capped at 9900 / columns.
 
     Returns:
         JSON with:
@@ -878,6 +1332,34 @@ def engine_create_hypercube(
             each as `{qText, qNum, qElemNumber, qState}`. Read values
             from `qText` (display) or `qNum` (numeric). `"NaN"` means the
             cell is empty or contains text.
+          - `totals`: `[{label, value, text}]` — the grand total of every
+            measure over ALL rows (not just the returned ones), computed
+            in the same pass.
+          - `cache`: `"hit"` when an identical request (same app, same
+            reload, same dimensions / measures / sorting / max_rows) was
+            answered from the server's result cache, else `"miss"`.
+          - with `format="columnar"`, `columnar` replaces
+            `hypercube_data`: `{row_count, columns: [...]}` in dimension
+            then measure order. A dimension column is
+            `{name, kind: "dimension", encoding: "dict", dictionary,
+            codes}` — row i's value is `dictionary[codes[i]]`. A measure
+            column is `{name, kind: "measure", encoding: "number" |
+            "text", values}`. Null and NaN cells are `null`.
+          - with `slice_by`: `slice_by`, `slice_count`, `failed_slices`
+            and `slices` — one `{value, rows, total_rows, seconds, cache}`
+            (or `{value, error}`) per slice — plus `elapsed_seconds`.
+            `total_rows` sums the slices; the merged matrix is capped at
+            50000 rows.
+          - `plan` (unless `plan="off"`): `{cost_class: cheap | moderate |
+            expensive | prohibitive, estimated_rows, scan_rows,
+            estimated_seconds, issues, rewrites}`. `issues` flags per-row
+            If(), calculated dimensions, unknown fields, expression sorts
+            over huge fields and predicted truncation; `rewrites` lists
+            what was changed before sending. The estimates are rough.
+          - with `reduce`: `reduction` and `target_points`; `total_rows`
+            is the size of the unreduced cube and `returned_rows` the
+            points actually returned. With `binned`, every matrix row is
+            one bin as returned by the Engine.
 
     ON ERROR: the response contains `error`, `error_category`, and
     `hint`. Relevant categories:
@@ -890,16 +1372,80 @@ def engine_create_hypercube(
         Add more set-analysis filters, reduce max_rows, or switch to
         top-N with qSortByExpression.
       - `engine_api_error`: invalid expression / unknown field.
+      - `too_many_slices`: `slice_by` has more than `max_slices` values.
+        Slice by a coarser field.
+      - `calc_condition_unmet`: `calc_condition` evaluated to false;
+        nothing was computed.
+      - `predicted_timeout`: the planner expects the cube to run past
+        `QLIK_WS_TIMEOUT`; `plan.issues` says why. Narrow with set
+        analysis, fix the flagged measures, or use `slice_by`. Pass
+        `plan="off"` only if you know better.
     """
     import traceback as _tb
     e = _check()
     if e:
         return e
+    if format not in ("raw", "columnar"):
+        return _err(f"Unknown format {format!r}; expected 'raw' or 'columnar'")
+    if plan not in ("auto", "explain", "off"):
+        return _err(f"Unknown plan mode {plan!r}; expected 'auto', 'explain' or 'off'")
+    if reduce is not None and reduce not in (*REDUCTION_MODES, "binned"):
+        return _err(f"Unknown reduce mode {reduce!r}; expected one of "
+                    f"{', '.join([*REDUCTION_MODES, 'binned'])}")
     stage = "ensure_app"
     try:
-        app_handle = engine_api.ensure_app(app_id, no_data=False)
-        stage = "create_hypercube"
-        return _ok(engine_api.create_hypercube(app_handle, dimensions or [], measures or [], max_rows))
+        if slice_by and not reduce:
+            stage = "sliced_hypercube"
+            result = engine_api.sliced_hypercube(app_id, slice_by, dimensions or [],
+                                                 measures or [], max_rows, max_slices)
+        else:
+            planned = None
+            with engine_api.lease(app_id) as app_handle:
+                dims, meas, suppress_zero = dimensions or [], measures or [], False
+                if plan != "off":
+                    stage = "plan"
+                    planned = engine_api.plan_hypercube(app_id, app_handle, dims, meas, max_rows)
+                if planned is not None:
+                    summary = {k: planned[k] for k in (
+                        "cost_class", "estimated_rows", "scan_rows", "estimated_seconds",
+                        "issues", "rewrites",
+                    )}
+                    if reduce:
+                        summary["issues"] = [i for i in summary["issues"]
+                                             if i["kind"] != "truncated"]
+                    if plan == "explain":
+                        return _ok({"plan": dict(summary, dimensions=planned["dimensions"],
+                                                 measures=planned["measures"])})
+                    if planned["cost_class"] == "prohibitive":
+                        return _err(
+                            f"Predicted to run ~{planned['estimated_seconds']:.0f}s, past the "
+                            f"{engine_api.ws_operation_timeout:.0f}s timeout; not sent",
+                            error_category="predicted_timeout",
+                            failed_stage=stage,
+                            plan=summary,
+                            hint=(
+                                "Fix the measures flagged in plan.issues, narrow every measure "
+                                "with set analysis, or pass slice_by. Use plan='off' to send "
+                                "the request anyway."
+                            ),
+                        )
+                    dims, meas = planned["dimensions"], planned["measures"]
+                    suppress_zero = planned["suppress_zero"]
+                if reduce:
+                    stage = "reduced_hypercube"
+                    result = engine_api.cached_reduced_hypercube(app_id, app_handle, dims, meas,
+                                                                 reduce, target_points)
+                else:
+                    stage = "create_hypercube"
+                    result = engine_api.cached_hypercube(app_id, app_handle, dims, meas,
+                                                         max_rows, suppress_zero=suppress_zero,
+                                                         calc_condition=calc_condition)
+            if planned is not None:
+                result["plan"] = summary
+        if format == "columnar" and "hypercube_data" in result:
+            result["columnar"] = encode_columnar(result.pop("hypercube_data"))
+            return _ok(result, compact=True)
+        return _ok(result)
     except Exception as ex:
         logger.exception("engine_create_hypercube failed at stage=%s", stage)
         return _err(
@@ -912,6 +1458,317 @@ def engine_create_hypercube(
         )
 
 
+@mcp.tool()
+@_timed
+def engine_create_hypercubes(
+    app_id: str,
+    cubes: List[Dict[str, Any]],
+    format: str = "raw",
+    deadline_seconds: Optional[float] = None,
+    cube_timeout_seconds: Optional[float] = None,
+) -> str:
+    """
+    Run several independent hypercubes against ONE app in a single call.
+
+    Use it when a question needs a handful of small cubes at once (a
+    "dashboard": KPIs, a trend, a top-N, a breakdown) instead of calling
+    `engine_create_hypercube` once per cube. The cubes run concurrently on
+    the app's Engine sessions and share its result cache; every rule,
+    limit and set-analysis pattern of `engine_create_hypercube` applies to
+    each cube.
+
+    Args:
+        app_id: Application GUID. Required.
+        cubes: 1-50 cube definitions:
+            ```
+            {
+              "name": "<label echoed back>",   # OPTIONAL, default cube_<i>
+              "dimensions": [...],             # as in engine_create_hypercube
+              "measures": [...],               # as in engine_create_hypercube
+              "max_rows": 50,                  # OPTIONAL, default 1000
+              "calc_condition": "...",         # OPTIONAL, as in engine_create_hypercube
+              "timeout": 30                    # OPTIONAL per-cube budget (s)
+            }
+            ```
+        format: `raw` (default) or `columnar`, applied to every cube (see
+            `engine_create_hypercube`).
+        deadline_seconds: Budget for the whole batch (default
+            `QLIK_WS_TIMEOUT`). Cubes not finished by then come back with
+            `error_category: "deadline_exceeded"`; the others are still
+            returned.
+        cube_timeout_seconds: Default per-cube budget for cubes without
+            their own `timeout`. Never longer than the time left to the
+            deadline.
+
+    Returns:
+        JSON `{cubes, succeeded, failed, deadline_seconds,
+        elapsed_seconds}`. `cubes` is in input order; each entry is
+        exactly what `engine_create_hypercube` would return for that cube
+        (including `error` / `error_category` / `hint` on failure) plus
+        `name`, `queued_seconds` (wait before it started) and `seconds`.
+        One failing cube never fails the batch.
+    """
+    e = _check()
+    if e:
+        return e
+    if format not in ("raw", "columnar"):
+        return _err(f"Unknown format {format!r}; expected 'raw' or 'columnar'")
+    if not isinstance(cubes, list):
+        return _err("cubes must be a list of cube definitions")
+    try:
+        result = engine_api.create_hypercubes(app_id, cubes, deadline=deadline_seconds,
+                                              cube_timeout=cube_timeout_seconds)
+        if format == "columnar":
+            for cube in result.get("cubes", []):
+                if "hypercube_data" in cube:
+                    cube["columnar"] = encode_columnar(cube.pop("hypercube_data"))
+            return _ok(result, compact=True)
+        return _ok(result)
+    except Exception as ex:
+        logger.exception("engine_create_hypercubes failed")
+        return _err(str(ex) or repr(ex), error_type=type(ex).__name__, app_id=app_id)
+
+
+@mcp.tool()
+@_timed
+def engine_create_pivot_table(
+    app_id: str,
+    rows: List[Dict[str, Any]],
+    measures: List[Dict[str, Any]],
+    columns: Optional[List[Dict[str, Any]]] = None,
+    mode: str = "pivot",
+    max_rows: int = DEFAULT_HYPERCUBE_MAX_ROWS,
+    max_columns: int = 100,
+    expand_depth: Optional[int] = None,
+    expand: Optional[List[Dict[str, Any]]] = None,
+) -> str:
+    """
+    Build a cross-tab (pivot) or stacked hypercube in ONE Engine object.
+
+    Use it for cross-tab questions ("<MetricX> by <DimA> down the side and
+    <DimB> across the top") instead of one flattened cube per column
+    value. Row and column totals come from the Engine's own pivot logic.
+    Every set-analysis rule of `engine_create_hypercube` applies to the
+    measures; dimensions must be plain fields.
+
+    Args:
+        app_id: Application GUID. Required.
+        rows: Dimensions down the side, outermost first, in the
+            `engine_create_hypercube` dimension shape (or plain field names).
+        measures: Aggregate expressions, as in `engine_create_hypercube`.
+        columns: Optional dimensions across the top, outermost first.
+        mode: `pivot` (default, `qMode: "P"`) or `stacked` (`"K"`, a tree
+            of dimension values down to the measure cells).
+        max_rows: Most pivot rows returned (default 1000). Rows are read in
+            pages of at most 9900 cells.
+        max_columns: Most pivot data columns returned (default 100).
+        expand_depth: Omit for a fully expanded pivot. Otherwise the pivot
+            starts collapsed and the first `expand_depth` levels of `rows`
+            and `columns` are expanded — deeper nodes are not computed.
+            `0` shows only the outermost level.
+        expand: Single nodes to expand or collapse after `expand_depth`,
+            taken from `nodes` of a previous response:
+            `[{"side": "left" | "top", "row": 12, "col": 0,
+            "collapse": false}]`. Implies a collapsed start.
+
+    Returns:
+        Pivot: JSON with `row_headers` (label path per row), `column_headers`
+        (label path per column), `values` (row-major grid of numbers / text,
+        null for empty cells), `nodes` (every expandable / collapsible node
+        with `side`, `row`, `col`, `path` and `expanded`), `total_rows`,
+        `total_columns`, `returned_rows`, `returned_columns`, `pages`,
+        `truncation_warning` and `cache`.
+        Stacked: `cells` — `[{path, value, text}]` per leaf — instead of
+        the grid.
+    """
+    e = _check()
+    if e:
+        return e
+    if mode not in PIVOT_MODES:
+        return _err(f"Unknown mode {mode!r}; expected one of {', '.join(PIVOT_MODES)}")
+    try:
+        with engine_api.lease(app_id) as app_handle:
+            result = engine_api.cached_pivot_hypercube(
+                app_id, app_handle, rows, columns or [], measures, mode, max_rows,
+                max_columns, expand_depth, expand,
+            )
+        return _ok(result)
+    except Exception as ex:
+        logger.exception("engine_create_pivot_table failed")
+        return _err(str(ex) or repr(ex), error_type=type(ex).__name__, app_id=app_id)
+
+
+@mcp.tool()
+@_timed
+def engine_evaluate_expressions(
+    app_id: str,
+    expressions: List[Any],
+) -> str:
+    """
+    Evaluate many scalar expressions (KPIs) against an app in one call.
+
+    Use it for single-number questions — totals, counts, `Min`/`Max`
+    dates, ratios — instead of a measures-only `engine_create_hypercube`.
+    All expressions go to the Engine as one pipelined batch of `EvaluateEx`
+    calls on the app itself; no session object is created. Each result is
+    cached against the app's last reload, so repeated KPIs are free. The
+    set-analysis rules of `engine_create_hypercube` apply to every
+    expression.
+
+    Args:
+        app_id: Application GUID. Required.
+        expressions: 1-200 expressions, each a string or
+            `{"name": "<label>", "expression": "Sum({<[<DimYear>]={<Y>}>}<MetricX>)"}`.
+            Examples: `"Count(DISTINCT [<KeyField>])"`,
+            `"Date(Max([<DimDate>]))"`, `"Sum(<MetricX>)/Sum(<MetricY>)"`.
+
+    Returns:
+        JSON `{results, evaluated, cached, failed, elapsed_seconds}`.
+        `results` is in input order; each entry is `{name, expression,
+        type: "number" | "text" | "null", value, text, cache: "hit" |
+        "miss"}` — `value` is a number for numeric results, `text` the
+        Engine's formatted value — or `{name, expression, error}`. One bad
+        expression never fails the batch.
+    """
+    e = _check()
+    if e:
+        return e
+    if not isinstance(expressions, list):
+        return _err("expressions must be a list of strings or {name, expression} objects")
+    try:
+        with engine_api.lease(app_id) as app_handle:
+            result = engine_api.evaluate_expressions(app_id, app_handle, expressions)
+        return _ok(result)
+    except Exception as ex:
+        logger.exception("engine_evaluate_expressions failed")
+        return _err(str(ex) or repr(ex), error_type=type(ex).__name__, app_id=app_id)
+
+
+@mcp.tool()
+@_timed
+def engine_export_hypercube(
+    app_id: str,
+    file_name: str,
+    dimensions: Optional[List[Dict[str, Any]]] = None,
+    measures: Optional[List[Dict[str, Any]]] = None,
+    format: str = "jsonl",
+    max_rows: Optional[int] = None,
+) -> str:
+    """
+    Stream a FULL hypercube to a file on the MCP server host, page by page.
+
+    For legitimate batch extractions only — analysis questions belong in
+    `engine_create_hypercube`, which caps results at 5000 rows on purpose.
+    This tool has no row cap: it reads the cube in pages of at most 9900
+    cells (shrinking the page on timeouts), with up to `QLIK_PAGE_WINDOW`
+    pages requested ahead, and appends each page to the file in row
+    order, so memory stays bounded. Nothing but a
+    short summary comes back — the rows are in the file.
+
+    `dimensions` and `measures` take exactly the same shape as in
+    `engine_create_hypercube` (and the same set-analysis rules apply).
+
+    Args:
+        app_id: Application GUID. Required.
+        file_name: Relative file name inside the export directory
+            (`QLIK_EXPORT_DIR`, default `./exports`). The extension for
+            `format` is appended if missing. Paths escaping the directory
+            are rejected.
+        dimensions: GROUP BY columns, as in `engine_create_hypercube`.
+        measures: Aggregate expressions, as in `engine_create_hypercube`.
+        format: `jsonl` (default), `csv`, `sqlite` (table `data`) or
+            `parquet` (needs the optional `pyarrow` dependency).
+        max_rows: Optional upper bound on exported rows; default all.
+
+    Returns:
+        JSON `{path, format, rows, columns, bytes, sha256, total_rows, pages,
+        page_height, min_page_height, page_timeouts, page_window,
+        elapsed_seconds}`.
+        Dimension values are written as text, measures as numbers (text
+        when the measure is not numeric), nulls as null/empty.
+    """
+    e = _check()
+    if e:
+        return e
+    try:
+        path = resolve_export_path(engine_api.export_dir, file_name, format)
+    except ValueError as ex:
+        return _err(str(ex), formats=list(SINK_FORMATS))
+    try:
+        with engine_api.lease(app_id) as app_handle:
+            result = engine_api.export_hypercube(
+                app_handle, open_sink(path, format), dimensions or [], measures or [],
+                max_rows=max_rows,
+            )
+        return _ok(result)
+    except Exception as ex:
+        return _err(str(ex), app_id=app_id, path=path)
+
+
+@mcp.tool()
+@_timed
+def engine_export_table(
+    app_id: str,
+    file_name: str,
+    table_name: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    format: str = "csv",
+    max_rows: Optional[int] = None,
+) -> str:
+    """
+    Stream the rows of a table (or of chosen fields) to a file on the MCP server host.
+
+    For extracting raw data, not for analysis. Pages through the data
+    and appends each page to the file, so memory stays constant for any
+    row count. Only the file's path, row count and SHA-256 come back.
+    Each row is one distinct combination of the exported fields' values,
+    as in any Qlik table.
+
+    Args:
+        app_id: Application GUID. Required.
+        file_name: Relative file name inside `QLIK_EXPORT_DIR` (default
+            `./exports`); the extension for `format` is appended if missing.
+        table_name: Export every field of this table (from
+            `get_app_details`), at most the first 50. Either this or
+            `fields` is required.
+        fields: Explicit field names to export, overriding `table_name`.
+            More than 50 is rejected with `limit_exceeded`.
+        filters: `{field: value}` or `{field: [values]}`. Applied inside the
+            Engine as set analysis (`{<Field={'v1','v2'}>}`), so only the
+            matching rows are computed.
+        format: `csv` (default), `jsonl`, `sqlite` or `parquet` (needs
+            `pyarrow`).
+        max_rows: Optional upper bound on exported rows; default all.
+
+    Returns:
+        JSON `{path, format, rows, bytes, sha256, elapsed_seconds}`, plus
+        `omitted_fields` when a table had more than 50 fields.
+    """
+    e = _check()
+    if e:
+        return e
+    try:
+        path = resolve_export_path(engine_api.export_dir, file_name, format)
+    except ValueError as ex:
+        return _err(str(ex), formats=list(SINK_FORMATS))
+    try:
+        with engine_api.lease(app_id) as app_handle:
+            result = engine_api.create_data_export(
+                app_id, app_handle, open_sink(path, format), table_name, fields,
+                max_rows=max_rows, filters=filters,
+            )
+        if "error" in result:
+            return _ok(result)
+        summary = {key: result.get(key) for key in
+                   ("path", "format", "rows", "bytes", "sha256", "elapsed_seconds")}
+        if result.get("omitted_fields"):
+            summary["omitted_fields"] = result["omitted_fields"]
+        return _ok(summary)
+    except Exception as ex:
+        return _err(str(ex), app_id=app_id, path=path)
+
+
 @mcp.tool()
 @_timed
 def get_app_field(
@@ -941,6 +1798,9 @@ def get_app_field(
     back to a one-dimension hypercube. The response then includes
     `fallback_used: "hypercube"`. If both methods return nothing, the
     response includes a `warning` explaining why and suggesting next steps.
+    With `search_string` / `search_number` the search runs inside the
+    Engine over ALL values of the field (any cardinality), and only the
+    matching page is transferred.
 
     Args:
         app_id: Application GUID. Required.
@@ -959,8 +1819,11 @@ def get_app_field(
 
     Returns:
         JSON `{ "field_values": ["val1", "val2", ...] }` — plain list after
-        filtering and pagination. Order is by frequency descending on the
-        Qlik side.
+        filtering and pagination, in numeric then text order. With a search,
+        `engine_matches` is the number of values the Engine's
+        (case-insensitive) search found before exact wildcard matching; with
+        only `search_number` it is the number of values in the field, as
+        every value is checked.
     """
     e = _check()
     if e:
@@ -969,21 +1832,33 @@ def get_app_field(
     off = max(offset or 0, 0)
     try:
         app_handle = engine_api.ensure_app(app_id, no_data=False)
+        if search_string or search_number:
+            rx = _wildcard_to_regex(search_string, case_sensitive) if search_string else None
+            rxn = _wildcard_to_regex(search_number, case_sensitive) if search_number else None
+
+            def accept(cell: Dict[str, Any]) -> bool:
+                text = cell.get("qText", "")
+                if rx is not None and not rx.match(text):
+                    return False
+                if rxn is not None:
+                    qnum = cell.get("qNum")
+                    return qnum is not None and bool(rxn.match(str(qnum)) or rxn.match(text))
+                return True
+
+            # The Engine narrows by the text pattern; the exact wildcard
+            # (and case) semantics are re-checked on the matches only. A
+            # number pattern may not match the formatted text ("12*" vs
+            # "1,234"), so on its own it is checked on every value.
+            search = search_string.replace("%", "*") if search_string else None
+            found = engine_api.search_field_values(app_handle, field_name, search, off, lim,
+                                                   accept)
+            return _ok({
+                "field_values": [v["value"] for v in found["values"]],
+                "engine_matches": found["matches"],
+            })
         fetch_size = min(max(lim + off, DEFAULT_FIELD_FETCH_SIZE), MAX_FIELD_FETCH_SIZE)
         field_data = engine_api.get_field_values(app_handle, field_name, fetch_size, include_frequency=False)
         values = [v.get("value", "") for v in field_data.get("values", [])]
-        if search_string:
-            rx = _wildcard_to_regex(search_string, case_sensitive)
-            values = [v for v in values if isinstance(v, str) and rx.match(v)]
-        if search_number:
-            rxn = _wildcard_to_regex(search_number, case_sensitive)
-            filtered = []
-            for vobj in field_data.get("values", []):
-                qnum = vobj.get("numeric_value")
-                cell_text = vobj.get("value", "")
-                if qnum is not None and (rxn.match(str(qnum)) or rxn.match(str(cell_text))):
-                    filtered.append(cell_text)
-            values = filtered
         out: Dict[str, Any] = {"field_values": values[off:off + lim]}
         # Surface internal hints from get_field_values so the LLM knows
         # whether the result came from the fast ListObject path or from the
@@ -1041,8 +1916,11 @@ def get_app_variables(
     if created_in_script is not None:
         script_flag = _to_bool(created_in_script, None)
     try:
-        app_handle = engine_api.ensure_app(app_id, no_data=False)
-        var_list = engine_api._get_user_variables(app_handle) or []
+        def _variables():
+            app_handle = engine_api.ensure_app(app_id, no_data=False)
+            return engine_api._get_user_variables(app_handle) or []
+
+        var_list = _cached_metadata("variables", app_id, _variables)
         prepared = [{"name": v.get("name", ""), "text_value": v.get("text_value", "") or "", "is_script": v.get("is_script_created", False)} for v in var_list]
         if script_flag is True:
             prepared = [x for x in prepared if x["is_script"]]
@@ -1082,9 +1960,12 @@ def get_app_sheets(app_id: str) -> str:
     if e:
         return e
     try:
-        # no_data=False to keep the cached connection data-ready for later calls
-        app_handle = engine_api.ensure_app(app_id, no_data=False)
-        sheets = engine_api.get_sheets(app_handle)
+        def _sheets():
+            # no_data=False to keep the cached connection data-ready for later calls
+            app_handle = engine_api.ensure_app(app_id, no_data=False)
+            return engine_api.get_sheets(app_handle)
+
+        sheets = _cached_metadata("sheets", app_id, _sheets)
         sheets_list = [
             {"sheet_id": s.get("qInfo", {}).get("qId", ""), "title": s.get("qMeta", {}).get("title", ""), "description": s.get("qMeta", {}).get("description", "")}
             for s in sheets
@@ -1170,6 +2051,46 @@ def get_app_object(app_id: str, object_id: str) -> str:
         return _err(str(ex), app_id=app_id, object_id=object_id)
 
 
+@mcp.tool()
+@_timed
+def get_engine_status() -> str:
+    """
+    Show the Engine connections this MCP server currently keeps open.
+
+    Every app touched by an Engine tool stays open on its own WebSocket so
+    the next call against it skips `OpenDoc`. Up to `QLIK_MAX_OPEN_DOCS`
+    apps (default 3) are kept; the least recently used one is closed when
+    another app is opened, and any app idle for `QLIK_DOC_IDLE_TTL`
+    seconds (default 1200) is closed as well. Heavy tools
+    (`engine_create_hypercube`, `engine_get_field_range`,
+    `get_app_field_statistics`) additionally lease one of up to
+    `QLIK_SESSIONS_PER_APP` extra sessions per app (default 3) so they run
+    in parallel on the Engine. No Qlik round trip — this is local
+    bookkeeping only.
+
+    Returns:
+        JSON `{ "max_open_docs", "idle_ttl_seconds", "open_docs",
+        "evictions", "sessions": [{app_id, identity, app_handle, has_data,
+        opened_at, open_seconds, hits, idle_seconds, live_handles}, ...],
+        "sessions_per_app", "leases": [{app_id, max_sessions,
+        open_sessions, leased, waiting, leases, wait_seconds_total}, ...],
+        "live_handles": {app_id: n}, "orphaned_objects", "warm_cubes":
+        {max_per_socket, idle, hits, misses}, "result_cache" and
+        "metadata_cache": {max_bytes, bytes, entries, hits, disk_hits,
+        misses, hit_ratio, evictions, invalidations}, "persistent_cache":
+        {path, enabled, max_bytes, bytes, entries, hits, misses,
+        evictions, errors} or null }`. Sessions are
+        listed most recently used first; `open_seconds` is how long
+        `OpenDoc` took. `live_handles` counts Engine object handles still
+        open per app; `orphaned_objects` are temporary objects whose
+        cleanup failed and will be retried.
+    """
+    e = _check()
+    if e:
+        return e
+    return _ok(engine_api.get_session_stats())
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # TOOLS — Task management (QRS)
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1597,9 +2518,15 @@ USAGE:
 
 TOOLS ({len(mcp._tool_manager._tools)} total):
     Repository: get_about, get_apps, get_app_details
-    Engine:     get_app_script, get_app_field_statistics, engine_create_hypercube,
-                get_app_field, get_app_variables, get_app_sheets,
-                get_app_sheet_objects, get_app_object
+    Engine:     get_app_script, get_app_field_statistics, get_app_table_profiles,
+                start_app_profiling, get_app_profile, get_app_table_sample,
+                engine_create_hypercube,
+                engine_create_hypercubes, engine_create_pivot_table,
+                engine_evaluate_expressions, engine_export_hypercube,
+                engine_export_table,
+                engine_get_field_values, get_app_field,
+                get_app_variables, get_app_sheets, get_app_sheet_objects,
+                get_app_object, get_engine_status
     Tasks:      get_tasks, get_task_details, start_task, create_task, update_task,
                 delete_task, get_task_schedule, create_task_schedule,
                 get_task_executions, get_task_script_log, get_failed_tasks_with_logs
@@ -0,0 +1,253 @@
+"""
+Row sinks for streamed hypercube exports.
+
+A sink receives the column header once and then the rows page by page, and
+writes them straight to disk, so an export never holds more than one page
+in memory. Every sink writes to ``<path>.part`` and renames it onto
+``<path>`` in ``close()``; ``abort()`` removes the partial file, so a
+failed export never leaves a truncated file under the final name. The
+summary ``close()`` returns carries the file's SHA-256, read back in
+fixed-size chunks.
+
+Formats: ``jsonl`` (one JSON object per row), ``csv``, ``sqlite`` (one
+table in a fresh database file) and ``parquet`` (one row group per page;
+needs the optional ``pyarrow`` dependency).
+"""
+
+import abc
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+
+SINK_FORMATS = ("jsonl", "csv", "sqlite", "parquet")
+
+_EXTENSIONS = {"jsonl": ".jsonl", "csv": ".csv", "sqlite": ".sqlite", "parquet": ".parquet"}
+
+
+def resolve_export_path(export_dir: str, file_name: str, fmt: str) -> str:
+    """
+    Absolute path of ``file_name`` inside ``export_dir``.
+
+    Adds the format's extension when missing and creates ``export_dir``.
+    Raises ``ValueError`` for unknown formats and for names that would
+    escape the export directory.
+    """
+    if fmt not in SINK_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(SINK_FORMATS)}")
+    if not file_name or os.path.isabs(file_name):
+        raise ValueError("file_name must be a relative file name inside the export directory")
+    root = os.path.abspath(export_dir)
+    path = os.path.abspath(os.path.join(root, file_name))
+    if os.path.commonpath([root, path]) != root or path == root:
+        raise ValueError(f"file_name {file_name!r} escapes the export directory")
+    if not path.endswith(_EXTENSIONS[fmt]):
+        path += _EXTENSIONS[fmt]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file, read ``chunk_size`` bytes at a time."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RowSink(abc.ABC):
+    """Base class: ``open`` → ``write_rows`` (per page) → ``close`` or ``abort``."""
+
+    format = ""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.part_path = path + ".part"
+        self.columns: List[str] = []
+        self.rows = 0
+
+    def open(self, columns: Sequence[str], numeric: Sequence[bool]) -> None:
+        """Start the file; ``numeric[i]`` is True for measure columns."""
+        self.columns = _unique_names(columns)
+        self._open(list(numeric))
+
+    def write_rows(self, rows: List[List[Any]]) -> None:
+        if rows:
+            self._write(rows)
+            self.rows += len(rows)
+
+    def close(self) -> Dict[str, Any]:
+        """Finish the file, move it into place and return a summary."""
+        self._close()
+        os.replace(self.part_path, self.path)
+        return {
+            "path": self.path,
+            "format": self.format,
+            "rows": self.rows,
+            "columns": self.columns,
+            "bytes": os.path.getsize(self.path),
+            "sha256": file_sha256(self.path),
+        }
+
+    def abort(self) -> None:
+        """Drop the partial file after a failed export."""
+        try:
+            self._close()
+        except Exception:
+            pass
+        try:
+            os.remove(self.part_path)
+        except OSError:
+            pass
+
+    @abc.abstractmethod
+    def _open(self, numeric: List[bool]) -> None:
+        """Create ``part_path`` and write any header."""
+
+    @abc.abstractmethod
+    def _write(self, rows: List[List[Any]]) -> None:
+        """Append one page of rows."""
+
+    @abc.abstractmethod
+    def _close(self) -> None:
+        """Flush and close ``part_path``; also called by ``abort``."""
+
+
+class JsonlSink(RowSink):
+    format = "jsonl"
+
+    def _open(self, numeric: List[bool]) -> None:
+        self._fh = open(self.part_path, "w", encoding="utf-8", newline="\n")
+
+    def _write(self, rows: List[List[Any]]) -> None:
+        self._fh.writelines(
+            json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n" for row in rows
+        )
+
+    def _close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+
+class CsvSink(RowSink):
+    format = "csv"
+
+    def _open(self, numeric: List[bool]) -> None:
+        self._fh = open(self.part_path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._fh)
+        self._writer.writerow(self.columns)
+
+    def _write(self, rows: List[List[Any]]) -> None:
+        self._writer.writerows(rows)
+
+    def _close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+
+
+class SqliteSink(RowSink):
+    """Rows go into table ``table_name`` of a new SQLite database file."""
+
+    format = "sqlite"
+
+    def __init__(self, path: str, table_name: str = "data") -> None:
+        super().__init__(path)
+        self.table_name = table_name
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _open(self, numeric: List[bool]) -> None:
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+        self._conn = sqlite3.connect(self.part_path)
+        cols = ", ".join(
+            f"{_quote_ident(name)} {'REAL' if is_num else 'TEXT'}"
+            for name, is_num in zip(self.columns, numeric)
+        )
+        self._conn.execute(f"CREATE TABLE {_quote_ident(self.table_name)} ({cols})")
+        self._insert = (
+            f"INSERT INTO {_quote_ident(self.table_name)} VALUES "
+            f"({', '.join('?' for _ in self.columns)})"
+        )
+
+    def _write(self, rows: List[List[Any]]) -> None:
+        with self._conn:
+            self._conn.executemany(self._insert, rows)
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class ParquetSink(RowSink):
+    """One row group per page; dimensions as strings, measures as doubles."""
+
+    format = "parquet"
+
+    def _open(self, numeric: List[bool]) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Parquet export needs pyarrow: pip install 'qlik-sense-mcp-server[parquet]'"
+            ) from e
+        self._pa = pa
+        self._numeric = numeric
+        self._schema = pa.schema([
+            (name, pa.float64() if is_num else pa.string())
+            for name, is_num in zip(self.columns, numeric)
+        ])
+        self._writer = pq.ParquetWriter(self.part_path, self._schema)
+
+    def _write(self, rows: List[List[Any]]) -> None:
+        arrays = []
+        for i, is_num in enumerate(self._numeric):
+            values = [row[i] for row in rows]
+            if is_num:
+                values = [v if isinstance(v, (int, float)) else None for v in values]
+            else:
+                values = [None if v is None else str(v) for v in values]
+            arrays.append(self._pa.array(values, type=self._schema.field(i).type))
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def _close(self) -> None:
+        writer = getattr(self, "_writer", None)
+        if writer is not None:
+            writer.close()
+            self._writer = None
+
+
+_SINKS = {"jsonl": JsonlSink, "csv": CsvSink, "sqlite": SqliteSink, "parquet": ParquetSink}
+
+
+def open_sink(path: str, fmt: str) -> RowSink:
+    """Sink for ``fmt`` writing to ``path`` (not opened yet)."""
+    if fmt not in _SINKS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(SINK_FORMATS)}")
+    return _SINKS[fmt](path)
+
+
+def _unique_names(names: Sequence[str]) -> List[str]:
+    """Column names with duplicates suffixed ``_2``, ``_3`` ..."""
+    seen: Dict[str, int] = {}
+    unique = []
+    for name in names:
+        name = str(name)
+        if name in seen:
+            seen[name] += 1
+            candidate = f"{name}_{seen[name]}"
+            while candidate in seen:
+                seen[name] += 1
+                candidate = f"{name}_{seen[name]}"
+            name = candidate
+        seen[name] = 1
+        unique.append(name)
+    return unique
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
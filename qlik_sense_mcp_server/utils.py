@@ -1,10 +1,11 @@
 """Utility functions for the MCP server."""
 
 import re
+import base64
 import json
 import random
 import string
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 
 
@@ -239,3 +240,291 @@ def escape_qlik_field_name(field_name: str) -> str:
 def generate_xrfkey() -> str:
     """Generate a random X-Qlik-Xrfkey with 16 alphanumeric characters."""
     return ''.join(random.choices(string.ascii_lowercase + string.digits, k=16))
+
+
+def hypercube_cell_value(cell: Dict[str, Any], numeric: bool) -> Any:
+    """Plain value of one qMatrix cell: qNum for measures when numeric, else qText."""
+    if cell.get("qIsNull"):
+        return None
+    if numeric:
+        num = cell.get("qNum")
+        if isinstance(num, (int, float)) and num == num:
+            return num
+    return cell.get("qText")
+
+
+def encode_columnar(hypercube: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Re-encode a ``qHyperCube`` layout column by column.
+
+    Dimensions become ``{"name", "kind": "dimension", "encoding": "dict",
+    "dictionary": [...distinct qText...], "codes": [...index or None...]}``.
+    Measures become ``{"name", "kind": "measure", "encoding": "number" |
+    "text", "values": [...]}`` — ``qNum`` unless the measure never yields a
+    number, then ``qText``. Null and NaN cells are None.
+    """
+    dim_info = hypercube.get("qDimensionInfo", []) or []
+    measure_info = hypercube.get("qMeasureInfo", []) or []
+    matrix = [row for page in hypercube.get("qDataPages", []) or [] for row in page.get("qMatrix", [])]
+
+    columns: List[Dict[str, Any]] = []
+    for i, info in enumerate(dim_info):
+        index: Dict[str, int] = {}
+        codes: List[Optional[int]] = []
+        for row in matrix:
+            cell = row[i] if i < len(row) else {}
+            if cell.get("qIsNull"):
+                codes.append(None)
+                continue
+            text = cell.get("qText", "")
+            code = index.get(text)
+            if code is None:
+                code = index[text] = len(index)
+            codes.append(code)
+        columns.append({
+            "name": info.get("qFallbackTitle", f"Dimension_{i}"),
+            "kind": "dimension",
+            "encoding": "dict",
+            "dictionary": list(index),
+            "codes": codes,
+        })
+
+    for j, info in enumerate(measure_info):
+        col = len(dim_info) + j
+        cells = [row[col] if col < len(row) else {} for row in matrix]
+        present = [c for c in cells if not c.get("qIsNull")]
+        # Text only for measures that never yield a number (Concat, Only on text).
+        numeric = (any(_finite_number(c.get("qNum")) is not None for c in present)
+                   or all(c.get("qText") in (None, "", "-") for c in present))
+        if numeric:
+            values = [None if c.get("qIsNull") else _finite_number(c.get("qNum")) for c in cells]
+        else:
+            values = [hypercube_cell_value(c, False) for c in cells]
+        columns.append({
+            "name": info.get("qFallbackTitle", f"Measure_{j}"),
+            "kind": "measure",
+            "encoding": "number" if numeric else "text",
+            "values": values,
+        })
+
+    return {"row_count": len(matrix), "columns": columns}
+
+
+def flatten_pivot_page(page: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten one ``NxPivotPage`` into header paths and a value grid.
+
+    Returns ``{"row_headers", "column_headers", "values", "nodes"}``:
+    one label path per row of ``qLeft`` leaves and per column of ``qTop``
+    leaves, the ``qData`` grid as plain values, and every node that can be
+    expanded or collapsed with the ``(row, col)`` that ``ExpandLeft`` /
+    ``ExpandTop`` (and the ``Collapse*`` calls) expect for it.
+    """
+    area = page.get("qArea", {}) or {}
+    nodes: List[Dict[str, Any]] = []
+    row_headers = _pivot_leaves(page.get("qLeft", []) or [], "left", area.get("qTop", 0), nodes)
+    column_headers = _pivot_leaves(page.get("qTop", []) or [], "top", area.get("qLeft", 0), nodes)
+    values = [[hypercube_cell_value(cell, True) for cell in row] for row in page.get("qData", []) or []]
+    return {
+        "row_headers": row_headers,
+        "column_headers": column_headers,
+        "values": values,
+        "nodes": nodes,
+    }
+
+
+def _pivot_leaves(
+    tree: List[Dict[str, Any]], side: str, offset: int, nodes: List[Dict[str, Any]],
+) -> List[List[str]]:
+    leaves: List[List[str]] = []
+
+    def walk(node: Dict[str, Any], depth: int, path: List[str]) -> None:
+        path = path + [node.get("qText", "")]
+        position = offset + len(leaves)
+        if node.get("qCanExpand") or node.get("qCanCollapse"):
+            nodes.append({
+                "side": side,
+                "row": position if side == "left" else depth,
+                "col": depth if side == "left" else position,
+                "path": path,
+                "expanded": not node.get("qCanExpand"),
+            })
+        children = node.get("qSubNodes") or []
+        if not children:
+            leaves.append(path)
+        for child in children:
+            walk(child, depth + 1, path)
+
+    for root in tree:
+        walk(root, 0, [])
+    return leaves
+
+
+def flatten_stack_page(page: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten one ``NxStackPage`` into ``[{"path", "value", "text"}]``.
+
+    One entry per leaf cell of the ``qData`` trees: ``path`` holds the
+    labels of its ancestors, ``value`` / ``text`` the leaf's own value.
+    """
+    rows: List[Dict[str, Any]] = []
+
+    def walk(node: Dict[str, Any], path: List[str]) -> None:
+        children = node.get("qSubNodes") or []
+        if not children:
+            value = node.get("qValue")
+            rows.append({
+                "path": path,
+                "value": _finite_number(value),
+                "text": node.get("qText"),
+            })
+            return
+        for child in children:
+            walk(child, path + [node.get("qText", "")])
+
+    for root in page.get("qData", []) or []:
+        walk(root, [])
+    return rows
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Opaque, URL-safe paging cursor carrying ``state``."""
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """The state of an ``encode_cursor`` cursor; ``ValueError`` if it is not one."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(state, dict):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return state
+
+
+def _finite_number(value: Any) -> Optional[Union[int, float]]:
+    if isinstance(value, (int, float)) and value == value and value not in (float("inf"), float("-inf")):
+        return value
+    return None
+
+
+# Chart aggregation functions that take a leading set expression.
+SET_AGGREGATIONS = frozenset({
+    "sum", "count", "avg", "min", "max", "only", "mode", "minstring", "maxstring",
+    "concat", "firstsortedvalue", "median", "fractile", "fractileexc", "stdev",
+    "sterr", "kurtosis", "skew", "correl", "nullcount", "missingcount",
+    "numericcount", "textcount", "aggr",
+})
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+_CLOSERS = {"{": "}", "(": ")"}
+
+
+def set_modifier(field_name: str, values: List[Any]) -> str:
+    """Set-analysis field modifier ``[Field]={'v1','v2'}`` matching the given values as text."""
+    quoted = ",".join("'" + str(v).replace("'", "''") + "'" for v in values)
+    return "[" + field_name.replace("]", "]]") + "]={" + quoted + "}"
+
+
+def iter_function_calls(expression: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    ``(name, name_start, open_paren)`` for every function call in ``expression``.
+
+    Calls inside string literals and bracketed field names are skipped;
+    calls nested in other calls' arguments are included.
+    """
+    i, n = 0, len(expression)
+    while i < n:
+        ch = expression[i]
+        if ch in "'\"[":
+            i = skip_quoted(expression, i)
+            continue
+        match = _IDENTIFIER.match(expression, i)
+        if not match:
+            i += 1
+            continue
+        k = match.end()
+        while k < n and expression[k].isspace():
+            k += 1
+        if k < n and expression[k] == "(":
+            yield match.group(0), i, k
+        i = match.end()
+
+
+def leading_set(expression: str, open_paren: int) -> Optional[Tuple[int, int]]:
+    """``(start, end)`` of the ``{...}`` set right after ``open_paren``, end inclusive; None if absent."""
+    p = open_paren + 1
+    while p < len(expression) and expression[p].isspace():
+        p += 1
+    if p < len(expression) and expression[p] == "{":
+        end = find_closing(expression, p)
+        if end is not None:
+            return p, end
+    return None
+
+
+def inject_set_modifier(expression: str, modifier: str) -> str:
+    """
+    Restrict every aggregation in ``expression`` by a set-analysis ``modifier``.
+
+    ``Sum(X)`` becomes ``Sum({<modifier>}X)``; an aggregation that already
+    has a set expression ``{S}`` gets ``{(S)*1<modifier>}`` — the
+    intersection keeps whatever ``S`` selects and adds the restriction.
+    Nested aggregations (``Sum(Aggr(Sum(X), D))``) are all restricted.
+    String literals and bracketed field names are left untouched.
+    """
+    out: List[str] = []
+    done = 0
+    for name, _, paren in iter_function_calls(expression):
+        if name.lower() not in SET_AGGREGATIONS or paren < done:
+            continue
+        span = leading_set(expression, paren)
+        if span is None:
+            out.append(expression[done:paren + 1] + "{<" + modifier + ">}")
+            done = paren + 1
+        else:
+            start, end = span
+            out.append(expression[done:start]
+                       + "{(" + expression[start + 1:end].strip() + ")*1<" + modifier + ">}")
+            done = end + 1
+    out.append(expression[done:])
+    return "".join(out)
+
+
+def skip_quoted(text: str, start: int) -> int:
+    """Index just past the quoted section opening at ``start`` (``'``, ``"`` or ``[``; doubled closers are escapes)."""
+    close = "]" if text[start] == "[" else text[start]
+    i = start + 1
+    while i < len(text):
+        if text[i] == close:
+            if i + 1 < len(text) and text[i + 1] == close:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return len(text)
+
+
+def find_closing(text: str, start: int) -> Optional[int]:
+    """Index of the ``}`` or ``)`` closing the bracket at ``start``; None if unbalanced."""
+    opener = text[start]
+    closer = _CLOSERS[opener]
+    depth = 0
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if ch in "'\"[":
+            i = skip_quoted(text, i)
+            continue
+        if ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return None
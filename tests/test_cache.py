@@ -0,0 +1,158 @@
+"""Tests for the in-process result cache."""
+
+from qlik_sense_mcp_server.cache import PersistentCache, ResultCache, request_hash
+
+
+class TestRequestHash:
+    def test_key_order_does_not_matter(self):
+        assert request_hash({"a": 1, "b": [1, 2]}) == request_hash({"b": [1, 2], "a": 1})
+
+    def test_values_matter(self):
+        assert request_hash({"max_rows": 10}) != request_hash({"max_rows": 11})
+
+
+class TestResultCache:
+    def test_hit_and_miss_counters(self):
+        cache = ResultCache(10_000)
+        key = ("app", "2026-01-01", "h")
+        assert cache.get(key) is None
+        cache.put(key, {"rows": [1, 2]})
+        assert cache.get(key) == {"rows": [1, 2]}
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+        assert stats["hit_ratio"] == 0.5
+
+    def test_get_returns_a_copy(self):
+        cache = ResultCache(10_000)
+        key = ("app", "v", "h")
+        cache.put(key, {"data": 1})
+        cache.get(key).pop("data")
+        assert cache.get(key) == {"data": 1}
+
+    def test_lru_eviction_respects_byte_budget(self):
+        cache = ResultCache(100)
+        for i in range(5):
+            cache.put(("app", "v", str(i)), {"payload": "x" * 20})
+        stats = cache.stats()
+        assert stats["bytes"] <= 100
+        assert stats["evictions"] == 5 - stats["entries"]
+        assert cache.get(("app", "v", "4")) is not None
+        assert cache.get(("app", "v", "0")) is None
+
+    def test_recently_used_entries_survive(self):
+        cache = ResultCache(110)  # three 35-byte entries
+        cache.put(("app", "v", "a"), {"payload": "x" * 20})
+        cache.put(("app", "v", "b"), {"payload": "x" * 20})
+        cache.get(("app", "v", "a"))
+        cache.put(("app", "v", "c"), {"payload": "x" * 20})
+        cache.put(("app", "v", "d"), {"payload": "x" * 20})
+        assert cache.get(("app", "v", "a")) is not None
+        assert cache.get(("app", "v", "b")) is None
+
+    def test_oversized_results_are_not_cached(self):
+        cache = ResultCache(10)
+        assert cache.put(("app", "v", "h"), {"payload": "x" * 100}) is False
+        assert len(cache) == 0
+
+    def test_new_reload_time_drops_old_entries(self):
+        cache = ResultCache(10_000)
+        cache.note_version("app", "v1")
+        cache.put(("app", "v1", "h"), {"x": 1})
+        cache.put(("other", "v1", "h"), {"x": 1})
+        assert cache.note_version("app", "v1") == 0
+        assert cache.note_version("app", "v2") == 1
+        assert cache.get(("app", "v1", "h")) is None
+        assert cache.get(("other", "v1", "h")) is not None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = ResultCache(0)
+        assert not cache.enabled
+        assert cache.put(("app", "v", "h"), {"x": 1}) is False
+
+    def test_invalidate_app(self):
+        cache = ResultCache(10_000)
+        cache.put(("a", "v", "1"), {"x": 1})
+        cache.put(("b", "v", "1"), {"x": 1})
+        assert cache.invalidate("a") == 1
+        assert len(cache) == 1
+        assert cache.invalidate() == 1
+        assert cache.stats()["bytes"] == 0
+
+
+class TestPersistentCache:
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        disk = PersistentCache(path, 10_000, scope="s")
+        disk.put("hypercube", ("app", "v1", "h"), {"rows": [1]})
+        disk.close()
+        disk = PersistentCache(path, 10_000, scope="s")
+        assert disk.get("hypercube", ("app", "v1", "h")) == {"rows": [1]}
+        assert disk.get("hypercube", ("app", "v2", "h")) is None
+        disk.close()
+
+    def test_scopes_and_namespaces_are_separate(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        alice = PersistentCache(path, 10_000, scope="alice")
+        bob = PersistentCache(path, 10_000, scope="bob")
+        alice.put("hypercube", ("app", "v", "h"), {"x": 1})
+        assert bob.get("hypercube", ("app", "v", "h")) is None
+        assert alice.get("metadata", ("app", "v", "h")) is None
+        alice.close()
+        bob.close()
+
+    def test_size_budget_evicts_least_recently_read(self, tmp_path):
+        disk = PersistentCache(str(tmp_path / "cache.sqlite"), 60, scope="s")
+        disk.put("n", ("app", "v", "a"), {"p": "x" * 15})
+        disk.put("n", ("app", "v", "b"), {"p": "x" * 15})
+        disk.put("n", ("app", "v", "c"), {"p": "x" * 15})
+        assert disk.stats()["bytes"] <= 60
+        assert disk.get("n", ("app", "v", "a")) is None
+        assert disk.get("n", ("app", "v", "c")) is not None
+        assert disk.evictions == 1
+        disk.close()
+
+    def test_drop_stale_versions(self, tmp_path):
+        disk = PersistentCache(str(tmp_path / "cache.sqlite"), 10_000, scope="s")
+        disk.put("n", ("app", "v1", "a"), {"x": 1})
+        disk.put("n", ("app", "v2", "b"), {"x": 1})
+        assert disk.drop_stale("n", "app", "v2") == 1
+        assert disk.stats()["entries"] == 1
+        disk.close()
+
+    def test_unusable_path_disables_tier(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("x")
+        disk = PersistentCache(str(blocker / "cache.sqlite"), 10_000)
+        assert not disk.enabled
+        assert disk.get("n", ("app", "v", "h")) is None
+
+
+class TestResultCacheWithDisk:
+    def test_memory_miss_falls_back_to_disk(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        first = ResultCache(10_000, PersistentCache(path, 10_000), namespace="hypercube")
+        first.put(("app", "v", "h"), {"rows": [1, 2]})
+        restarted = ResultCache(10_000, PersistentCache(path, 10_000), namespace="hypercube")
+        assert restarted.get(("app", "v", "h")) == {"rows": [1, 2]}
+        assert restarted.stats()["disk_hits"] == 1
+        assert restarted.get(("app", "v", "h")) == {"rows": [1, 2]}
+        assert restarted.stats()["hits"] == 1
+
+    def test_warm_start_loads_recent_entries(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        first = ResultCache(10_000, PersistentCache(path, 10_000))
+        for i in range(5):
+            first.put(("app", "v", str(i)), {"i": i})
+        restarted = ResultCache(10_000, PersistentCache(path, 10_000))
+        assert restarted.warm_start(3) == 3
+        assert len(restarted) == 3
+
+    def test_reload_drops_disk_entries_too(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        disk = PersistentCache(path, 10_000)
+        cache = ResultCache(10_000, disk)
+        cache.note_version("app", "v1")
+        cache.put(("app", "v1", "h"), {"x": 1})
+        cache.note_version("app", "v2")
+        assert disk.stats()["entries"] == 0
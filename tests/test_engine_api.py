@@ -0,0 +1,488 @@
+"""Tests for QlikEngineAPI against a scripted Engine."""
+
+import base64
+import itertools
+import json
+import threading
+
+from qlik_sense_mcp_server.config import QlikSenseConfig
+from qlik_sense_mcp_server.engine_api import QlikEngineAPI, _binned_data_args, _typed_evaluation
+from qlik_sense_mcp_server.exceptions import QlikEngineError
+from qlik_sense_mcp_server.engine_transport import EngineTransport
+from tests.test_engine_transport import FakeWebSocket
+
+
+class FakeEngine:
+    """
+    Answers Engine requests by method name.
+
+    ``handlers[method](params, obj)`` returns the ``result`` of the reply,
+    ``obj`` being the definition of the session object the request was
+    sent to (None for the app). ``OpenDoc`` and ``CreateSessionObject``
+    hand out handles, anything else gets an empty result. Every request
+    is kept in ``calls``.
+    """
+
+    def __init__(self, **handlers):
+        self.handlers = handlers
+        self.calls = []
+        self.objects = {}
+        self._handles = itertools.count(10)
+
+    def __call__(self, req):
+        method, params = req["method"], req.get("params")
+        self.calls.append((method, params))
+        if method in self.handlers:
+            result = self.handlers[method](params, self.objects.get(req.get("handle")))
+        elif method == "OpenDoc":
+            result = {"qReturn": {"qType": "Doc", "qHandle": 1}}
+        elif method == "CreateSessionObject":
+            handle = next(self._handles)
+            self.objects[handle] = params[0]
+            result = {"qReturn": {"qType": "GenericObject", "qHandle": handle}}
+        else:
+            result = {}
+        return [{"id": req["id"], "result": result}]
+
+    def params(self, method):
+        return [params for name, params in self.calls if name == method]
+
+
+def _config():
+    return QlikSenseConfig(server_url="https://qlik.example.com",
+                           user_directory="DOMAIN", user_id="alice")
+
+
+def _api(engine):
+    api = QlikEngineAPI(_config())
+    api.sessions_per_app = 0
+
+    def open_transport(app_id=None, identity=None):
+        ws = FakeWebSocket(engine)
+        ws.ping = lambda: None
+        return EngineTransport(ws)
+
+    api._open_transport = open_transport
+    return api
+
+
+def _layout(**hypercube):
+    return lambda params, obj: {"qLayout": {"qHyperCube": hypercube}}
+
+
+def _tables(**tables):
+    """``GetTablesAndKeys`` handler: ``{table: [(field, rows, distinct, is_key)]}``."""
+    qtr = [{"qName": name, "qFields": [
+        {"qName": f, "qnRows": rows, "qnTotalDistinctValues": distinct, "qIsKey": is_key}
+        for f, rows, distinct, is_key in fields]} for name, fields in tables.items()]
+    return lambda params, obj: {"qtr": qtr}
+
+
+def _jwt(**claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+class TestCacheIdentity:
+    def test_certificate_identity(self):
+        api = QlikEngineAPI(_config())
+        assert api._cache_identity() == "https://qlik.example.com|DOMAIN|alice"
+
+    def test_rotated_jwt_keeps_identity(self):
+        def identity(token):
+            config = QlikSenseConfig(server_url="https://qlik.example.com/jwt", jwt_token=token)
+            return QlikEngineAPI(config)._cache_identity()
+
+        first = identity(_jwt(userDirectory="DOMAIN", userId="alice", iat=1))
+        assert first == "https://qlik.example.com/jwt|DOMAIN|alice"
+        assert identity(_jwt(userDirectory="DOMAIN", userId="alice", iat=2)) == first
+        assert identity(_jwt(userDirectory="DOMAIN", userId="bob", iat=1)) != first
+
+    def test_unreadable_jwt_falls_back_to_token(self):
+        config = QlikSenseConfig(server_url="https://qlik.example.com/jwt", jwt_token="opaque")
+        assert QlikEngineAPI(config)._cache_identity().endswith("|opaque")
+
+    def test_disk_tier_is_off_by_default(self):
+        api = QlikEngineAPI(_config())
+        assert api.persistent_cache is None
+
+
+class TestPooledSessionUse:
+    def test_session_in_use_is_not_closed_by_another_thread(self):
+        api = _api(FakeEngine())
+        api._pool.max_docs = 1
+        api.ensure_app("a")
+        session = api._pool.get("a")
+        assert session.in_use == 1
+
+        worker = threading.Thread(target=api.ensure_app, args=("b",))
+        worker.start()
+        worker.join(timeout=5)
+        assert "a" not in api._pool
+        assert not session.transport.closed
+
+        api.release_thread()
+        assert session.transport.closed
+        assert api.ws is None
+
+    def test_lease_leaves_nothing_acquired(self):
+        api = _api(FakeEngine())
+        with api.lease("a") as app_handle:
+            assert app_handle == 1
+            assert api._pool.get("a").in_use == 1
+        assert api._pool.get("a").in_use == 0
+        assert api.ws is None
+
+
+class TestPivotHypercube:
+    def test_stacked_data_is_paged_by_returned_height(self):
+        def stack_data(params, obj):
+            page = params[1][0]
+            if page["qTop"] >= 2000:
+                return {"qDataPages": [{"qArea": dict(page, qHeight=0), "qData": []}]}
+            # The Engine stops at 1000 rows per page, whatever was asked.
+            height = min(page["qHeight"], 1000)
+            return {"qDataPages": [{
+                "qArea": dict(page, qHeight=height),
+                "qData": [{"qText": f"row {page['qTop'] + i}",
+                           "qSubNodes": [{"qText": "1", "qValue": 1}]} for i in range(height)],
+            }]}
+
+        engine = FakeEngine(GetLayout=_layout(qSize={"qcx": 2, "qcy": 3000}),
+                            GetHyperCubeStackData=stack_data)
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            result = api.create_pivot_hypercube(app_handle, ["Region"], [], ["Sum(Sales)"],
+                                                mode="stacked", max_rows=3000)
+        tops = [params[1][0]["qTop"] for params in engine.params("GetHyperCubeStackData")]
+        assert tops == [0, 1000, 2000]
+        assert result["returned_rows"] == 2000
+        assert result["returned_cells"] == 2000
+        assert result["pages"] == 2
+        assert result["cells"][1000]["path"] == ["row 1000"]
+        assert result["truncation_warning"].startswith("TRUNCATED")
+
+
+def _list_layout(distinct):
+    """``GetLayout`` of a ListObject over ``distinct`` values."""
+    return {"qLayout": {"qListObject": {"qSize": {"qcx": 1, "qcy": distinct}}}}
+
+
+def _list_data(params, obj):
+    """One ``V<top>`` value per requested one-row page."""
+    return {"qDataPages": [{"qMatrix": [[{"qText": f"V{page['qTop']}"}]]} for page in params[1]]}
+
+
+class TestSampleTable:
+    def _stride(self, distinct, count):
+        engine = FakeEngine(GetLayout=lambda params, obj: _list_layout(distinct),
+                            GetListObjectData=_list_data)
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            sampled = api._stride_values(app_handle, "Line", count, 10.0)
+        (list_def,) = engine.objects.values()
+        assert list_def["qListObjectDef"]["qDef"]["qSortCriterias"] == [{"qSortByLoadOrder": 1}]
+        pages = engine.params("GetListObjectData")
+        return sampled, [p["qTop"] for p in pages[0][1]] if pages else []
+
+    def test_stride_spreads_over_load_order_in_one_call(self):
+        (values, distinct), tops = self._stride(1000, 4)
+        assert tops == [0, 250, 500, 750]
+        assert values == ["V0", "V250", "V500", "V750"]
+        assert distinct == 1000
+
+    def test_more_rows_than_distinct_values_reads_each_once(self):
+        (values, distinct), tops = self._stride(3, 10)
+        assert tops == [0, 1, 2]
+        assert values == ["V0", "V1", "V2"] and distinct == 3
+
+    def test_empty_field_reads_nothing(self):
+        (values, distinct), tops = self._stride(0, 5)
+        assert values == [] and distinct == 0 and tops == []
+
+    def test_samples_the_widest_non_key_field(self):
+        def layout(params, obj):
+            if "qListObjectDef" in obj:
+                return _list_layout(1000)
+            # One row per sampled value, then a second row for V0.
+            matrix = [[{"qText": v}, {"qText": "k"}, {"qText": "5"}, {"qNum": 1}]
+                      for v in ("V0", "V0", "V500")]
+            return {"qLayout": {"qHyperCube": {"qSize": {"qcx": 4, "qcy": 3},
+                                               "qDataPages": [{"qMatrix": matrix}]}}}
+
+        engine = FakeEngine(
+            GetTablesAndKeys=_tables(Orders=[("OrderID", 1000, 5000, True),
+                                             ("Line", 1000, 1000, False),
+                                             ("Amount", 1000, 50, False)]),
+            GetLayout=layout, GetListObjectData=_list_data,
+        )
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            result = api.sample_table("app", app_handle, "Orders", rows=2)
+        assert result["sample_field"] == "Line"
+        assert result["columns"] == ["Line", "OrderID", "Amount"]
+        assert result["sampled_values"] == 2
+        cube = next(o for o in engine.objects.values() if "qHyperCubeDef" in o)
+        measure = cube["qHyperCubeDef"]["qMeasures"][0]["qDef"]["qDef"]
+        assert measure.startswith("Count({<") and "V0" in measure and "V500" in measure
+        assert [row["Line"] for row in result["rows"]] == ["V0", "V500"]
+
+    def test_explicit_field_must_belong_to_the_table(self):
+        engine = FakeEngine(GetTablesAndKeys=_tables(Orders=[("Line", 10, 10, False)]))
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            result = api.sample_table("app", app_handle, "Orders", sample_field="Amount")
+        assert result["error_category"] == "invalid_request"
+        assert result["table_fields"] == ["Line"]
+
+
+class TestTypedEvaluation:
+    def test_number(self):
+        value = {"qIsNumeric": True, "qNumber": 1234.5, "qText": "1 234,5"}
+        assert _typed_evaluation(value) == {"type": "number", "value": 1234.5, "text": "1 234,5"}
+
+    def test_nan_number_is_null(self):
+        value = {"qIsNumeric": True, "qNumber": float("nan"), "qText": "-"}
+        assert _typed_evaluation(value) == {"type": "null", "value": None, "text": "-"}
+
+    def test_text(self):
+        assert _typed_evaluation({"qText": "EU"}) == {"type": "text", "value": "EU", "text": "EU"}
+
+    def test_null(self):
+        assert _typed_evaluation({})["type"] == "null"
+        assert _typed_evaluation({"qText": ""})["type"] == "null"
+
+    def test_error_text(self):
+        value = {"qText": "Error: Bad field name(s): Salez"}
+        assert _typed_evaluation(value) == {"error": "Error: Bad field name(s): Salez"}
+
+
+class TestEvaluateExpressions:
+    def _api(self, replies):
+        """API whose ``send_requests`` answers each expression from ``replies``."""
+        api = QlikEngineAPI(_config())
+        api.get_app_reload_time = lambda app_handle, timeout=None: "2026-01-01T00:00:00Z"
+        sent = []
+
+        def send_requests(calls, timeout=None):
+            sent.append([params["qExpression"] for _, params, _ in calls])
+            return [replies[params["qExpression"]] for _, params, _ in calls]
+
+        api.send_requests = send_requests
+        return api, sent
+
+    def test_only_misses_are_sent(self):
+        api, sent = self._api({
+            "Sum(Sales)": {"qValue": {"qIsNumeric": True, "qNumber": 10, "qText": "10"}},
+            "Only(Region)": {"qValue": {"qText": "EU"}},
+            "Max(Date)": {"qValue": {"qIsNumeric": True, "qNumber": 45000, "qText": "2023-03-15"}},
+        })
+        first = api.evaluate_expressions("app", 1, ["Sum(Sales)", {"name": "region",
+                                                                  "expression": "Only(Region)"}])
+        assert first["evaluated"] == 2 and first["cached"] == 0
+        second = api.evaluate_expressions("app", 1, ["Max(Date)", "Sum(Sales)"])
+        assert sent == [["Sum(Sales)", "Only(Region)"], ["Max(Date)"]]
+        assert second["evaluated"] == 1 and second["cached"] == 1
+        assert [r["cache"] for r in second["results"]] == ["miss", "hit"]
+        assert second["results"][1] == {"name": "expr_1", "expression": "Sum(Sales)",
+                                        "type": "number", "value": 10, "text": "10",
+                                        "cache": "hit"}
+        assert first["results"][1]["name"] == "region"
+
+    def test_errors_are_not_cached(self):
+        api, sent = self._api({
+            "Sum(Salez)": {"qValue": {"qText": "Error: Bad field name(s): Salez"}},
+            "Sum(": QlikEngineError("Engine API error: syntax"),
+        })
+        for _ in range(2):
+            result = api.evaluate_expressions("app", 1, ["Sum(Salez)", "Sum(", ""])
+            assert result["failed"] == 3 and result["cached"] == 0
+        assert sent == [["Sum(Salez)", "Sum("]] * 2
+        assert result["results"][1]["error"] == "Engine API error: syntax"
+
+
+class TestBinnedDataArgs:
+    def test_range_spans_both_measures(self):
+        hypercube = {"qMeasureInfo": [{"qMin": 10, "qMax": 110}, {"qMin": -5, "qMax": 5}]}
+        viewport, ranges, max_cells, level, method = _binned_data_args(hypercube, 1000)
+        assert ranges == [{"qLeft": 10, "qTop": -5, "qWidth": 100, "qHeight": 10}]
+        # 31 x 31 bins fit in 1000 cells; level 4 is 16 bins per side.
+        assert viewport == {"qWidth": 31, "qHeight": 31, "qZoomLevel": 0}
+        assert (max_cells, level, method) == (1000, 4, 0)
+
+    def test_flat_or_missing_ranges_get_unit_size(self):
+        hypercube = {"qMeasureInfo": [{"qMin": 3, "qMax": 3}, {}]}
+        _, ranges, _, level, _ = _binned_data_args(hypercube, 1)
+        assert ranges == [{"qLeft": 3, "qTop": 0, "qWidth": 1, "qHeight": 1}]
+        assert level == 0
+        assert _binned_data_args({}, 4)[1] == [{"qLeft": 0, "qTop": 0, "qWidth": 1, "qHeight": 1}]
+
+
+class TestReducedHypercube:
+    MEASURE_INFO = [{"qMin": 0, "qMax": 100}, {"qMin": 0, "qMax": 50}]
+
+    def _reduce(self, dims, measures, reduction, target_points):
+        data = lambda params, obj: {"qDataPages": [{"qMatrix": [[{"qNum": 1}]] * 3}]}
+        engine = FakeEngine(
+            GetLayout=_layout(qSize={"qcx": 3, "qcy": 2_000_000}, qMeasureInfo=self.MEASURE_INFO),
+            GetHyperCubeReducedData=data, GetHyperCubeBinnedData=data,
+        )
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            result = api.create_reduced_hypercube(app_handle, dims, measures, reduction,
+                                                  target_points)
+        return result, engine
+
+    def test_line_uses_reduced_data_with_capped_page(self):
+        result, engine = self._reduce(["Date"], ["Sum(Sales)"], "line", 6000)
+        (params,) = engine.params("GetHyperCubeReducedData")
+        # Two columns: 9900 cells allow 4950 rows, below the 6000 asked for.
+        assert params == ["/qHyperCubeDef",
+                          [{"qTop": 0, "qLeft": 0, "qHeight": 4950, "qWidth": 2}], -1, "D1"]
+        assert engine.params("GetHyperCubeBinnedData") == []
+        assert result["target_points"] == 4950
+        assert result["total_rows"] == 2_000_000 and result["returned_rows"] == 3
+
+    def test_scatter_mode(self):
+        _, engine = self._reduce(["Customer"], ["Sum(Sales)", "Sum(Qty)"], "scatter", 500)
+        assert engine.params("GetHyperCubeReducedData")[0][3] == "S"
+
+    def test_binned_uses_binned_data_within_cell_budget(self):
+        result, engine = self._reduce(["Customer"], ["Sum(Sales)", "Sum(Qty)"], "binned", 400)
+        (params,) = engine.params("GetHyperCubeBinnedData")
+        assert params[:2] == ["/qHyperCubeDef",
+                              [{"qTop": 0, "qLeft": 0, "qHeight": 400, "qWidth": 3}]]
+        assert params[2:] == _binned_data_args({"qMeasureInfo": self.MEASURE_INFO}, 400)
+        assert engine.params("GetHyperCubeReducedData") == []
+        assert result["reduction"] == "binned"
+
+    def test_binned_needs_one_dimension_and_two_measures(self):
+        result, engine = self._reduce(["Customer"], ["Sum(Sales)"], "binned", 400)
+        assert result["error_category"] == "invalid_request"
+        assert engine.params("CreateSessionObject") == []
+
+    def test_unknown_reduction(self):
+        result, _ = self._reduce(["Date"], ["Sum(Sales)"], "wavelet", 400)
+        assert result["error_category"] == "invalid_request"
+
+
+def _search_engine(values):
+    """Engine whose field search matches ``values``; one cell per row of each page."""
+    def layout(params, obj):
+        if "qListObjectDef" in obj:
+            return {"qLayout": {"qListObject": {"qSize": {"qcx": 1, "qcy": len(values)}}}}
+        return {}
+
+    def data(params, obj):
+        page = params[1][0]
+        rows = values[page["qTop"]:page["qTop"] + page["qHeight"]]
+        return {"qDataPages": [{"qMatrix": [[{"qText": v, "qState": "O"}] for v in rows]}]}
+
+    return FakeEngine(GetLayout=layout, GetListObjectData=data)
+
+
+class TestSearchFieldValues:
+    def test_search_then_read_only_the_requested_page(self):
+        engine = _search_engine([f"Acme {i}" for i in range(500)])
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            found = api.search_field_values(app_handle, "Customer", "Acme*", offset=20, limit=10)
+        methods = [m for m, _ in engine.calls if m not in ("OpenDoc", "DestroySessionObject")]
+        assert methods == ["CreateSessionObject", "SearchListObjectFor", "GetLayout",
+                           "GetListObjectData"]
+        assert engine.params("SearchListObjectFor") == [["/qListObjectDef", "Acme*"]]
+        (page,) = engine.params("GetListObjectData")[0][1]
+        assert (page["qTop"], page["qHeight"]) == (20, 10)
+        assert found["matches"] == 500 and found["scanned"] == 10
+        assert [v["value"] for v in found["values"]] == [f"Acme {i}" for i in range(20, 30)]
+
+    def test_accept_filters_before_offset(self):
+        engine = _search_engine(["EU", "North EU", "Europe", "eu-west"])
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            found = api.search_field_values(app_handle, "Region", "eu*", offset=1, limit=5,
+                                            accept=lambda c: c["qText"].lower().startswith("eu"))
+        assert [v["value"] for v in found["values"]] == ["Europe", "eu-west"]
+        assert found["matches"] == 4 and found["scanned"] == 4
+
+    def test_no_matches_reads_no_data(self):
+        engine = _search_engine([])
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            found = api.search_field_values(app_handle, "Region", "zz*")
+        assert found == {"values": [], "matches": 0, "scanned": 0}
+        assert engine.params("GetListObjectData") == []
+
+
+class TestDataExport:
+    def _export(self, engine, **kwargs):
+        api = _api(engine)
+        exported = []
+
+        def export_hypercube(app_handle, sink, dimensions, measures, max_rows=None,
+                             row_filter=None):
+            exported.append([d["field"] for d in dimensions])
+            return {"path": "out.csv", "rows": 0}
+
+        api.export_hypercube = export_hypercube
+        with api.lease("app") as app_handle:
+            return api.create_data_export("app", app_handle, None, **kwargs), exported
+
+    def test_too_many_fields_are_rejected(self):
+        engine = FakeEngine()
+        result, exported = self._export(engine, fields=[f"F{i}" for i in range(51)])
+        assert result["error_category"] == "limit_exceeded"
+        assert exported == []
+
+    def test_wide_table_is_cut_to_the_field_limit(self):
+        fields = [(f"F{i}", 10, 10, False) for i in range(52)]
+        engine = FakeEngine(GetTablesAndKeys=_tables(Wide=fields))
+        result, exported = self._export(engine, table_name="Wide")
+        assert exported == [[f"F{i}" for i in range(50)]]
+        assert result["omitted_fields"] == ["F50", "F51"]
+
+
+class TestScopedListHelpers:
+    def _destroyed_match_created(self, engine, prefix):
+        created = [params[0]["qInfo"]["qId"] for params in engine.params("CreateSessionObject")]
+        destroyed = [params[0] for params in engine.params("DestroySessionObject")]
+        assert created and all(q.startswith(f"mcp-{prefix}-") for q in created)
+        assert len(set(created)) == len(created)
+        assert sorted(destroyed) == sorted(created)
+
+    def test_field_values_use_unique_ids(self):
+        def layout(params, obj):
+            return {"qLayout": {"qListObject": {"qSize": {"qcx": 1, "qcy": 1}, "qDataPages": [
+                {"qMatrix": [[{"qText": "EU"}]]}]}}}
+
+        engine = FakeEngine(GetLayout=layout)
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            for _ in range(2):
+                assert api.get_field_values(app_handle, "Region")["values"][0]["value"] == "EU"
+        self._destroyed_match_created(engine, "field-values")
+
+    def test_hypercube_fallback_uses_unique_ids(self):
+        def layout(params, obj):
+            if "qListObjectDef" in obj:
+                return {"qLayout": {"qListObject": {"qSize": {"qcx": 1, "qcy": 0}}}}
+            return {"qLayout": {"qHyperCube": {"qDataPages": [
+                {"qMatrix": [[{"qText": "EU"}, {"qNum": 2}]]}]}}}
+
+        engine = FakeEngine(GetLayout=layout)
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            result = api.get_field_values(app_handle, "Region")
+        assert result["fallback_used"] == "hypercube"
+        created = [params[0]["qInfo"]["qId"] for params in engine.params("CreateSessionObject")]
+        assert created[1].startswith("mcp-field-values-fb-")
+        assert sorted(p[0] for p in engine.params("DestroySessionObject")) == sorted(created)
+
+    def test_table_data_uses_unique_ids(self):
+        engine = FakeEngine(GetTablesAndKeys=_tables(Orders=[("Line", 10, 10, False)]),
+                            GetLayout=_layout(qSize={"qcx": 1, "qcy": 0}))
+        api = _api(engine)
+        with api.lease("app") as app_handle:
+            for _ in range(2):
+                assert api.get_table_data(app_handle, "Orders")["returned_rows"] == 0
+        self._destroyed_match_created(engine, "table-data")
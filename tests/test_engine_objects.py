@@ -0,0 +1,129 @@
+"""Tests for the session-object scope and orphan retry."""
+
+from concurrent.futures import Future
+
+from qlik_sense_mcp_server.engine_objects import (
+    OrphanedObjects,
+    SessionObjectScope,
+    WarmCube,
+    WarmCubePool,
+    destroy_objects,
+    new_object_id,
+)
+
+
+class FakeTransport:
+    """Answers DestroySessionObject immediately unless told to hang."""
+
+    def __init__(self, hang=False, closed=False):
+        self.hang = hang
+        self.closed = closed
+        self.sent = []
+        self.forgotten = []
+
+    def submit(self, method, params=None, handle=-1):
+        req_id = len(self.sent) + 1
+        self.sent.append((method, params, handle))
+        future = Future()
+        if not self.hang:
+            future.set_result({"id": req_id, "result": {"qSuccess": True}})
+        return req_id, future
+
+    def forget(self, req_id):
+        self.forgotten.append(req_id)
+
+
+class TestObjectIds:
+    def test_new_object_id_is_unique(self):
+        ids = {new_object_id("hypercube") for _ in range(100)}
+        assert len(ids) == 100
+        assert all(i.startswith("mcp-hypercube-") for i in ids)
+
+
+class TestSessionObjectScope:
+    def test_scope_destroys_every_object_on_close(self):
+        t = FakeTransport()
+        orphans = OrphanedObjects()
+        scope = SessionObjectScope(orphans, destroy_timeout=1)
+        scope.add(t, 1, "a")
+        scope.add(t, 1, "b")
+        scope.close()
+        assert t.sent == [
+            ("DestroySessionObject", ["a"], 1),
+            ("DestroySessionObject", ["b"], 1),
+        ]
+        assert len(scope) == 0
+        assert len(orphans) == 0
+
+    def test_timed_out_destroy_is_parked_and_retried(self):
+        t = FakeTransport(hang=True)
+        orphans = OrphanedObjects()
+        scope = SessionObjectScope(orphans, destroy_timeout=0.01)
+        scope.add(t, 1, "a")
+        scope.close()
+        assert len(orphans) == 1
+        assert t.forgotten == [1]
+
+        t.hang = False
+        assert orphans.retry(timeout=1) == 0
+        assert len(orphans) == 0
+        assert [m for m, _, _ in t.sent] == ["DestroySessionObject", "DestroySessionObject"]
+
+    def test_release_hands_ownership_back(self):
+        t = FakeTransport()
+        scope = SessionObjectScope(OrphanedObjects(), destroy_timeout=1)
+        scope.add(t, 1, "kept")
+        scope.add(t, 1, "dropped")
+        assert scope.release("kept")
+        assert not scope.release("unknown")
+        scope.close()
+        assert t.sent == [("DestroySessionObject", ["dropped"], 1)]
+
+
+class TestDestroyObjects:
+    def test_closed_transport_objects_are_dropped(self):
+        t = FakeTransport(closed=True)
+        assert destroy_objects([(t, 1, "a")], timeout=1) == []
+        assert t.sent == []
+
+    def test_engine_error_counts_as_destroyed(self):
+        class ErrorTransport(FakeTransport):
+            def submit(self, method, params=None, handle=-1):
+                future = Future()
+                future.set_result({"id": 1, "error": {"code": 2, "message": "Invalid params"}})
+                return 1, future
+
+        assert destroy_objects([(ErrorTransport(), 1, "gone")], timeout=1) == []
+
+
+class TestWarmCubePool:
+    def test_checkout_returns_cube_for_same_socket_and_app_handle(self):
+        pool = WarmCubePool(max_per_socket=2)
+        t1, t2 = FakeTransport(), FakeTransport()
+        assert pool.checkout(t1, 1) is None
+        cube = WarmCube(t1, 1, "q1", 11)
+        assert pool.checkin(cube)
+        assert pool.checkout(t2, 1) is None
+        assert pool.checkout(t1, 2) is None
+        assert pool.checkout(t1, 1) is cube
+        assert pool.checkout(t1, 1) is None  # exclusive until checked in
+        assert pool.stats()["hits"] == 1
+
+    def test_checkin_refuses_when_full_or_closed(self):
+        pool = WarmCubePool(max_per_socket=1)
+        t = FakeTransport()
+        assert pool.checkin(WarmCube(t, 1, "q1", 11))
+        assert not pool.checkin(WarmCube(t, 1, "q2", 12))
+        assert not pool.checkin(WarmCube(FakeTransport(closed=True), 1, "q3", 13))
+
+    def test_cubes_on_closed_socket_are_dropped(self):
+        pool = WarmCubePool(max_per_socket=2)
+        t = FakeTransport()
+        pool.checkin(WarmCube(t, 1, "q1", 11))
+        t.closed = True
+        assert pool.checkout(t, 1) is None
+        assert pool.stats()["idle"] == 0
+
+    def test_zero_size_disables_reuse(self):
+        pool = WarmCubePool(max_per_socket=0)
+        assert not pool.checkin(WarmCube(FakeTransport(), 1, "q1", 11))
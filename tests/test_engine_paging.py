@@ -0,0 +1,146 @@
+"""Tests for adaptive, windowed hypercube page reads."""
+
+from concurrent.futures import Future
+
+import pytest
+
+from qlik_sense_mcp_server.engine_paging import GROW_AFTER_PAGES, HypercubePager
+
+
+class FakeCube:
+    """
+    Serves rows ``0..total-1``; heights above ``max_ok`` time out.
+
+    Pages for which ``hang(top, height)`` is true are left unanswered
+    until ``resolve`` is called.
+    """
+
+    def __init__(self, total, max_ok=None, trim=None, hang=None):
+        self.total = total
+        self.max_ok = max_ok
+        self.trim = trim
+        self.hang = hang
+        self.calls = []
+        self.futures = []
+        self.cancelled = []
+
+    def submit(self, top, height):
+        self.calls.append((top, height))
+        future = Future()
+        self.futures.append((top, height, future))
+        if self.hang is None or not self.hang(top, height):
+            self.resolve(top, height, future)
+        return future
+
+    def resolve(self, top, height, future):
+        if self.max_ok is not None and height > self.max_ok:
+            future.set_exception(TimeoutError("page too heavy"))
+            return
+        if self.trim is not None:
+            height = min(height, self.trim)
+        future.set_result([[i] for i in range(top, min(top + height, self.total))])
+
+    def cancel(self, future):
+        self.cancelled.append(future)
+
+
+class TestHypercubePager:
+    def test_pages_stay_under_cell_budget(self):
+        cube = FakeCube(2500)
+        pager = HypercubePager(cube.submit, n_cols=4, total_rows=2500, page_cells=4000)
+        tops = [top for top, _ in pager]
+        assert tops == [0, 1000, 2000]
+        assert all(height * 4 <= 4000 for _, height in cube.calls)
+        assert pager.rows == 2500
+        assert pager.stats()["pages"] == 3
+
+    def test_budget_is_capped_at_engine_limit(self):
+        pager = HypercubePager(FakeCube(1).submit, n_cols=1, total_rows=1, page_cells=50000)
+        assert pager.max_height == 9900
+
+    def test_timeout_halves_height_and_retries_same_row(self):
+        cube = FakeCube(1000, max_ok=250)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=1000, page_cells=1000)
+        rows = [r[0] for _, matrix in pager for r in matrix]
+        assert rows == list(range(1000))
+        assert cube.calls[:3] == [(0, 1000), (0, 500), (0, 250)]
+        assert pager.timeouts == 2
+        assert pager.min_height == 250
+
+    def test_height_grows_back_after_good_pages(self):
+        cube = FakeCube(10000)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=10000, page_cells=400)
+        pager.height = 100
+        it = iter(pager)
+        for _ in range(GROW_AFTER_PAGES + 1):
+            next(it)
+        assert cube.calls[GROW_AFTER_PAGES][1] == 200
+
+    def test_short_pages_continue_from_last_row(self):
+        cube = FakeCube(100, trim=30)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=100, page_cells=100)
+        assert [top for top, _ in pager] == [0, 30, 60, 90]
+
+    def test_empty_page_stops(self):
+        cube = FakeCube(50)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=100, page_cells=40)
+        assert sum(len(m) for _, m in pager) == 50
+
+    def test_timeout_at_single_row_is_raised(self):
+        cube = FakeCube(10, max_ok=0)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=10, page_cells=4)
+        with pytest.raises(TimeoutError):
+            list(pager)
+
+
+class TestWindowedPaging:
+    def test_window_keeps_pages_in_flight(self):
+        cube = FakeCube(1000, hang=lambda top, height: top > 0)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=1000, page_cells=100,
+                               window=3, cancel=cube.cancel)
+        it = iter(pager)
+        top, _ = next(it)
+        assert top == 0
+        assert cube.calls == [(0, 100), (100, 100), (200, 100)]
+        it.close()
+
+    def test_out_of_order_answers_are_yielded_in_order(self):
+        cube = FakeCube(500, hang=lambda top, height: True)
+
+        def submit(top, height):
+            future = cube.submit(top, height)
+            if len(cube.futures) == 5:
+                for pending in reversed(cube.futures):
+                    cube.resolve(*pending)
+            return future
+
+        pager = HypercubePager(submit, n_cols=1, total_rows=500, page_cells=100, window=5)
+        rows = [r[0] for _, matrix in pager for r in matrix]
+        assert rows == list(range(500))
+        assert len(cube.calls) == 5
+
+    def test_buffering_is_bounded_by_window(self):
+        cube = FakeCube(10000)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=10000, page_cells=100, window=4)
+        it = iter(pager)
+        next(it)
+        assert len(cube.calls) == 4
+
+    def test_timeout_cancels_everything_in_flight(self):
+        cube = FakeCube(10000, hang=lambda top, height: height > 25)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=10000, page_cells=100,
+                               window=3, timeout=0.01, cancel=cube.cancel)
+        top, matrix = next(iter(pager))
+        assert (top, len(matrix)) == (0, 25)
+        assert len(cube.cancelled) == 6
+        assert pager.timeouts == 2
+
+    def test_closing_early_cancels_pending_pages(self):
+        cube = FakeCube(1000, hang=lambda top, height: top > 0)
+        pager = HypercubePager(cube.submit, n_cols=1, total_rows=1000, page_cells=100,
+                               window=3, cancel=cube.cancel)
+        it = iter(pager)
+        next(it)
+        it.close()
+        assert set(cube.cancelled) == {f for top, _, f in cube.futures if top > 0}
+        assert len(cube.cancelled) == 2
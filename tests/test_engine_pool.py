@@ -0,0 +1,324 @@
+"""Tests for the multi-document Engine session pool and per-app leases."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from qlik_sense_mcp_server import server as srv
+from qlik_sense_mcp_server.engine_pool import AppSessionLeases, EngineSession, EngineSessionPool
+
+
+class FakeWs:
+    def __init__(self):
+        self.connected = True
+        self.pings = 0
+
+    def ping(self):
+        if not self.connected:
+            raise OSError("socket closed")
+        self.pings += 1
+
+
+class FakeTransport:
+    def __init__(self):
+        self.ws = FakeWs()
+        self.closed = False
+        self.live_handles = 0
+
+    def ping(self):
+        self.ws.ping()
+
+
+def _session(app_id, has_data=True):
+    return EngineSession(app_id, FakeTransport(), app_handle=1, has_data=has_data)
+
+
+def _pool(max_docs=2, idle_ttl=0):
+    closed = []
+    pool = EngineSessionPool(max_docs=max_docs, idle_ttl=idle_ttl,
+                             close_session=lambda s: closed.append(s.app_id))
+    return pool, closed
+
+
+class TestEngineSession:
+    def test_is_alive_pings_socket(self):
+        s = _session("a")
+        assert s.is_alive()
+        assert s.ws.pings == 1
+
+    def test_is_alive_false_when_transport_closed(self):
+        s = _session("a")
+        s.transport.closed = True
+        assert not s.is_alive()
+
+    def test_is_alive_false_when_socket_dropped(self):
+        s = _session("a")
+        s.ws.connected = False
+        assert not s.is_alive()
+
+    def test_touch_counts_hits(self):
+        s = _session("a")
+        s.touch()
+        s.touch()
+        assert s.stats()["hits"] == 2
+
+
+class TestEngineSessionPool:
+    def test_get_returns_added_session(self):
+        pool, closed = _pool()
+        s = _session("a")
+        pool.add(s)
+        assert pool.get("a") is s
+        assert pool.get("b") is None
+        assert closed == []
+
+    def test_lru_eviction_on_add(self):
+        pool, closed = _pool(max_docs=2)
+        pool.add(_session("a"))
+        pool.add(_session("b"))
+        pool.get("a")  # "b" is now least recently used
+        pool.add(_session("c"))
+        assert closed == ["b"]
+        assert "a" in pool and "c" in pool
+        assert pool.stats()["evictions"] == 1
+
+    def test_make_room_leaves_one_free_slot(self):
+        pool, closed = _pool(max_docs=2)
+        pool.add(_session("a"))
+        pool.add(_session("b"))
+        pool.make_room()
+        assert closed == ["a"]
+        assert len(pool) == 1
+
+    def test_add_replaces_previous_session_for_same_app(self):
+        pool, closed = _pool(max_docs=3)
+        old = _session("a", has_data=False)
+        pool.add(old)
+        new = _session("a", has_data=True)
+        pool.add(new)
+        assert closed == ["a"]
+        assert pool.get("a") is new
+
+    def test_discard_only_drops_registered_session(self):
+        pool, closed = _pool()
+        current = _session("a")
+        pool.add(current)
+        assert pool.discard("a", session=_session("a")) is None
+        assert "a" in pool
+        assert pool.discard("a", session=current, close=False) is current
+        assert "a" not in pool
+        assert closed == []
+
+    def test_evict_idle(self):
+        pool, closed = _pool(max_docs=3, idle_ttl=60)
+        a, b = _session("a"), _session("b")
+        pool.add(a)
+        pool.add(b)
+        a.last_used -= 120
+        assert pool.evict_idle() == ["a"]
+        assert closed == ["a"]
+        assert "b" in pool
+
+    def test_idle_ttl_zero_disables_idle_eviction(self):
+        pool, closed = _pool(idle_ttl=0)
+        a = _session("a")
+        pool.add(a)
+        a.last_used -= 10_000
+        assert pool.evict_idle() == []
+        assert closed == []
+
+    def test_close_all(self):
+        pool, closed = _pool(max_docs=3)
+        for app_id in ("a", "b", "c"):
+            pool.add(_session(app_id))
+        pool.close_all()
+        assert sorted(closed) == ["a", "b", "c"]
+        assert len(pool) == 0
+
+    def test_close_failure_does_not_propagate(self):
+        def boom(session):
+            raise RuntimeError("CloseDoc failed")
+        pool = EngineSessionPool(max_docs=1, idle_ttl=0, close_session=boom)
+        pool.add(_session("a"))
+        pool.add(_session("b"))
+        assert pool.get("b") is not None
+        assert "a" not in pool
+
+    def test_lru_eviction_skips_sessions_in_use(self):
+        pool, closed = _pool(max_docs=2)
+        pool.add(_session("a"))
+        pool.add(_session("b"))
+        busy = pool.acquire("a")
+        pool.get("b")  # "a" is least recently used, but in use
+        pool.add(_session("c"))
+        assert closed == ["b"]
+        assert pool.get("a") is busy
+
+    def test_busy_session_evicted_anyway_closes_on_last_release(self):
+        pool, closed = _pool(max_docs=1)
+        pool.add(_session("a"), acquire=True)
+        busy = pool.acquire("a")
+        pool.make_room()
+        assert "a" not in pool
+        assert closed == []
+        pool.release(busy)
+        assert closed == []
+        pool.release(busy)
+        assert closed == ["a"]
+
+    def test_idle_eviction_skips_sessions_in_use(self):
+        pool, closed = _pool(max_docs=3, idle_ttl=60)
+        a = _session("a")
+        pool.add(a, acquire=True)
+        a.last_used -= 120
+        assert pool.evict_idle() == []
+        pool.release(a)  # restarts the idle clock
+        assert pool.evict_idle() == []
+        a.last_used -= 120
+        assert pool.evict_idle() == ["a"]
+        assert closed == ["a"]
+
+    def test_discard_of_busy_session_defers_close(self):
+        pool, closed = _pool()
+        s = _session("a")
+        pool.add(s, acquire=True)
+        assert pool.discard("a", session=s) is s
+        assert closed == []
+        pool.release(s)
+        assert closed == ["a"]
+
+    def test_stats_most_recent_first(self):
+        pool, _ = _pool(max_docs=3)
+        pool.add(_session("a"))
+        pool.add(_session("b"))
+        pool.get("a")
+        stats = pool.stats()
+        assert stats["open_docs"] == 2
+        assert [s["app_id"] for s in stats["sessions"]] == ["a", "b"]
+
+
+class TestAppSessionLeases:
+    def _leases(self, max_sessions=2):
+        opened, closed = [], []
+
+        def open_session():
+            s = _session("a")
+            opened.append(s)
+            return s
+
+        leases = AppSessionLeases("a", max_sessions, open_session=open_session,
+                                  close_session=closed.append)
+        return leases, opened, closed
+
+    def test_opens_up_to_max_then_reuses(self):
+        leases, opened, _ = self._leases(max_sessions=2)
+        s1 = leases.acquire(timeout=1)
+        s2 = leases.acquire(timeout=1)
+        assert s1 is not s2
+        assert len(opened) == 2
+        leases.release(s1)
+        assert leases.acquire(timeout=1) is s1
+        assert len(opened) == 2
+
+    def test_acquire_times_out_when_all_leased(self):
+        leases, _, _ = self._leases(max_sessions=1)
+        leases.acquire(timeout=1)
+        with pytest.raises(TimeoutError):
+            leases.acquire(timeout=0.05)
+        assert leases.stats()["waiting"] == 0
+
+    def test_waiters_are_served_in_arrival_order(self):
+        leases, _, _ = self._leases(max_sessions=1)
+        held = leases.acquire(timeout=1)
+        served = []
+
+        def worker(name):
+            s = leases.acquire(timeout=5)
+            served.append(name)
+            leases.release(s)
+
+        threads = []
+        for name in ("first", "second", "third"):
+            t = threading.Thread(target=worker, args=(name,))
+            t.start()
+            threads.append(t)
+            while leases.stats()["waiting"] < len(threads):
+                time.sleep(0.005)
+        leases.release(held)
+        for t in threads:
+            t.join(timeout=5)
+        assert served == ["first", "second", "third"]
+
+    def test_dead_session_is_replaced(self):
+        leases, opened, closed = self._leases(max_sessions=1)
+        s1 = leases.acquire(timeout=1)
+        leases.release(s1)
+        s1.ws.connected = False
+        s2 = leases.acquire(timeout=1)
+        assert s2 is not s1
+        assert closed == [s1]
+        assert leases.stats()["open_sessions"] == 1
+
+    def test_release_of_closed_transport_frees_slot(self):
+        leases, _, closed = self._leases(max_sessions=1)
+        s1 = leases.acquire(timeout=1)
+        s1.transport.closed = True
+        leases.release(s1)
+        assert closed == [s1]
+        assert leases.stats()["open_sessions"] == 0
+        assert leases.acquire(timeout=1) is not s1
+
+    def test_failed_open_frees_slot(self):
+        def open_session():
+            raise ConnectionError("handshake failed")
+        leases = AppSessionLeases("a", 1, open_session=open_session,
+                                  close_session=lambda s: None)
+        with pytest.raises(ConnectionError):
+            leases.acquire(timeout=1)
+        assert leases.stats()["open_sessions"] == 0
+
+    def test_concurrent_tool_calls_hold_separate_leases(self):
+        leases, opened, _ = self._leases(max_sessions=2)
+        # Both tool calls must hold a session at once to pass the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+        held = []
+
+        @srv._timed
+        def heavy_tool():
+            session = leases.acquire(timeout=5)
+            held.append(session)
+            try:
+                barrier.wait()
+            finally:
+                leases.release(session)
+            return srv._ok({})
+
+        async def both():
+            return await asyncio.gather(heavy_tool(), heavy_tool())
+
+        asyncio.run(both())
+        assert len(opened) == 2
+        assert held[0] is not held[1]
+
+    def test_close_closes_idle_and_released_sessions(self):
+        leases, _, closed = self._leases(max_sessions=2)
+        s1 = leases.acquire(timeout=1)
+        s2 = leases.acquire(timeout=1)
+        leases.release(s1)
+        leases.close()
+        assert closed == [s1]
+        leases.release(s2)
+        assert closed == [s1, s2]
+        with pytest.raises(ConnectionError):
+            leases.acquire(timeout=1)
+
+    def test_evict_idle(self):
+        leases, _, closed = self._leases(max_sessions=2)
+        s1 = leases.acquire(timeout=1)
+        leases.release(s1)
+        s1.last_used -= 120
+        assert leases.evict_idle(60) == 1
+        assert closed == [s1]
+        assert leases.stats()["open_sessions"] == 0
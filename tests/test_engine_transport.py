@@ -0,0 +1,243 @@
+"""Tests for the pipelined Engine JSON-RPC transport."""
+
+import json
+import queue
+import threading
+
+import pytest
+
+from qlik_sense_mcp_server.engine_transport import EngineTransport
+
+
+class FakeWebSocket:
+    """In-memory stand-in for websocket.WebSocket.
+
+    Every sent request is handed to ``responder``, which returns the list of
+    frames (dicts) the fake Engine should emit in reply. Replies are queued
+    for ``recv()`` only when ``release()`` is called, so tests control the
+    order in which answers arrive.
+    """
+
+    def __init__(self, responder=None, auto_release=True):
+        self.sent = []
+        self.connected = True
+        self._responder = responder or (lambda req: [{"id": req["id"], "result": {"echo": req["method"]}}])
+        self._auto_release = auto_release
+        self._held = []
+        self._inbox = queue.Queue()
+        self._lock = threading.Lock()
+
+    def send(self, data):
+        if not self.connected:
+            raise OSError("socket closed")
+        req = json.loads(data)
+        with self._lock:
+            self.sent.append(req)
+            frames = self._responder(req)
+            if self._auto_release:
+                for f in frames:
+                    self._inbox.put(json.dumps(f))
+            else:
+                self._held.extend(frames)
+
+    def release(self, order=None):
+        with self._lock:
+            frames = self._held if order is None else [self._held[i] for i in order]
+            self._held = []
+        for f in frames:
+            self._inbox.put(json.dumps(f))
+
+    def push_raw(self, data):
+        self._inbox.put(data)
+
+    def recv(self):
+        try:
+            item = self._inbox.get(timeout=0.05)
+        except queue.Empty:
+            raise TimeoutError()
+        if item is None:
+            self.connected = False
+            return ""
+        return item
+
+    def close(self):
+        self.connected = False
+        self._inbox.put(None)
+
+
+class TestSubmit:
+    def test_single_request_roundtrip(self):
+        ws = FakeWebSocket()
+        t = EngineTransport(ws)
+        try:
+            req_id, fut = t.submit("GetDocList")
+            frame = fut.result(timeout=2)
+            assert frame["id"] == req_id
+            assert frame["result"] == {"echo": "GetDocList"}
+            assert ws.sent[0]["jsonrpc"] == "2.0"
+            assert ws.sent[0]["handle"] == -1
+            assert ws.sent[0]["params"] == []
+        finally:
+            t.close()
+
+    def test_ids_are_unique_and_increasing(self):
+        ws = FakeWebSocket()
+        t = EngineTransport(ws)
+        try:
+            ids = [t.submit("M")[0] for _ in range(5)]
+            assert ids == sorted(ids)
+            assert len(set(ids)) == 5
+        finally:
+            t.close()
+
+    def test_out_of_order_replies_are_dispatched_by_id(self):
+        ws = FakeWebSocket(
+            responder=lambda req: [{"id": req["id"], "result": {"m": req["method"]}}],
+            auto_release=False,
+        )
+        t = EngineTransport(ws)
+        try:
+            _, f1 = t.submit("First")
+            _, f2 = t.submit("Second")
+            _, f3 = t.submit("Third")
+            # All three are in flight before any answer arrives.
+            assert t.pending_count == 3
+            ws.release(order=[2, 0, 1])
+            assert f1.result(timeout=2)["result"] == {"m": "First"}
+            assert f2.result(timeout=2)["result"] == {"m": "Second"}
+            assert f3.result(timeout=2)["result"] == {"m": "Third"}
+        finally:
+            t.close()
+
+    def test_notifications_and_stale_frames_are_skipped(self):
+        ws = FakeWebSocket(auto_release=False)
+        t = EngineTransport(ws)
+        try:
+            ws.push_raw(json.dumps({"jsonrpc": "2.0", "method": "OnConnected", "params": {}}))
+            ws.push_raw(json.dumps({"jsonrpc": "2.0", "id": 999, "result": {}}))
+            req_id, fut = t.submit("GetActiveDoc")
+            ws.release()
+            assert fut.result(timeout=2)["id"] == req_id
+        finally:
+            t.close()
+
+    def test_concurrent_submits_from_many_threads(self):
+        ws = FakeWebSocket(responder=lambda req: [{"id": req["id"], "result": {"m": req["method"]}}])
+        t = EngineTransport(ws)
+        results = {}
+
+        def worker(n):
+            _, fut = t.submit(f"M{n}")
+            results[n] = fut.result(timeout=2)["result"]["m"]
+
+        try:
+            threads = [threading.Thread(target=worker, args=(n,)) for n in range(20)]
+            for th in threads:
+                th.start()
+            for th in threads:
+                th.join(timeout=5)
+            assert results == {n: f"M{n}" for n in range(20)}
+            assert len({req["id"] for req in ws.sent}) == 20
+        finally:
+            t.close()
+
+    def test_forgotten_request_reply_is_dropped(self):
+        ws = FakeWebSocket(auto_release=False)
+        t = EngineTransport(ws)
+        try:
+            req_id, fut = t.submit("Slow")
+            t.forget(req_id)
+            ws.release()
+            _, fut2 = t.submit("Fast")
+            ws.release()
+            assert fut2.result(timeout=2)["result"] == {"echo": "Fast"}
+            assert not fut.done()
+        finally:
+            t.close()
+
+
+class TestCancel:
+    def test_cancel_sends_cancel_request_and_drains_late_reply(self):
+        ws = FakeWebSocket(auto_release=False)
+        t = EngineTransport(ws)
+        try:
+            req_id, fut = t.submit("SlowCube")
+            assert t.cancel(req_id)
+            assert ws.sent[-1]["method"] == "CancelRequest"
+            assert ws.sent[-1]["params"] == {"qRequestId": req_id}
+            assert t.cancelled_count == 1
+            ws.release()  # late reply to SlowCube + reply to CancelRequest
+            _, fut2 = t.submit("Next")
+            ws.release()
+            assert fut2.result(timeout=2)["result"] == {"echo": "Next"}
+            assert t.cancelled_count == 0
+            assert not fut.done()
+            assert not t.closed
+        finally:
+            t.close()
+
+    def test_cancel_of_answered_request_is_noop(self):
+        ws = FakeWebSocket()
+        t = EngineTransport(ws)
+        try:
+            req_id, fut = t.submit("Fast")
+            fut.result(timeout=2)
+            assert not t.cancel(req_id)
+            assert [r["method"] for r in ws.sent] == ["Fast"]
+        finally:
+            t.close()
+
+
+class TestHandles:
+    def test_live_handles_follow_qreturn_and_close_lists(self):
+        def responder(req):
+            if req["method"] == "CreateSessionObject":
+                n = len([r for r in ws.sent if r["method"] == "CreateSessionObject"])
+                return [{"id": req["id"], "result": {"qReturn": {
+                    "qType": "GenericObject", "qHandle": 10 + n}}}]
+            return [{"id": req["id"], "result": {"qSuccess": True}, "close": [11]}]
+
+        ws = FakeWebSocket(responder=responder)
+        t = EngineTransport(ws)
+        try:
+            t.submit("CreateSessionObject")[1].result(timeout=2)
+            t.submit("CreateSessionObject")[1].result(timeout=2)
+            assert t.live_handles == 2
+            t.submit("DestroySessionObject")[1].result(timeout=2)
+            assert t.live_handles == 1
+        finally:
+            t.close()
+
+
+class TestClose:
+    def test_close_fails_pending_futures(self):
+        ws = FakeWebSocket(auto_release=False)
+        t = EngineTransport(ws)
+        _, fut = t.submit("Never")
+        t.close("test")
+        with pytest.raises(ConnectionError):
+            fut.result(timeout=2)
+        assert t.closed
+
+    def test_submit_after_close_raises(self):
+        t = EngineTransport(FakeWebSocket())
+        t.close()
+        with pytest.raises(ConnectionError):
+            t.submit("GetDocList")
+
+    def test_unparseable_frame_closes_transport(self):
+        ws = FakeWebSocket(auto_release=False)
+        t = EngineTransport(ws)
+        _, fut = t.submit("Anything")
+        ws.push_raw("not json{")
+        with pytest.raises(ConnectionError):
+            fut.result(timeout=2)
+        assert t.closed
+
+    def test_server_disconnect_fails_pending(self):
+        ws = FakeWebSocket(auto_release=False)
+        t = EngineTransport(ws)
+        _, fut = t.submit("Anything")
+        ws.close()
+        with pytest.raises(ConnectionError):
+            fut.result(timeout=2)
@@ -0,0 +1,178 @@
+"""Tests for the hypercube pre-flight planner."""
+
+from qlik_sense_mcp_server.planner import FieldIndex, plan_hypercube
+
+FACT_ROWS = 2_000_000_000
+
+FIELDS = [
+    {"field_name": "Year", "table_name": "Calendar", "distinct_values": 10, "rows_count": 3650},
+    {"field_name": "Date", "table_name": "Calendar", "distinct_values": 3650, "rows_count": 3650},
+    {"field_name": "Date", "table_name": "Facts", "distinct_values": 3650, "rows_count": FACT_ROWS},
+    {"field_name": "Region", "table_name": "Facts", "distinct_values": 50, "rows_count": FACT_ROWS},
+    {"field_name": "Customer", "table_name": "Facts", "distinct_values": 5_000_000,
+     "rows_count": FACT_ROWS},
+    {"field_name": "Sales", "table_name": "Facts", "distinct_values": 1_000_000,
+     "rows_count": FACT_ROWS},
+    {"field_name": "$Field", "table_name": "$$SysTable", "distinct_values": 7, "rows_count": 7,
+     "is_system": True},
+]
+
+
+def _dims(*fields):
+    return [{"field": f, "sort_by": {}} for f in fields]
+
+
+def _measures(*expressions):
+    return [{"expression": e, "sort_by": {}} for e in expressions]
+
+
+def _plan(dims, measures, max_rows=1000, timeout=180.0, rewrite=True):
+    return plan_hypercube(FieldIndex(FIELDS), _dims(*dims), _measures(*measures),
+                          max_rows, timeout, rewrite=rewrite)
+
+
+def _kinds(plan):
+    return [issue["kind"] for issue in plan["issues"]]
+
+
+class TestFieldIndex:
+    def test_skips_system_fields(self):
+        index = FieldIndex(FIELDS)
+        assert "$Field" not in index
+        assert "Year" in index
+
+    def test_key_field_maps_to_largest_table(self):
+        assert FieldIndex(FIELDS).rows_for(["Date"]) == FACT_ROWS
+
+    def test_rows_for_unknown_falls_back_to_largest_table(self):
+        assert FieldIndex(FIELDS).rows_for(["Nope"]) == FACT_ROWS
+
+    def test_referenced_fields(self):
+        index = FieldIndex(FIELDS)
+        assert index.referenced("Sum({<[Year]={2025}>} Sales) / Count('Region')") == ["Year", "Sales"]
+
+    def test_from_fields_data(self):
+        assert FieldIndex.from_fields_data({"error": "boom"}) is None
+        assert "Year" in FieldIndex.from_fields_data({"fields": FIELDS})
+
+
+class TestEstimates:
+    def test_rows_are_product_of_cardinalities(self):
+        assert _plan(["Year", "Region"], ["Sum(Sales)"])["estimated_rows"] == 500
+
+    def test_rows_capped_by_table_rows(self):
+        plan = _plan(["Customer", "Date"], ["Sum(Sales)"])
+        assert plan["estimated_rows"] == FACT_ROWS
+
+    def test_top_n_caps_rows(self):
+        dims = [{"field": "Customer", "sort_by": {}, "top_n": 10}]
+        plan = plan_hypercube(FieldIndex(FIELDS), dims, _measures("Sum(Sales)"), 1000, 180.0)
+        assert plan["estimated_rows"] == 11
+        assert "truncated" not in _kinds(plan)
+
+    def test_truncation_flagged(self):
+        assert "truncated" in _kinds(_plan(["Customer"], ["Sum(Sales)"]))
+
+    def test_set_analysis_narrows_scan(self):
+        full = _plan(["Region"], ["Sum(Sales)"])["scan_rows"]
+        narrowed = _plan(["Region"], ["Sum({<Year={2024,2025}>}Sales)"])["scan_rows"]
+        assert narrowed == full // 5
+
+    def test_search_strings_do_not_narrow(self):
+        full = _plan(["Region"], ["Sum(Sales)"])["scan_rows"]
+        assert _plan(["Region"], ['Sum({<Year={"20*"}>}Sales)'])["scan_rows"] == full
+
+    def test_rewritten_restriction_enables_zero_suppression(self):
+        plan = _plan(["Region", "Year"], ["Sum(If(Region='EU', Sales))"])
+        assert plan["suppress_zero"] is True
+        assert plan["estimated_rows"] == 10
+        assert plan["rewrites"][-1]["target"] == "suppress_zero"
+
+    def test_user_restriction_keeps_zero_rows(self):
+        plan = _plan(["Region", "Year"], ["Sum({<Region={'EU','US'}>}Sales)"])
+        assert plan["suppress_zero"] is False
+        assert plan["estimated_rows"] == 500
+
+    def test_intersection_narrows_scan(self):
+        full = _plan(["Region"], ["Sum(Sales)"])["scan_rows"]
+        narrowed = _plan(["Region"], ["Sum({<Year*={2024,2025}>}Sales)"])["scan_rows"]
+        assert narrowed == full // 5
+
+    def test_no_zero_suppression_without_rewrite(self):
+        plan = _plan(["Region"], ["Sum({<Region={'EU'}>}Sales)"], rewrite=False)
+        assert plan["suppress_zero"] is False
+        assert plan["estimated_rows"] == 50
+
+    def test_cost_classes(self):
+        assert _plan(["Region"], ["Sum({<Region={'EU'}>}Sales)"])["cost_class"] == "cheap"
+        assert _plan(["Region"], ["Sum(Sales)"])["cost_class"] == "moderate"
+        assert _plan(["Region"], ["Sum(Sales)"], timeout=10.0)["cost_class"] == "prohibitive"
+
+    def test_per_row_if_costs_more(self):
+        plain = _plan(["Region"], ["Sum(Sales)"])
+        with_if = _plan(["Region"], ["Sum(If(Sales > 0, Sales))"])
+        assert "per_row_if" in _kinds(with_if)
+        assert with_if["estimated_seconds"] == plain["estimated_seconds"] * 10
+
+    def test_unknown_dimension_flagged(self):
+        assert "unknown_field" in _kinds(_plan(["region"], ["Sum(Sales)"]))
+
+    def test_calculated_dimension_flagged(self):
+        plan = _plan(["=Year(Date)"], ["Sum(Sales)"])
+        assert "calculated_dimension" in _kinds(plan)
+        assert plan["rewrites"] == []
+
+
+class TestRewrites:
+    def test_if_equality_becomes_set_analysis(self):
+        plan = _plan(["Region"], ["Sum(If(Year=2025 and [Region]='EU', Sales))"])
+        assert plan["measures"][0]["expression"] == (
+            '''Sum({<[Year]*={"=[Year]=2025"},[Region]*={"=[Region]='EU'"}>}Sales)''')
+        assert plan["rewrites"][0]["target"] == "measures[0]"
+        assert "per_row_if" not in _kinds(plan)
+        assert plan["cost_class"] == "cheap"
+
+    def test_sum_with_zero_else_is_rewritten(self):
+        plan = _plan([], ["Sum(If(Year=2025, Sales, 0))"])
+        assert plan["measures"][0]["expression"] == 'Sum({<[Year]*={"=[Year]=2025"}>}Sales)'
+
+    def test_cheap_request_passes_through_unchanged(self):
+        dims, measures = _dims("=[Year]"), _measures("Sum(If(Year=2025, Date))")
+        plan = plan_hypercube(FieldIndex(FIELDS[:2]), dims, measures, 1000, 180.0)
+        assert plan["cost_class"] == "cheap"
+        assert plan["dimensions"] == dims and plan["measures"] == measures
+        assert plan["rewrites"] == [] and plan["suppress_zero"] is False
+        assert "per_row_if" in _kinds(plan)
+
+    def test_moderate_request_is_not_rewritten(self):
+        expression = "Sum(If(Region='EU', Sales))"
+        plan = _plan(["Region"], [expression], timeout=1000.0)
+        assert plan["cost_class"] == "moderate"
+        assert plan["measures"][0]["expression"] == expression
+        assert plan["suppress_zero"] is False
+
+    def test_quoted_double_quote_is_kept(self):
+        expression = '''Sum(If(Region='"EU"', Sales))'''
+        assert _plan([], [expression])["measures"][0]["expression"] == expression
+
+    def test_count_with_zero_else_is_kept(self):
+        expression = "Count(If(Year=2025, Sales, 0))"
+        assert _plan([], [expression])["measures"][0]["expression"] == expression
+
+    def test_comparisons_are_kept(self):
+        expression = "Sum(If(Year>=2025, Sales))"
+        assert _plan([], [expression])["measures"][0]["expression"] == expression
+
+    def test_existing_set_is_kept(self):
+        expression = "Sum({<Region={'EU'}>} If(Year=2025, Sales))"
+        assert _plan([], [expression])["measures"][0]["expression"] == expression
+
+    def test_field_only_dimension_is_unwrapped(self):
+        plan = _plan(["=[Year]"], ["Sum(Sales)"])
+        assert plan["dimensions"][0]["field"] == "Year"
+        assert "calculated_dimension" not in _kinds(plan)
+
+    def test_rewrite_disabled(self):
+        plan = _plan(["=[Year]"], ["Sum(If(Year=2025, Sales))"], rewrite=False)
+        assert plan["dimensions"][0]["field"] == "=[Year]"
+        assert plan["rewrites"] == []
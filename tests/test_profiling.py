@@ -0,0 +1,134 @@
+"""Tests for the background app profiling job."""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from qlik_sense_mcp_server.engine_api import HEAVY_PROFILE_STATS, PROFILE_STATS
+from qlik_sense_mcp_server.profiling import ProfileJob, ProfileJobs
+
+
+def _field(name, table, rows, distinct, tags=("$numeric",), is_key=False, is_system=False):
+    return {"field_name": name, "table_name": table, "rows_count": rows,
+            "distinct_values": distinct, "tags": list(tags), "is_key": is_key,
+            "is_system": is_system}
+
+
+FIELDS = {
+    "fields": [
+        _field("OrderID", "Orders", 500, 500, ("$key", "$numeric"), is_key=True),
+        _field("Amount", "Orders", 500, 300),
+        _field("OrderDate", "Orders", 500, 90, ("$numeric", "$date")),
+        _field("OrderID", "Lines", 5_000_000, 500, ("$key", "$numeric"), is_key=True),
+        _field("Qty", "Lines", 5_000_000, 40),
+        _field("$Field", "$$SysTable", 7, 7, is_system=True),
+    ]
+}
+
+
+class FakeEngine:
+    def __init__(self, fields_data=FIELDS, delay=0.0, fail=()):
+        self.fields_data = fields_data
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self, app_id, timeout=None):
+        yield 1
+
+    def get_app_reload_time(self, app_handle):
+        return "2026-01-01T00:00:00Z"
+
+    def cached_fields(self, app_id, app_handle, reload_time=None):
+        return self.fields_data
+
+    def profile_fields(self, app_handle, fields, stats=PROFILE_STATS, timeout=None):
+        kind = "light" if stats is PROFILE_STATS else "heavy"
+        with self._lock:
+            self.calls.append((kind, list(fields)))
+        time.sleep(self.delay)
+        if kind in self.fail:
+            raise RuntimeError(f"{kind} failed")
+        return {f: dict({"field_name": f}, **{name: 1 for name, _ in stats}) for f in fields}, 1
+
+
+def _run(engine, **options):
+    kwargs = dict(budget_seconds=30.0, concurrency=2, heavy_max_rows=1_000_000)
+    kwargs.update(options)
+    job = ProfileJob(engine, "app", **kwargs).start()
+    assert job.wait(5)
+    return job
+
+
+class TestProfileJob:
+    def test_light_then_heavy_on_small_tables_only(self):
+        engine = FakeEngine()
+        job = _run(engine, concurrency=1)
+        assert job.state == "finished"
+        assert job.done == job.total == 3
+        # Every light step is scheduled before the first heavy one.
+        assert [kind for kind, _ in engine.calls] == ["light", "light", "heavy"]
+        # Heavy statistics skip keys, dates and tables over heavy_max_rows.
+        assert engine.calls[2] == ("heavy", ["Amount"])
+        profile = job.profile
+        assert profile["complete"] is True
+        assert [t["table"] for t in profile["tables"]] == ["Lines", "Orders"]
+        orders = profile["tables"][1]
+        assert orders["heavy_stats"] is True
+        amount = next(f for f in orders["fields"] if f["field_name"] == "Amount")
+        assert all(name in amount for name, _ in PROFILE_STATS + HEAVY_PROFILE_STATS)
+        assert amount["distinct_values"] == 300
+
+    def test_shared_key_profiled_once(self):
+        engine = FakeEngine()
+        _run(engine)
+        light_fields = [f for kind, fields in engine.calls if kind == "light" for f in fields]
+        assert light_fields.count("OrderID") == 1
+        profile = _run(FakeEngine()).profile
+        for table in profile["tables"]:
+            key = next(f for f in table["fields"] if f["field_name"] == "OrderID")
+            assert "unique_values" in key
+
+    def test_budget_skips_unstarted_steps(self):
+        job = _run(FakeEngine(delay=0.2), budget_seconds=0.1, concurrency=1)
+        profile = job.profile
+        assert profile["complete"] is False
+        assert {"kind": "heavy", "table": "Orders"} in profile["skipped_steps"]
+        assert job.done == job.total
+
+    def test_step_errors_are_reported(self):
+        profile = _run(FakeEngine(fail=("heavy",))).profile
+        assert profile["complete"] is False
+        assert profile["errors"] == [{"kind": "heavy", "table": "Orders", "error": "heavy failed"}]
+        orders = next(t for t in profile["tables"] if t["table"] == "Orders")
+        amount = next(f for f in orders["fields"] if f["field_name"] == "Amount")
+        assert "median_value" not in amount
+        assert "unique_values" in amount
+
+    def test_unreadable_data_model_fails_the_job(self):
+        job = _run(FakeEngine(fields_data={"error": "boom"}))
+        assert job.state == "failed"
+        assert "boom" in job.progress()["error"]
+
+    def test_on_done_receives_profile(self):
+        stored = []
+        job = _run(FakeEngine(), on_done=stored.append)
+        assert stored == [job.profile]
+
+
+class TestProfileJobs:
+    def test_one_running_job_per_app(self):
+        jobs = ProfileJobs()
+        engine = FakeEngine(delay=0.2)
+        options = dict(budget_seconds=30.0, concurrency=1, heavy_max_rows=1_000_000)
+        first, started = jobs.start(engine, "app", **options)
+        again, started_again = jobs.start(engine, "app", **options)
+        assert started and not started_again
+        assert again is first
+        assert first.wait(5)
+        rerun, restarted = jobs.start(engine, "app", **options)
+        assert restarted and rerun is not first
+        assert jobs.get("app") is rerun
+        assert rerun.wait(5)
@@ -1,9 +1,13 @@
 """Tests for server module (FastMCP-based since v1.4.0)."""
 
+import asyncio
 import json
+import threading
+from unittest.mock import patch
 
 from qlik_sense_mcp_server import __version__
 from qlik_sense_mcp_server import server as srv
+from tests.test_engine_api import FakeEngine, _api, _search_engine
 
 
 class TestErrorEnvelope:
@@ -27,6 +31,9 @@ class TestErrorEnvelope:
         parsed = json.loads(srv._ok({"foo": "bar"}))
         assert parsed == {"foo": "bar"}
 
+    def test_ok_compact(self):
+        assert srv._ok({"foo": [1, 2]}, compact=True) == '{"foo":[1,2]}'
+
 
 class TestVersion:
     def test_version_format(self):
@@ -46,8 +53,8 @@ class TestFastMCPRegistration:
         assert hasattr(srv.mcp, "_tool_manager")
 
     def test_tools_count(self):
-        # v1.4.0 ships exactly 24 MCP tools; update this if a tool is added.
-        assert len(srv.mcp._tool_manager._tools) == 24
+        # Update this if a tool is added.
+        assert len(srv.mcp._tool_manager._tools) == 35
 
     def test_core_tools_registered(self):
         tool_names = set(srv.mcp._tool_manager._tools.keys())
@@ -59,13 +66,24 @@ class TestFastMCPRegistration:
             # Engine
             "get_app_script",
             "get_app_field_statistics",
+            "get_app_table_profiles",
+            "start_app_profiling",
+            "get_app_profile",
+            "get_app_table_sample",
             "engine_create_hypercube",
+            "engine_create_hypercubes",
+            "engine_create_pivot_table",
+            "engine_evaluate_expressions",
+            "engine_export_hypercube",
+            "engine_export_table",
             "engine_get_field_range",
+            "engine_get_field_values",
             "get_app_field",
             "get_app_variables",
             "get_app_sheets",
             "get_app_sheet_objects",
             "get_app_object",
+            "get_engine_status",
             # Task management
             "get_tasks",
             "get_task_details",
@@ -90,7 +108,7 @@ class TestTimedDecorator:
         def fake_tool():
             return srv._ok({"foo": "bar"})
 
-        result = fake_tool()
+        result = asyncio.run(fake_tool())
         parsed = json.loads(result)
         # tool_call_seconds must be the first key of the response
         assert next(iter(parsed.keys())) == "tool_call_seconds"
@@ -102,7 +120,7 @@ class TestTimedDecorator:
         def broken_tool():
             raise ValueError("boom")
 
-        result = broken_tool()
+        result = asyncio.run(broken_tool())
         parsed = json.loads(result)
         assert parsed["error"] == "boom"
         assert parsed["error_type"] == "ValueError"
@@ -114,7 +132,96 @@ class TestTimedDecorator:
         def scalar_tool():
             return "plain text"
 
-        parsed = json.loads(scalar_tool())
+        parsed = json.loads(asyncio.run(scalar_tool()))
         # Non-JSON / non-dict payloads get wrapped under `result`
         assert parsed["result"] == "plain text"
         assert "tool_call_seconds" in parsed
+
+    def test_timed_keeps_compact_results_compact(self):
+        @srv._timed
+        def compact_tool():
+            return srv._ok({"values": [1, 2, 3]}, compact=True)
+
+        result = asyncio.run(compact_tool())
+        assert "\n" not in result
+        parsed = json.loads(result)
+        assert next(iter(parsed.keys())) == "tool_call_seconds"
+        assert parsed["values"] == [1, 2, 3]
+
+    def test_timed_wraps_async_tools(self):
+        @srv._timed
+        async def async_tool():
+            return srv._ok({"foo": "bar"})
+
+        parsed = json.loads(asyncio.run(async_tool()))
+        assert next(iter(parsed.keys())) == "tool_call_seconds"
+        assert parsed["foo"] == "bar"
+
+    def test_timed_runs_sync_tools_off_the_event_loop(self):
+        # Both calls must be inside their tool at once to pass the barrier.
+        barrier = threading.Barrier(2, timeout=5)
+
+        @srv._timed
+        def slow_tool():
+            barrier.wait()
+            return srv._ok({"thread": threading.current_thread().name})
+
+        async def both():
+            return await asyncio.gather(slow_tool(), slow_tool())
+
+        results = [json.loads(r) for r in asyncio.run(both())]
+        assert all("error" not in r for r in results)
+        assert threading.main_thread().name not in {r["thread"] for r in results}
+
+
+class TestGetAppField:
+    def _call(self, engine, **kwargs):
+        with patch.object(srv, "engine_api", _api(engine)), patch.object(srv, "repo_api", object()):
+            return json.loads(asyncio.run(srv.get_app_field("app", "Region", **kwargs)))
+
+    def test_search_runs_in_the_engine_and_rechecks_wildcards(self):
+        engine = _search_engine(["EU", "North EU", "Europe", "eu-west"])
+        result = self._call(engine, search_string="eu%")
+        assert engine.params("SearchListObjectFor") == [["/qListObjectDef", "eu*"]]
+        # The Engine also matches word starts ("North EU"); the wildcard does not.
+        assert result["field_values"] == ["EU", "Europe", "eu-west"]
+        assert result["engine_matches"] == 4
+
+    def test_case_sensitive_search(self):
+        engine = _search_engine(["EU", "Europe", "eu-west"])
+        result = self._call(engine, search_string="eu*", case_sensitive=True)
+        assert result["field_values"] == ["eu-west"]
+
+    def test_number_search_checks_every_value(self):
+        cells = [{"qText": "1,234", "qNum": 1234}, {"qText": "5,120", "qNum": 5120},
+                 {"qText": "n/a", "qNum": "NaN"}]
+
+        def layout(params, obj):
+            return {"qLayout": {"qListObject": {"qSize": {"qcx": 1, "qcy": len(cells)}}}}
+
+        def data(params, obj):
+            page = params[1][0]
+            rows = cells[page["qTop"]:page["qTop"] + page["qHeight"]]
+            return {"qDataPages": [{"qMatrix": [[cell] for cell in rows]}]}
+
+        engine = FakeEngine(GetLayout=layout, GetListObjectData=data)
+        result = self._call(engine, search_number="12*")
+        # "12*" never matches the formatted text, so no Engine text search.
+        assert engine.params("SearchListObjectFor") == []
+        assert result["field_values"] == ["1,234"]
+        assert result["engine_matches"] == 3
+
+    def test_empty_list_object_falls_back_to_hypercube(self):
+        def layout(params, obj):
+            if "qListObjectDef" in obj:
+                return {"qLayout": {"qListObject": {"qSize": {"qcx": 1, "qcy": 0},
+                                                    "qDataPages": [{"qMatrix": []}]}}}
+            matrix = [[{"qText": "EU"}, {"qNum": 3}], [{"qText": "US"}, {"qNum": 1}]]
+            return {"qLayout": {"qHyperCube": {"qSize": {"qcx": 2, "qcy": 2},
+                                               "qDataPages": [{"qMatrix": matrix}]}}}
+
+        engine = FakeEngine(GetLayout=layout)
+        result = self._call(engine)
+        assert result["field_values"] == ["EU", "US"]
+        assert result["fallback_used"] == "hypercube"
+        assert engine.params("SearchListObjectFor") == []
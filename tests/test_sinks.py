@@ -0,0 +1,98 @@
+"""Tests for the export sinks and export path resolution."""
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+
+import pytest
+
+from qlik_sense_mcp_server.sinks import RowSink, open_sink, resolve_export_path
+
+
+def _export(path, fmt, pages):
+    sink = open_sink(str(path), fmt)
+    sink.open(["Region", "Sales", "Sales"], [False, True, True])
+    for rows in pages:
+        sink.write_rows(rows)
+    return sink, sink.close()
+
+
+class TestResolveExportPath:
+    def test_appends_extension_and_creates_directory(self, tmp_path):
+        path = resolve_export_path(str(tmp_path / "out"), "sales", "csv")
+        assert path == str(tmp_path / "out" / "sales.csv")
+        assert os.path.isdir(tmp_path / "out")
+
+    def test_keeps_existing_extension(self, tmp_path):
+        path = resolve_export_path(str(tmp_path), "sub/sales.jsonl", "jsonl")
+        assert path == str(tmp_path / "sub" / "sales.jsonl")
+
+    def test_rejects_escaping_names(self, tmp_path):
+        for name in ("../sales", "/etc/passwd", "", "a/../../b"):
+            with pytest.raises(ValueError):
+                resolve_export_path(str(tmp_path), name, "csv")
+
+    def test_rejects_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            resolve_export_path(str(tmp_path), "sales", "xlsx")
+
+
+class TestSinks:
+    def test_jsonl_writes_one_object_per_row(self, tmp_path):
+        sink, summary = _export(tmp_path / "a.jsonl", "jsonl", [[["North", 1.5, 2]], [["South", None, 3]]])
+        with open(summary["path"], encoding="utf-8") as fh:
+            rows = [json.loads(line) for line in fh]
+        assert rows == [
+            {"Region": "North", "Sales": 1.5, "Sales_2": 2},
+            {"Region": "South", "Sales": None, "Sales_2": 3},
+        ]
+        assert summary["rows"] == 2
+        assert summary["bytes"] > 0
+        assert not os.path.exists(sink.part_path)
+
+    def test_csv_writes_header_and_rows(self, tmp_path):
+        _, summary = _export(tmp_path / "a.csv", "csv", [[["North", 1.5, 2], ["South", 3, 4]]])
+        with open(summary["path"], encoding="utf-8", newline="") as fh:
+            rows = list(csv.reader(fh))
+        assert rows == [["Region", "Sales", "Sales_2"], ["North", "1.5", "2"], ["South", "3", "4"]]
+
+    def test_summary_carries_file_checksum(self, tmp_path):
+        _, summary = _export(tmp_path / "a.csv", "csv", [[["North", 1.5, 2]]])
+        with open(summary["path"], "rb") as fh:
+            assert summary["sha256"] == hashlib.sha256(fh.read()).hexdigest()
+
+    def test_sqlite_creates_typed_table(self, tmp_path):
+        _, summary = _export(tmp_path / "a.sqlite", "sqlite", [[["North", 1.5, 2]], [["South", 3, None]]])
+        conn = sqlite3.connect(summary["path"])
+        try:
+            rows = conn.execute('SELECT "Region", "Sales", "Sales_2" FROM data').fetchall()
+        finally:
+            conn.close()
+        assert rows == [("North", 1.5, 2.0), ("South", 3.0, None)]
+
+    def test_abort_removes_partial_file(self, tmp_path):
+        sink = open_sink(str(tmp_path / "a.jsonl"), "jsonl")
+        sink.open(["Region"], [False])
+        sink.write_rows([["North"]])
+        sink.abort()
+        assert not os.path.exists(sink.part_path)
+        assert not os.path.exists(sink.path)
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            open_sink(str(tmp_path / "a.xlsx"), "xlsx")
+
+    def test_sink_must_implement_every_hook(self, tmp_path):
+        class NoClose(RowSink):
+            def _open(self, numeric):
+                pass
+
+            def _write(self, rows):
+                pass
+
+        with pytest.raises(TypeError):
+            RowSink(str(tmp_path / "a.jsonl"))
+        with pytest.raises(TypeError):
+            NoClose(str(tmp_path / "a.jsonl"))
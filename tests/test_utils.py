@@ -21,6 +21,14 @@ from qlik_sense_mcp_server.utils import (
     truncate_text,
     escape_qlik_field_name,
     generate_xrfkey,
+    hypercube_cell_value,
+    encode_columnar,
+    encode_cursor,
+    decode_cursor,
+    flatten_pivot_page,
+    flatten_stack_page,
+    set_modifier,
+    inject_set_modifier,
 )
 
 
@@ -291,3 +299,157 @@ class TestGenerateXrfkey:
     def test_unique(self):
         keys = {generate_xrfkey() for _ in range(100)}
         assert len(keys) > 90  # Very unlikely to have collisions
+
+
+class TestHypercubeCellValue:
+    def test_dimension_uses_text(self):
+        assert hypercube_cell_value({"qText": "2025", "qNum": 2025}, numeric=False) == "2025"
+
+    def test_measure_uses_number(self):
+        assert hypercube_cell_value({"qText": "1,5", "qNum": 1.5}, numeric=True) == 1.5
+
+    def test_non_numeric_measure_falls_back_to_text(self):
+        assert hypercube_cell_value({"qText": "n/a", "qNum": "NaN"}, numeric=True) == "n/a"
+
+    def test_null(self):
+        assert hypercube_cell_value({"qText": "-", "qIsNull": True}, numeric=True) is None
+
+
+class TestEncodeColumnar:
+    CUBE = {
+        "qDimensionInfo": [{"qFallbackTitle": "Region"}],
+        "qMeasureInfo": [{"qFallbackTitle": "Sales"}, {"qFallbackTitle": "Names"}],
+        "qDataPages": [{"qMatrix": [
+            [{"qText": "North"}, {"qText": "10", "qNum": 10}, {"qText": "a", "qNum": "NaN"}],
+            [{"qText": "South"}, {"qText": "-", "qNum": "NaN"}, {"qText": "b", "qNum": "NaN"}],
+            [{"qText": "North"}, {"qText": "2.5", "qNum": 2.5}, {"qText": "-", "qNum": "NaN", "qIsNull": True}],
+            [{"qText": "-", "qIsNull": True}, {"qText": "1", "qNum": 1}, {"qText": "c", "qNum": "NaN"}],
+        ]}],
+    }
+
+    def test_dimension_is_dictionary_encoded(self):
+        region = encode_columnar(self.CUBE)["columns"][0]
+        assert region["encoding"] == "dict"
+        assert region["dictionary"] == ["North", "South"]
+        assert region["codes"] == [0, 1, 0, None]
+
+    def test_numeric_measure_uses_numbers_and_null_for_nan(self):
+        sales = encode_columnar(self.CUBE)["columns"][1]
+        assert sales["encoding"] == "number"
+        assert sales["values"] == [10, None, 2.5, 1]
+
+    def test_text_measure_uses_text(self):
+        names = encode_columnar(self.CUBE)["columns"][2]
+        assert names["encoding"] == "text"
+        assert names["values"] == ["a", "b", None, "c"]
+
+    def test_row_count_spans_pages(self):
+        cube = dict(self.CUBE, qDataPages=self.CUBE["qDataPages"] * 2)
+        assert encode_columnar(cube)["row_count"] == 8
+
+    def test_empty_cube(self):
+        assert encode_columnar({"qDimensionInfo": [], "qMeasureInfo": []}) == {"row_count": 0, "columns": []}
+
+
+class TestFlattenPivotPage:
+    PAGE = {
+        "qArea": {"qTop": 10, "qLeft": 0, "qWidth": 2, "qHeight": 3},
+        "qLeft": [
+            {"qText": "EU", "qCanCollapse": True, "qSubNodes": [
+                {"qText": "2024"}, {"qText": "2025"},
+            ]},
+            {"qText": "US", "qCanExpand": True},
+        ],
+        "qTop": [{"qText": "Sales"}, {"qText": "Cost"}],
+        "qData": [
+            [{"qText": "1", "qNum": 1}, {"qText": "2", "qNum": 2}],
+            [{"qText": "3", "qNum": 3}, {"qText": "-", "qNum": "NaN"}],
+            [{"qText": "5", "qNum": 5}, {"qText": "6", "qNum": 6}],
+        ],
+    }
+
+    def test_headers_are_leaf_paths(self):
+        flat = flatten_pivot_page(self.PAGE)
+        assert flat["row_headers"] == [["EU", "2024"], ["EU", "2025"], ["US"]]
+        assert flat["column_headers"] == [["Sales"], ["Cost"]]
+
+    def test_values_are_plain(self):
+        assert flatten_pivot_page(self.PAGE)["values"] == [[1, 2], [3, "-"], [5, 6]]
+
+    def test_nodes_carry_expand_positions(self):
+        nodes = flatten_pivot_page(self.PAGE)["nodes"]
+        assert nodes == [
+            {"side": "left", "row": 10, "col": 0, "path": ["EU"], "expanded": True},
+            {"side": "left", "row": 12, "col": 0, "path": ["US"], "expanded": False},
+        ]
+
+    def test_empty_page(self):
+        assert flatten_pivot_page({}) == {"row_headers": [], "column_headers": [], "values": [],
+                                          "nodes": []}
+
+
+class TestFlattenStackPage:
+    def test_leaves_with_paths(self):
+        page = {"qData": [{"qText": "EU", "qSubNodes": [
+            {"qText": "2024", "qSubNodes": [{"qText": "1", "qValue": 1}]},
+            {"qText": "2025", "qSubNodes": [{"qText": "-", "qValue": "NaN"}]},
+        ]}]}
+        assert flatten_stack_page(page) == [
+            {"path": ["EU", "2024"], "value": 1, "text": "1"},
+            {"path": ["EU", "2025"], "value": None, "text": "-"},
+        ]
+
+
+class TestCursor:
+    def test_round_trip(self):
+        state = {"field": "Customer", "offset": 5000, "version": "2026-01-01T00:00:00Z"}
+        cursor = encode_cursor(state)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == state
+
+    def test_garbage_is_rejected(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not a cursor!")
+
+    def test_non_object_is_rejected(self):
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor([1, 2]))
+
+
+class TestSetModifier:
+    def test_quotes_values(self):
+        assert set_modifier("Region", ["EU", "US"]) == "[Region]={'EU','US'}"
+
+    def test_escapes_quotes_and_brackets(self):
+        assert set_modifier("A]B", ["O'Hara"]) == "[A]]B]={'O''Hara'}"
+
+
+class TestInjectSetModifier:
+    MOD = "[Region]={'EU'}"
+
+    def test_plain_aggregation(self):
+        assert inject_set_modifier("Sum(Sales)", self.MOD) == "Sum({<[Region]={'EU'}>}Sales)"
+
+    def test_existing_set_is_intersected(self):
+        assert (inject_set_modifier("Sum({1<Year={2025}>} Sales)", self.MOD)
+                == "Sum({(1<Year={2025}>)*1<[Region]={'EU'}>} Sales)")
+
+    def test_every_aggregation_is_restricted(self):
+        result = inject_set_modifier("Sum(Aggr(Max(x), D)) / Count(DISTINCT Id)", self.MOD)
+        assert result.count("{<[Region]={'EU'}>}") == 4
+        assert "Count({<[Region]={'EU'}>}DISTINCT Id)" in result
+
+    def test_case_insensitive_and_ignores_other_functions(self):
+        assert (inject_set_modifier("RangeSum(sum (x), 1)", self.MOD)
+                == "RangeSum(sum ({<[Region]={'EU'}>}x), 1)")
+
+    def test_literals_and_brackets_untouched(self):
+        assert (inject_set_modifier("Only('Sum(x)') & [Sum(y)]", self.MOD)
+                == "Only({<[Region]={'EU'}>}'Sum(x)') & [Sum(y)]")
+
+    def test_braces_inside_set_strings(self):
+        assert (inject_set_modifier("Sum({<A={'}'}>}x)", self.MOD)
+                == "Sum({(<A={'}'}>)*1<[Region]={'EU'}>}x)")
+
+    def test_no_aggregation(self):
+        assert inject_set_modifier("1 + 2", self.MOD) == "1 + 2"